@@ -0,0 +1,71 @@
+"""
+Audit the existing license and copyright state of a checked-out repository.
+
+Usage:
+    python audit.py <repo_name> <tree> --manifest-out baseline.jsonl
+"""
+import argparse
+import logging
+from main import LOG_PREFIX, add_check_arguments, create_detection_components, print_detection_stats
+from scanner.audit import TreeAudit
+from scanner.policy_registry import load_policy_registry
+from scanner.tracing import tracer
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+
+    Args:
+        argv (list): The arguments to parse. Defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Record the licenses, copyrights and issues of every file of a tree.")
+    parser.add_argument('repo_name', help="The name of the audited repository.")
+    parser.add_argument('tree', help="The root directory of the checked-out repository.")
+    parser.add_argument('--manifest-out', required=True,
+                        help="Baseline manifest to write, one JSON record per file.")
+    parser.add_argument('--resume', action='store_true',
+                        help="Keep the records of an existing manifest and only audit the "
+                             "files missing from it.")
+    parser.add_argument('--chunk-size', type=int, default=2000,
+                        help="Number of files detected per scancode run; the manifest is "
+                             "flushed after each chunk.")
+    parser.add_argument('--walk-workers', type=int, default=8,
+                        help="Number of threads walking directories and reading files.")
+    add_check_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    """
+    Audit every file of the tree into the baseline manifest.
+    """
+    logging.basicConfig(level=logging.WARNING)
+
+    args = parse_args()
+    if args.trace:
+        tracer.enable()
+
+    registry = load_policy_registry(args.policy_file, args.policy_cache)
+    engine, prefilter, clusterer, cache = create_detection_components(args)
+    audit = TreeAudit(args.tree, args.repo_name,
+                      registry.lookup(args.repo_name).allowed_licenses,
+                      args.manifest_out, resume=args.resume, chunk_size=args.chunk_size,
+                      workers=args.walk_workers,
+                      cache=cache, engine=engine, prefilter=prefilter, clusterer=clusterer)
+    audit.run()
+
+    print(f"{LOG_PREFIX} {audit.stats()}")
+    print_detection_stats(prefilter, clusterer, cache)
+    if args.trace:
+        tracer.write(args.trace)
+        print(f"{LOG_PREFIX} {tracer.summary()}")
+    print(f"{LOG_PREFIX} Baseline manifest written to {args.manifest_out}")
+
+
+if __name__ == '__main__':
+    main()
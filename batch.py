@@ -0,0 +1,85 @@
+"""
+Check a series of patches (e.g. every commit of a branch) in one invocation.
+
+Usage:
+    git format-patch -o series/ origin/main..HEAD
+    python batch.py <repo_name> series/
+"""
+import argparse
+import logging
+import sys
+from main import (LOG_PREFIX, add_check_arguments, combine_results, create_detection_components,
+                  print_detection_stats)
+from scanner.batch import BatchChecker, find_patch_files
+from scanner.copyright_transitions import load_transition_rules
+from scanner.policy_registry import load_policy_registry
+from scanner.report import format_report
+from scanner.tracing import tracer
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+
+    Args:
+        argv (list): The arguments to parse. Defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Check many patches for license and copyright issues in one pass.")
+    parser.add_argument('repo_name', help="The name of the repository the patches apply to.")
+    parser.add_argument('patches', nargs='+',
+                        help="Patch files, or directories of *.patch/*.diff files.")
+    add_check_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    """
+    Check every patch and print one report per patch.
+
+    Exits with 1 if any patch has blocking issues, 0 otherwise.
+    """
+    logging.basicConfig(level=logging.WARNING)
+
+    args = parse_args()
+    if args.trace:
+        tracer.enable()
+
+    patch_files = find_patch_files(args.patches)
+    registry = load_policy_registry(args.policy_file, args.policy_cache)
+    engine, prefilter, clusterer, cache = create_detection_components(args)
+    checker = BatchChecker(patch_files, args.repo_name,
+                           registry.lookup(args.repo_name).allowed_licenses,
+                           streaming=args.streaming,
+                           transitions=load_transition_rules(args.copyright_transitions,
+                                                             registry),
+                           cache=cache, engine=engine, prefilter=prefilter,
+                           clusterer=clusterer)
+    results = checker.run()
+
+    print(f"{LOG_PREFIX} {checker.stats()}")
+    print_detection_stats(prefilter, clusterer, cache)
+    if args.trace:
+        tracer.write(args.trace)
+        print(f"{LOG_PREFIX} {tracer.summary()}")
+
+    failed = []
+    for patch_file, flagged_license_files, flagged_copyright_files in results:
+        flagged_files, warning_files = combine_results(flagged_license_files,
+                                                       flagged_copyright_files)
+        print(f"{LOG_PREFIX} ═══ {patch_file}")
+        print(format_report(flagged_files, warning_files, LOG_PREFIX))
+        if flagged_files:
+            failed.append(patch_file)
+
+    print(f"{LOG_PREFIX} {len(failed)} of {len(results)} patches have blocking issues")
+    for patch_file in failed:
+        print(f"{LOG_PREFIX}   ✗ {patch_file}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
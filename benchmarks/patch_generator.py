@@ -0,0 +1,270 @@
+"""
+Module to generate deterministic synthetic patches for benchmarking.
+"""
+import argparse
+import os
+import random
+
+SOURCE_EXTENSIONS = ('.c', '.h', '.cpp', '.py', '.java', '.go', '.sh')
+
+LICENSE_IDENTIFIERS = ('BSD-3-Clause', 'BSD-3-Clause-Clear', 'MIT', 'Apache-2.0',
+                       'GPL-2.0-only', 'LGPL-2.1-or-later')
+
+COPYRIGHT_HOLDERS = ('Qualcomm Technologies, Inc. and/or its subsidiaries',
+                     'Qualcomm Innovation Center, Inc. All rights reserved',
+                     'The Linux Foundation', 'Example Corp.')
+
+BASE85_ALPHABET = ('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+                   'abcdefghijklmnopqrstuvwxyz!#$%&()*+-;<=>?@^_`{|}~')
+
+CODE_LINES = (
+    'int value = compute(input, flags);',
+    'if (ret < 0) return ret;',
+    'for (i = 0; i < count; i++) {',
+    '    buffer[i] = source[i] ^ mask;',
+    '}',
+    'static const char *name = "module";',
+    'return dispatch(ctx, request);',
+    '/* update the state machine */',
+)
+
+
+class PatchGenerator:
+    """
+    Generates a git-style patch with a controllable mix of changes.
+
+    The same parameters and seed always produce the same patch.
+    """
+
+    def __init__(self, files: int = 1000, hunks_per_file: int = 2, hunk_lines: int = 20,
+                 license_density: float = 0.1, binary_ratio: float = 0.05,
+                 rename_ratio: float = 0.02, new_file_ratio: float = 0.1,
+                 ignore_patterns: int = 10, seed: int = 0) -> None:
+        """
+        Initialize the PatchGenerator object.
+
+        Args:
+            files (int): Number of changed files.
+            hunks_per_file (int): Number of hunks in each modified file.
+            hunk_lines (int): Number of changed lines in each hunk.
+            license_density (float): Fraction of source files whose license or
+                copyright header is changed.
+            binary_ratio (float): Fraction of binary files.
+            rename_ratio (float): Fraction of pure renames.
+            new_file_ratio (float): Fraction of newly added files.
+            ignore_patterns (int): Number of patterns in the generated .licenseignore.
+            seed (int): Seed of the random generator.
+        """
+        self.files = files
+        self.hunks_per_file = hunks_per_file
+        self.hunk_lines = hunk_lines
+        self.license_density = license_density
+        self.binary_ratio = binary_ratio
+        self.rename_ratio = rename_ratio
+        self.new_file_ratio = new_file_ratio
+        self.ignore_patterns = ignore_patterns
+        self.seed = seed
+
+    def params(self) -> dict:
+        """
+        Get the generation parameters.
+
+        Returns:
+            dict: The parameters, for recording next to benchmark results.
+        """
+        return {
+            'files': self.files,
+            'hunks_per_file': self.hunks_per_file,
+            'hunk_lines': self.hunk_lines,
+            'license_density': self.license_density,
+            'binary_ratio': self.binary_ratio,
+            'rename_ratio': self.rename_ratio,
+            'new_file_ratio': self.new_file_ratio,
+            'ignore_patterns': self.ignore_patterns,
+            'seed': self.seed,
+        }
+
+    def _header(self, rng: random.Random, added: bool) -> list:
+        """
+        Build the lines of a license/copyright header.
+        """
+        year = rng.randint(2010, 2025)
+        holder = rng.choice(COPYRIGHT_HOLDERS)
+        identifier = rng.choice(LICENSE_IDENTIFIERS)
+        sign = '+' if added else '-'
+        return [
+            f"{sign}/*",
+            f"{sign} * Copyright (c) {year} {holder}",
+            f"{sign} * SPDX-License-Identifier: {identifier}",
+            f"{sign} */",
+        ]
+
+    def _code(self, rng: random.Random, sign: str, count: int) -> list:
+        """
+        Build changed code lines.
+        """
+        return [f"{sign}{rng.choice(CODE_LINES)}" for _ in range(count)]
+
+    def _source_change(self, rng: random.Random, path: str, new_file: bool) -> list:
+        """
+        Build the diff of a source file.
+        """
+        if new_file:
+            lines = [f"diff --git a/{path} b/{path}", "new file mode 100644",
+                     f"index 0000000..{rng.getrandbits(28):07x}", "--- /dev/null",
+                     f"+++ b/{path}"]
+            body = self._code(rng, '+', self.hunk_lines * self.hunks_per_file)
+            if rng.random() < self.license_density:
+                body = self._header(rng, added=True) + body
+            lines.append(f"@@ -0,0 +1,{len(body)} @@")
+            return lines + body
+
+        lines = [f"diff --git a/{path} b/{path}",
+                 f"index {rng.getrandbits(28):07x}..{rng.getrandbits(28):07x} 100644",
+                 f"--- a/{path}", f"+++ b/{path}"]
+        start = 1
+        for hunk in range(self.hunks_per_file):
+            deleted = self._code(rng, '-', self.hunk_lines // 2)
+            added = self._code(rng, '+', self.hunk_lines - len(deleted))
+            if hunk == 0 and rng.random() < self.license_density:
+                deleted = self._header(rng, added=False) + deleted
+                added = self._header(rng, added=True) + added
+            lines.append(f"@@ -{start},{len(deleted) + 1} +{start},{len(added) + 1} @@")
+            lines.append(" /* context */")
+            lines.extend(deleted)
+            lines.extend(added)
+            start += self.hunk_lines * 4
+        return lines
+
+    def _binary_change(self, rng: random.Random, path: str) -> list:
+        """
+        Build the diff of a binary file.
+        """
+        lines = [f"diff --git a/{path} b/{path}",
+                 f"index {rng.getrandbits(40):010x}..{rng.getrandbits(40):010x} 100644",
+                 "GIT binary patch", f"literal {rng.randint(1000, 100000)}"]
+        for _ in range(max(1, self.hunk_lines)):
+            lines.append('z' + ''.join(rng.choice(BASE85_ALPHABET) for _ in range(65)))
+        lines.extend(["", "literal 0", "HcmV?d00001", ""])
+        return lines
+
+    def _rename(self, rng: random.Random, path: str) -> list:
+        """
+        Build the diff of a pure rename.
+        """
+        old_path = f"old/{path}"
+        return [f"diff --git a/{old_path} b/{path}", f"similarity index {rng.randint(90, 100)}%",
+                f"rename from {old_path}", f"rename to {path}"]
+
+    def generate(self) -> str:
+        """
+        Generate the patch.
+
+        Returns:
+            str: The patch text.
+        """
+        rng = random.Random(self.seed)
+        lines = [f"From {rng.getrandbits(160):040x} Mon Sep 17 00:00:00 2001",
+                 "From: Benchmark <bench@example.com>", "Subject: [PATCH] synthetic change", ""]
+        for index in range(self.files):
+            directory = f"src/module_{index % 50}"
+            roll = rng.random()
+            if roll < self.binary_ratio:
+                lines.extend(self._binary_change(rng, f"{directory}/blob_{index}.bin"))
+                continue
+            path = f"{directory}/file_{index}{rng.choice(SOURCE_EXTENSIONS)}"
+            roll -= self.binary_ratio
+            if roll < self.rename_ratio:
+                lines.extend(self._rename(rng, path))
+            else:
+                new_file = roll - self.rename_ratio < self.new_file_ratio
+                lines.extend(self._source_change(rng, path, new_file))
+        lines.append("")
+        return "\n".join(lines)
+
+    def generate_ignore(self) -> str:
+        """
+        Generate a .licenseignore file.
+
+        Half of the patterns match nothing, so that matching cost scales with
+        the pattern count without excluding most of the patch.
+
+        Returns:
+            str: The .licenseignore text.
+        """
+        rng = random.Random(self.seed)
+        lines = ["# synthetic .licenseignore"]
+        for index in range(self.ignore_patterns):
+            if index % 2:
+                lines.append(f"vendor/unused_{index}/**")
+            else:
+                lines.append(f"src/module_{rng.randint(0, 49)}/file_{rng.randint(0, self.files)}.*")
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory: str) -> str:
+        """
+        Write the patch and its .licenseignore into a directory.
+
+        Args:
+            directory (str): The output directory.
+
+        Returns:
+            str: The path of the written patch.
+        """
+        os.makedirs(directory, exist_ok=True)
+        patch_path = os.path.join(directory, 'synthetic.patch')
+        with open(patch_path, 'w', encoding='utf-8') as f:
+            f.write(self.generate())
+        with open(os.path.join(directory, '.licenseignore'), 'w', encoding='utf-8') as f:
+            f.write(self.generate_ignore())
+        return patch_path
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the generator parameters to an argument parser.
+
+    Args:
+        parser (argparse.ArgumentParser): The parser.
+    """
+    parser.add_argument('--files', type=int, default=1000)
+    parser.add_argument('--hunks-per-file', type=int, default=2)
+    parser.add_argument('--hunk-lines', type=int, default=20)
+    parser.add_argument('--license-density', type=float, default=0.1)
+    parser.add_argument('--binary-ratio', type=float, default=0.05)
+    parser.add_argument('--rename-ratio', type=float, default=0.02)
+    parser.add_argument('--new-file-ratio', type=float, default=0.1)
+    parser.add_argument('--ignore-patterns', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=0)
+
+
+def from_arguments(args: argparse.Namespace) -> PatchGenerator:
+    """
+    Create a generator from parsed arguments.
+
+    Args:
+        args (argparse.Namespace): Arguments added by add_arguments().
+
+    Returns:
+        PatchGenerator: The generator.
+    """
+    return PatchGenerator(files=args.files, hunks_per_file=args.hunks_per_file,
+                          hunk_lines=args.hunk_lines, license_density=args.license_density,
+                          binary_ratio=args.binary_ratio, rename_ratio=args.rename_ratio,
+                          new_file_ratio=args.new_file_ratio,
+                          ignore_patterns=args.ignore_patterns, seed=args.seed)
+
+
+def main() -> None:
+    """
+    Write a synthetic patch and .licenseignore to a directory.
+    """
+    parser = argparse.ArgumentParser(description="Generate a synthetic patch.")
+    parser.add_argument('output_dir')
+    add_arguments(parser)
+    args = parser.parse_args()
+    print(from_arguments(args).write(args.output_dir))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,235 @@
+"""
+Module to benchmark each stage of the checker pipeline on a synthetic patch.
+
+Usage:
+    python -m benchmarks.run --files 5000 --engine stub --output results.json
+    python -m benchmarks.run --files 5000 --engine stub --compare results.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import re
+import resource
+import sys
+import tempfile
+import time
+
+import main as checker_main
+from benchmarks import patch_generator
+from scanner.copyright_checker import CopyrightChecker
+from scanner.license_policy import PERMISSIVE_LICENSES
+from scanner.license_scancode import LicenseChecker
+from scanner.patch import Patch
+from scanner.prefilter import LicensePrefilter
+from scanner.scancode_engine import ENGINES, ScancodeEngine, get_engine
+
+SPDX_IDENTIFIER_RE = re.compile(
+    r'SPDX-License-Identifier:\s*(?P<expression>.*?)\s*(?:\*/|-->)?\s*$', re.MULTILINE)
+
+
+class StubEngine(ScancodeEngine):
+    """
+    Stand-in for scancode that only reads SPDX-License-Identifier tags.
+
+    It keeps the license stage realistic in shape (every blob is consumed and
+    gets a verdict) while removing scancode's cost, so the pure-Python stages
+    can be measured in isolation.
+    """
+
+    name = 'stub'
+
+    def detect(self, blobs) -> dict:
+        results = {}
+        for key, text in blobs:
+            match = SPDX_IDENTIFIER_RE.search(text)
+            results[key] = match.group('expression') if match else []
+        return results
+
+
+def peak_rss_mb() -> float:
+    """
+    Get the peak resident set size of this process so far.
+
+    Returns:
+        float: The peak RSS in MB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return peak / divisor
+
+
+class Stage:
+    """
+    Measures the wall time and peak RSS of one pipeline stage.
+    """
+
+    def __init__(self, name: str, size: int) -> None:
+        """
+        Initialize the Stage object.
+
+        Args:
+            name (str): The name of the stage.
+            size (int): The number of patch bytes the stage processes.
+        """
+        self.name = name
+        self.size = size
+        self.files = 0
+        self.seconds = 0.0
+        self.peak_rss_mb = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.seconds += time.perf_counter() - self.start
+        self.peak_rss_mb = peak_rss_mb()
+
+    def to_dict(self) -> dict:
+        seconds = max(self.seconds, 1e-9)
+        return {
+            'seconds': round(self.seconds, 6),
+            'peak_rss_mb': round(self.peak_rss_mb, 1),
+            'mb_per_s': round(self.size / (1024 * 1024) / seconds, 3),
+            'files_per_s': round(self.files / seconds, 1),
+        }
+
+
+def run_benchmark(patch_path: str, engine: ScancodeEngine, streaming: bool,
+                  prefilter: bool) -> dict:
+    """
+    Run every stage of the pipeline once over a patch.
+
+    The .licenseignore next to the patch is used, as Patch reads it from the
+    current working directory.
+
+    Args:
+        patch_path (str): The patch to check.
+        engine (ScancodeEngine): The license detection engine.
+        streaming (bool): Whether the patch is parsed in streaming mode.
+        prefilter (bool): Whether the license keyword prefilter is used.
+
+    Returns:
+        dict: The measurements of each stage, keyed by stage name.
+    """
+    size = os.path.getsize(patch_path)
+    previous_cwd = os.getcwd()
+    os.chdir(os.path.dirname(os.path.abspath(patch_path)))
+    try:
+        stages = {}
+
+        with Stage('parse', size) as stage:
+            patch = Patch(patch_path, streaming=streaming)
+            stage.files = sum(1 for _ in patch.iter_changes())
+        stages[stage.name] = stage
+        files = stage.files
+
+        with Stage('copyright', size) as stage:
+            flagged_copyright_files = CopyrightChecker(patch).run()
+            stage.files = files
+        stages[stage.name] = stage
+
+        license_checker = LicenseChecker(patch, 'benchmark', PERMISSIVE_LICENSES, engine=engine,
+                                         prefilter=LicensePrefilter() if prefilter else None)
+        detect_stage = Stage('license_detect', size)
+        detect_licenses_batch = license_checker.detect_licenses_batch
+
+        def timed_detect(changes):
+            with detect_stage:
+                return detect_licenses_batch(changes)
+
+        license_checker.detect_licenses_batch = timed_detect
+        with Stage('license', size) as stage:
+            flagged_license_files = license_checker.run()
+            stage.files = detect_stage.files = files
+        stages[detect_stage.name] = detect_stage
+        stages[stage.name] = stage
+
+        with Stage('report', size) as stage:
+            flagged_files, warning_files = checker_main.combine_results(
+                flagged_license_files, flagged_copyright_files)
+            with contextlib.redirect_stdout(io.StringIO()):
+                try:
+                    checker_main.beautify_output(flagged_files, warning_files, 'BSD-3-Clause',
+                                                 checker_main.LOG_PREFIX)
+                except SystemExit:
+                    pass
+            stage.files = files
+        stages[stage.name] = stage
+
+        return {name: stage.to_dict() for name, stage in stages.items()}
+    finally:
+        os.chdir(previous_cwd)
+
+
+def compare(results: dict, baseline: dict) -> str:
+    """
+    Render a comparison of two benchmark results.
+
+    Args:
+        results (dict): The current results.
+        baseline (dict): Results of an earlier run.
+
+    Returns:
+        str: One line per stage with both timings and the speedup.
+    """
+    lines = []
+    for name, stage in results['stages'].items():
+        before = baseline.get('stages', {}).get(name)
+        if not before:
+            lines.append(f"{name:16} {stage['seconds']:10.3f}s   (no baseline)")
+            continue
+        speedup = before['seconds'] / max(stage['seconds'], 1e-9)
+        lines.append(f"{name:16} {before['seconds']:10.3f}s -> {stage['seconds']:10.3f}s"
+                     f"   x{speedup:.2f}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """
+    Generate a synthetic patch, benchmark it and print or store the results.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the checker pipeline stages.")
+    patch_generator.add_arguments(parser)
+    parser.add_argument('--patch', help="Benchmark an existing patch instead of a synthetic one.")
+    parser.add_argument('--engine', choices=sorted(ENGINES) + [StubEngine.name],
+                        default=StubEngine.name, help="License detection engine.")
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--streaming', action='store_true')
+    parser.add_argument('--no-prefilter', dest='prefilter', action='store_false')
+    parser.add_argument('--output', help="Write the results to this JSON file.")
+    parser.add_argument('--compare', help="Compare with the results in this JSON file.")
+    args = parser.parse_args()
+
+    engine = StubEngine() if args.engine == StubEngine.name else get_engine(args.engine,
+                                                                            args.workers)
+    generator = patch_generator.from_arguments(args)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        patch_path = os.path.abspath(args.patch) if args.patch else generator.write(tmpdir)
+        results = {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'engine': engine.name,
+            'streaming': args.streaming,
+            'prefilter': args.prefilter,
+            'patch': args.patch or generator.params(),
+            'patch_bytes': os.path.getsize(patch_path),
+            'stages': run_benchmark(patch_path, engine, args.streaming, args.prefilter),
+        }
+
+    print(json.dumps(results, indent=2))
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            print(compare(results, json.load(f)))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
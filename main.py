@@ -1,77 +1,87 @@
+import argparse
 import logging
+import os
 import sys
-import scanner.config as config
 from scanner.patch import Patch
+from scanner.git_range import GitRange
 from scanner.license_scancode import LicenseChecker
 from scanner.copyright_checker import CopyrightChecker
+from scanner.copyright_transitions import load_transition_rules
+from scanner.detection_cache import DetectionCache, get_scancode_version
+from scanner.manifest import IncrementalPatch, ResultManifest, manifest_context
+from scanner.scancode_engine import DEFAULT_ENGINE, ENGINES, get_engine
+from scanner.prefilter import DEFAULT_TRIGGER_TOKENS, LicensePrefilter
+from scanner.clustering import TemplateClusterer
+from scanner.policy_registry import PolicyRegistry, load_policy_registry
+from scanner.issues import Severity
+from scanner.pipeline import run_checks
+from scanner.service import request_check
+from scanner.sharding import ShardedPatch, parse_shard, write_partial
+from scanner.report import EXIT_BLOCKING, BoxRenderer, JsonLinesRenderer, SarifRenderer
+from scanner.tracing import tracer
 
 LOG_PREFIX = "< file license/copyright check >"
 
-# Define a dictionary of permissive licenses
-PERMISSIVE_LICENSES = [
-    "BSD-3-Clause",
-    "MIT",
-    "Apache-1.0",
-    "Apache-1.1",
-    "Apache-2.0",
-    "BSD-3-Clause-Clear",
-    "FreeBSD-DOC",
-    "Zlib",
-    "BSD-1-Clause",
-    "BSD-2-Clause",
-    "BSD-2-Clause-first-lines",
-    "BSD-2-Clause-Views",
-    "BSD-3-Clause-Sun",
-    "BSD-4-Clause-Shortened",
-    "BSD-3-Clause-Attribution",
-    "BSD-4-Clause",
-    "ISC",
-    "CC0-1.0",
-    "ICU",
-    "LicenseRef-scancode-unicode"
-]
-
-COPYLEFT_LICENSES = [
-    "GPL-1.0-only",
-    "GPL-1.0-or-later",
-    "GPL-2.0-only",
-    "GPL-2.0-or-later",
-    "GPL-3.0-only"
-    "GPL-3.0",
-    "GPL-3.0-or-later",
-    "AGPL-3.0",
-    "LGPL-3.0",
-    "GPL-2.0",
-    "GPL-2.0+",
-    "GPL-2.0-only WITH Linux-syscall-note",
-    "AGPL-1.0-only",
-    "AGPL-1.0-or-later",
-    "LicenseRef-scancode-agpl-2.0",
-    "AGPL-3.0-only",
-    "AGPL-3.0-or-later"
-]
-
-def get_license(repo_name: str) -> str:
+# Options of a local check, by destination; the service checks patches with
+# the options of its own command line, so they cannot be used with --server
+LOCAL_ONLY_OPTIONS = {
+    'git_repo': '--git-repo', 'manifest_in': '--manifest-in', 'manifest_out': '--manifest-out',
+    'shard': '--shard', 'partial_out': '--partial-out', 'streaming': '--streaming',
+    'engine': '--engine', 'scan_tmpdir': '--scan-tmpdir', 'workers': '--workers',
+    'prefilter': '--no-prefilter', 'prefilter_token': '--prefilter-token',
+    'clustering': '--no-clustering', 'cache_dir': '--cache-dir',
+    'cache_max_entries': '--cache-max-entries', 'copyright_transitions': '--copyright-transitions',
+    'policy_file': '--policy-file', 'policy_cache': '--policy-cache',
+}
+
+def get_license(repo_name: str, registry: PolicyRegistry = None) -> str:
     """
-    Search for the repository name in the config file and return its license.
-    the repository name is not found, return the default license (BSD-3-Clause-Clear).
+    Look up the repository in the policy registry and return its license.
+    If the repository is not found, return the default license (BSD-3-Clause-Clear).
 
     Args:
         repo_name (str): The name of the repository.
+        registry (PolicyRegistry): The registry. Defaults to the shipped policy file.
 
     Returns:
         str: The license of the repository.
     """
-    for project in config.data['projects']:
-        if repo_name.endswith(f"/{project['PROJECT_NAME']}") or repo_name == project['PROJECT_NAME']:
-            return project['MARKINGS']
-    # Return the default license if the repository name is not found
-    return "BSD-3-Clause-Clear"
+    registry = registry or load_policy_registry()
+    return registry.lookup(repo_name).markings
+
+
+def combine_results(flagged_license_files: dict, flagged_copyright_files: dict) -> tuple:
+    """
+    Combine the checker results, separating blocking errors from warnings.
+
+    Args:
+        flagged_license_files (dict): Issues found by the LicenseChecker.
+        flagged_copyright_files (dict): Issues found by the CopyrightChecker.
+
+    Returns:
+        tuple: The flagged files (blocking errors) and warning files dictionaries.
+    """
+    flagged_files = {}  # Blocking errors
+    warning_files = {}  # Non-blocking warnings
+
+    for file, issues in flagged_license_files.items():
+        for issue in issues:
+            target = flagged_files if issue.severity is Severity.ERROR else warning_files
+            target.setdefault(file, {'license_issues': [], 'copyright_issues': []})
+            target[file]['license_issues'].append(issue)
+
+    for file, issues in flagged_copyright_files.items():
+        if file in flagged_files:
+            flagged_files[file]['copyright_issues'] = issues
+        else:
+            flagged_files[file] = {'license_issues': [], 'copyright_issues': issues}
+
+    return flagged_files, warning_files
 
 
 def beautify_output(flagged_files: dict, warning_files: dict, license: str, log_prefix: str) -> None:
     """
-    Print the flagged files report in a beautified format.
+    Print the flagged files report in a beautified format and exit.
 
     Args:
         flagged_files (dict): A dictionary of flagged files with blocking issues.
@@ -79,139 +89,234 @@ def beautify_output(flagged_files: dict, warning_files: dict, license: str, log_
         license (str) : The default/top level license of the repo
         log_prefix (str): The prefix to use for logging.
     """
-    # Only show the report header if there are issues to report
-    if not flagged_files and not warning_files:
-        print(f"{log_prefix} ✅ No license or copyright issues detected")
-        sys.exit(0)
-    
-    output = []
-    output.append(f"{log_prefix} ┌───────────────────────────────────────────┐")
-    output.append(f"{log_prefix} │           **Flagged Files Report**         │")
-    output.append(f"{log_prefix} ├───────────────────────────────────────────┤")
-    
-    # Add COMPLIANCE.md reference
-    output.append(f"{log_prefix} │")
-    output.append(f"{log_prefix} │ 📖 For more information, see: COMPLIANCE.md")
-    output.append(f"{log_prefix} │    https://github.com/qualcomm/copyright-license-checker-action/blob/main/COMPLIANCE.md")
-    output.append(f"{log_prefix} ├───────────────────────────────────────────┤")
-
-    # Print blocking errors first
-    if flagged_files:
-        output.append(f"{log_prefix} │")
-        output.append(f"{log_prefix} │ ═══════════════════════════════════════════")
-        output.append(f"{log_prefix} │ 🚨  B L O C K I N G   E R R O R S")
-        output.append(f"{log_prefix} │ ═══════════════════════════════════════════")
-        for file, issues in flagged_files.items():
-            output.append(f"{log_prefix} │")
-            output.append(f"{log_prefix} │ ┌─ 📄 F I L E: {file}")
-            if issues['license_issues']:
-                output.append(f"{log_prefix} │ │")
-                output.append(f"{log_prefix} │ ├─ 🚨 LICENSE ISSUES:")
-                for issue in issues['license_issues']:
-                    output.append(f"{log_prefix} │ │  • {issue}")
-            if issues['copyright_issues']:
-                output.append(f"{log_prefix} │ │")
-                output.append(f"{log_prefix} │ ├─ 🚨 COPYRIGHT ISSUES:")
-                for issue in issues['copyright_issues']:
-                    output.append(f"{log_prefix} │ │  • {issue}")
-            output.append(f"{log_prefix} │ └─────────────────────────────────────────")
-
-    # Print warnings (non-blocking)
-    if warning_files:
-        output.append(f"{log_prefix} │")
-        output.append(f"{log_prefix} │ ═══════════════════════════════════════════")
-        output.append(f"{log_prefix} │ ⚠️   W A R N I N G S  (Non-blocking)")
-        output.append(f"{log_prefix} │ ═══════════════════════════════════════════")
-        for file, issues in warning_files.items():
-            output.append(f"{log_prefix} │")
-            output.append(f"{log_prefix} │ ┌─ 📄 F I L E: {file}")
-            if issues['license_issues']:
-                output.append(f"{log_prefix} │ │")
-                output.append(f"{log_prefix} │ ├─ ⚠️  LICENSE WARNINGS:")
-                for issue in issues['license_issues']:
-                    output.append(f"{log_prefix} │ │  • {issue}")
-            if issues['copyright_issues']:
-                output.append(f"{log_prefix} │ │")
-                output.append(f"{log_prefix} │ ├─ ⚠️  COPYRIGHT WARNINGS:")
-                for issue in issues['copyright_issues']:
-                    output.append(f"{log_prefix} │ │  • {issue}")
-            output.append(f"{log_prefix} │ └─────────────────────────────────────────")
-    
-    output.append(f"{log_prefix} └───────────────────────────────────────────┘")
-
     # Print the entire output block
-    print("\n".join(output))
+    BoxRenderer(log_prefix).finish(flagged_files, warning_files)
 
-    # Only exit with error if there are blocking issues
-    if flagged_files:
-        sys.exit(len(flagged_files))
-    else:
-        sys.exit(0)
+    # Only exit with error if there are blocking issues. The status does not
+    # count the files, as it would wrap past 255.
+    sys.exit(EXIT_BLOCKING if flagged_files else 0)
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+
+    Args:
+        argv (list): The arguments to parse. Defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description="Check a patch for license and copyright issues.")
+    parser.add_argument('patch_file',
+                        help="The patch file to check, or a BASE..HEAD range with --git-repo.")
+    parser.add_argument('repo_name', help="The name of the repository the patch applies to.")
+    parser.add_argument('--git-repo',
+                        help="Read the changes of the patch_file range from this local "
+                             "repository instead of a patch file.")
+    parser.add_argument('--jsonl',
+                        help="Also write the issues to this JSON Lines file as they are found.")
+    parser.add_argument('--sarif',
+                        help="Also write the issues to this SARIF file as they are found.")
+    parser.add_argument('--manifest-out',
+                        help="Write the issues of each path and diff section of this run to "
+                             "this manifest file.")
+    parser.add_argument('--manifest-in',
+                        help="Manifest of a previous run; the issues of unchanged diff sections "
+                             "are carried forward instead of checked again.")
+    parser.add_argument('--server',
+                        help="URL of a running check service (serve.py) to send the patch to; "
+                             "the patch is checked locally if the service cannot answer "
+                             "(default: $LICENSE_CHECKER_SERVER, unless options of a local "
+                             "check are given).")
+    parser.add_argument('--shard', type=parse_shard,
+                        help="Only check shard k of N (written k/N, from 1/N) of the changes, "
+                             "balanced by diff size; see merge.py.")
+    parser.add_argument('--partial-out',
+                        help="Write the issues to this partial result file for merge.py "
+                             "instead of printing the report.")
+    add_check_arguments(parser)
+    args = parser.parse_args(argv)
+    local_options = [option for dest, option in LOCAL_ONLY_OPTIONS.items()
+                     if getattr(args, dest) != parser.get_default(dest)]
+    if args.server is None:
+        if not local_options:
+            args.server = os.environ.get('LICENSE_CHECKER_SERVER')
+    elif local_options:
+        parser.error(f"--server cannot be combined with {', '.join(local_options)}; "
+                     f"the service uses the options of its own command line")
+    return args
+
+
+def add_check_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    Add the options controlling how patches are parsed and scanned.
+
+    Args:
+        parser (argparse.ArgumentParser): The parser to add the options to.
+    """
+    parser.add_argument('--streaming', action='store_true',
+                        help="Parse the patch incrementally instead of loading it into memory.")
+    parser.add_argument('--engine', choices=sorted(ENGINES), default=DEFAULT_ENGINE,
+                        help="How scancode is run: in this process, or as a CLI subprocess over "
+                             "one file per blob (cli) or a few concatenated files (concat).")
+    parser.add_argument('--scan-tmpdir',
+                        help="Directory for the CLI engines' temporary scan files, "
+                             "e.g. a tmpfs mount.")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="Number of processes used for license detection (0 for all CPUs).")
+    parser.add_argument('--no-prefilter', dest='prefilter', action='store_false',
+                        help="Send every added/deleted text to scancode, even without "
+                             "license keywords.")
+    parser.add_argument('--prefilter-token', action='append', default=[],
+                        help="Extra keyword marking text as license-related (repeatable).")
+    parser.add_argument('--no-clustering', dest='clustering', action='store_false',
+                        help="Scan every text, instead of once per template of texts differing "
+                             "only in years, paths and whitespace.")
+    parser.add_argument('--trace', default=os.environ.get('LICENSE_CHECKER_TRACE'),
+                        help="Write per-stage timings to this Chrome trace JSON file "
+                             "(default: $LICENSE_CHECKER_TRACE).")
+    parser.add_argument('--cache-dir',
+                        help="Directory of a persistent cache of scancode results.")
+    parser.add_argument('--cache-max-entries', type=int, default=100000,
+                        help="Number of cached results kept before LRU eviction.")
+    parser.add_argument('--copyright-transitions',
+                        help="JSON file of allowed copyright holder transitions, replacing "
+                             "those of the policy file.")
+    parser.add_argument('--policy-file',
+                        help="JSON or TOML file of the project license policies "
+                             "(default: the shipped scanner/policies.json).")
+    parser.add_argument('--policy-cache',
+                        help="Directory keeping the compiled policy file between runs.")
+
+
+def create_detection_components(args: argparse.Namespace) -> tuple:
+    """
+    Create the license detection engine, prefilter, clusterer and cache from the options.
+
+    Args:
+        args (argparse.Namespace): Options added by add_check_arguments().
+
+    Returns:
+        tuple: The ScancodeEngine, the LicensePrefilter (or None), the
+        TemplateClusterer (or None) and the DetectionCache (or None).
+    """
+    engine = get_engine(args.engine, args.workers, args.scan_tmpdir)
+    tokens = DEFAULT_TRIGGER_TOKENS + tuple(args.prefilter_token)
+
+    prefilter = None
+    if args.prefilter:
+        prefilter = LicensePrefilter(tokens)
+
+    clusterer = None
+    if args.clustering:
+        clusterer = TemplateClusterer(tokens)
+
+    cache = None
+    if args.cache_dir:
+        cache = DetectionCache(args.cache_dir, max_entries=args.cache_max_entries)
+
+    return engine, prefilter, clusterer, cache
 
-def is_uncertain_license_issue(issue: str) -> bool:
+
+def print_detection_stats(prefilter: LicensePrefilter, clusterer: TemplateClusterer,
+                          cache: DetectionCache) -> None:
     """
-    Check if a license issue is ONLY related to uncertain/unknown licenses.
-    Only treats it as a warning if the unknown license is the sole problem.
-    If there are other incompatible licenses, it remains a blocking error.
-    
-    Special case: If the ONLY license is exactly "LicenseRef-scancode-proprietary-license",
-    it's a blocking error. If mixed with other licenses, proceed with normal logic.
-    
-    Uncertain licenses (warnings) include:
-    - LicenseRef-scancode-unknown-*
-    - LicenseRef-scancode-warranty-*
-    - LicenseRef-scancode-proprietary-* (when mixed with other uncertain licenses)
-    - Any other LicenseRef-scancode-* that's not in the known permissive list
-    
+    Print the prefilter, clusterer and cache statistics, closing the cache.
+
     Args:
-        issue (str): The license issue string.
-    
+        prefilter (LicensePrefilter): The prefilter, or None.
+        clusterer (TemplateClusterer): The clusterer, or None.
+        cache (DetectionCache): The cache, or None.
+    """
+    if prefilter is not None:
+        print(f"{LOG_PREFIX} {prefilter.stats()}")
+    if clusterer is not None:
+        print(f"{LOG_PREFIX} {clusterer.stats()}")
+    if cache is not None:
+        cache.close()
+        print(f"{LOG_PREFIX} {cache.stats()}")
+
+
+def check_locally(args: argparse.Namespace, registry: PolicyRegistry, on_issues) -> tuple:
+    """
+    Run the license and copyright checks in this process.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments.
+        registry (PolicyRegistry): The project policies.
+        on_issues (callable): Called with the path and the list of Issue of
+            each flagged file as soon as its verdict is ready.
+
     Returns:
-        bool: True if the issue is ONLY about uncertain licenses, False otherwise.
+        tuple: The flagged license files and flagged copyright files.
     """
-    # Extract the license expression from the issue
-    if "Incompatible license added:" in issue:
-        license_expr = issue.split("Incompatible license added:")[1].strip()
-    elif "License deleted:" in issue and "and license added:" in issue:
-        # For license change issues, check the added license
-        license_expr = issue.split("and license added:")[1].strip()
+    if args.git_repo:
+        patch = GitRange(args.git_repo, args.patch_file)
     else:
-        # For other issue types, check if it contains LicenseRef-scancode
-        return "LicenseRef-scancode-" in issue
-    
-    # Parse the license expression to check if ALL licenses are unknown/uncertain
-    # Remove parentheses and split by AND/OR
-    licenses = []
-    for part in license_expr.replace('(', '').replace(')', '').split(' AND '):
-        for lic in part.split(' OR '):
-            lic = lic.strip()
-            if lic:
-                licenses.append(lic)
-    
-    # Check if all licenses are unknown/uncertain
-    if not licenses:
-        return False
-    
-    # SPECIAL CASE: If the ONLY license is exactly "LicenseRef-scancode-proprietary-license", block it
-    if len(licenses) == 1 and licenses[0] == "LicenseRef-scancode-proprietary-license":
-        return False
-    
-    # A license is considered uncertain if:
-    # 1. It starts with LicenseRef-scancode- AND
-    # 2. It's not in the known permissive list (like LicenseRef-scancode-unicode)
-    def is_uncertain_license(lic: str) -> bool:
-        if not lic.startswith('LicenseRef-scancode-'):
-            return False
-        # Check if it's a known permissive LicenseRef
-        if lic in PERMISSIVE_LICENSES:
-            return False
-        return True
-    
-    # If ALL licenses are uncertain, it's a warning
-    # If ANY license is a known incompatible license (like GPL), it's an error
-    all_uncertain = all(is_uncertain_license(lic) for lic in licenses)
-    
-    return all_uncertain
+        patch = Patch(args.patch_file, streaming=args.streaming)
+    if args.shard or args.partial_out:
+        patch = ShardedPatch(patch, *(args.shard or (1, 1)))
+        print(f"{LOG_PREFIX} {patch.stats()}")
+
+    engine, prefilter, clusterer, cache = create_detection_components(args)
+    permissive_licenses = registry.lookup(args.repo_name).allowed_licenses
+    transitions = load_transition_rules(args.copyright_transitions, registry)
+
+    # Only the changes the previous manifest does not cover are checked
+    manifest = None
+    checked_patch = patch
+    if args.manifest_in or args.manifest_out:
+        scancode_version = cache.scancode_version if cache is not None else get_scancode_version()
+        manifest = ResultManifest(args.manifest_in, manifest_context(
+            scancode_version, permissive_licenses, transitions))
+        checked_patch = IncrementalPatch(patch, manifest)
+
+    license_checker = LicenseChecker(checked_patch, args.repo_name, permissive_licenses,
+                                     cache=cache, engine=engine, prefilter=prefilter,
+                                     clusterer=clusterer)
+    copyright_checker = CopyrightChecker(checked_patch, transitions)
+
+    flagged_license_files, flagged_copyright_files = run_checks(license_checker,
+                                                                copyright_checker, on_issues)
+
+    print_detection_stats(prefilter, clusterer, cache)
+    if manifest is not None:
+        flagged_license_files, flagged_copyright_files = manifest.merge(
+            flagged_license_files, flagged_copyright_files, on_issues)
+        print(f"{LOG_PREFIX} {manifest.stats()}")
+    if args.manifest_out:
+        manifest.write(args.manifest_out)
+    if args.partial_out:
+        write_partial(args.partial_out, patch, flagged_license_files, flagged_copyright_files)
+        print(f"{LOG_PREFIX} Partial result of shard {patch.number}/{patch.count} written to "
+              f"{args.partial_out}")
+    return flagged_license_files, flagged_copyright_files
+
+
+def check_remotely(args: argparse.Namespace, on_issues):
+    """
+    Have the check service run the checks.
+
+    Args:
+        args (argparse.Namespace): The parsed arguments.
+        on_issues (callable): Called with the path and the list of Issue of
+            each flagged file.
+
+    Returns:
+        tuple: The flagged license files and flagged copyright files, or
+        None if the service could not answer.
+    """
+    try:
+        with tracer.span('remote_check'):
+            results = request_check(args.server, args.patch_file, args.repo_name)
+    except OSError as e:
+        print(f"{LOG_PREFIX} Check service unavailable ({e}), checking locally")
+        return None
+
+    for flagged_files in results:
+        for path_name, issues in flagged_files.items():
+            on_issues(path_name, issues)
+    return results
 
 
 def main() -> None:
@@ -221,42 +326,48 @@ def main() -> None:
     # Clamp chatty logging from license_identifier
     logging.basicConfig(level=logging.WARNING)
 
-    patch = Patch(sys.argv[1])
-    repo_name = sys.argv[2]
-    license = get_license(repo_name)
-    if license in PERMISSIVE_LICENSES:
-        allowed_licenses = PERMISSIVE_LICENSES
-    elif license in COPYLEFT_LICENSES:
-        allowed_licenses = COPYLEFT_LICENSES
-    else:
-        allowed_licenses = [license]
+    args = parse_args()
+    if args.trace:
+        tracer.enable()
 
-    license_checker = LicenseChecker(patch, repo_name, allowed_licenses)
-    copyright_checker = CopyrightChecker(patch)
+    repo_name = args.repo_name
+    registry = load_policy_registry(args.policy_file, args.policy_cache)
+    license = registry.lookup(repo_name).markings
 
-    flagged_license_files = license_checker.run()
-    flagged_copyright_files = copyright_checker.run()
+    renderers = []
+    if args.jsonl:
+        renderers.append(JsonLinesRenderer(args.jsonl))
+    if args.sarif:
+        renderers.append(SarifRenderer(args.sarif))
 
-    # Combine flagged files and their issues, separating errors from warnings
-    flagged_files = {}  # Blocking errors
-    warning_files = {}  # Non-blocking warnings
-    
-    for file, issues in flagged_license_files.items():
-        # Separate uncertain license issues (warnings) from real errors
-        error_issues = [issue for issue in issues if not is_uncertain_license_issue(issue)]
-        warning_issues = [issue for issue in issues if is_uncertain_license_issue(issue)]
-        
-        if error_issues:
-            flagged_files[file] = {'license_issues': error_issues, 'copyright_issues': []}
-        if warning_issues:
-            warning_files[file] = {'license_issues': warning_issues, 'copyright_issues': []}
-    
-    for file, issues in flagged_copyright_files.items():
-        if file in flagged_files:
-            flagged_files[file]['copyright_issues'] = issues
-        else:
-            flagged_files[file] = {'license_issues': [], 'copyright_issues': issues}
+    def on_issues(path_name: str, issues: list) -> None:
+        for renderer in renderers:
+            renderer.file_issues(path_name, issues)
+
+    try:
+        results = check_remotely(args, on_issues) if args.server else None
+        if results is None:
+            results = check_locally(args, registry, on_issues)
+        flagged_license_files, flagged_copyright_files = results
+
+        with tracer.span('combine_results'):
+            flagged_files, warning_files = combine_results(flagged_license_files,
+                                                           flagged_copyright_files)
+    except BaseException as e:
+        # Leave complete documents behind, with the issues found so far
+        for renderer in renderers:
+            renderer.abort(e)
+        raise
+    for renderer in renderers:
+        renderer.finish(flagged_files, warning_files)
+
+    if args.trace:
+        tracer.write(args.trace)
+        print(f"{LOG_PREFIX} {tracer.summary()}")
 
+    if args.partial_out:
+        # The merge of every shard's partial result decides the exit status
+        return
     beautify_output(flagged_files, warning_files, license, LOG_PREFIX)
 
 if __name__ == '__main__':
@@ -0,0 +1,68 @@
+"""
+Merge the partial results of a patch checked in shards into its report.
+
+Usage:
+    python main.py big.patch <repo_name> --shard 1/2 --partial-out shard-1.json
+    python main.py big.patch <repo_name> --shard 2/2 --partial-out shard-2.json
+    python merge.py <repo_name> shard-1.json shard-2.json
+"""
+import argparse
+from main import LOG_PREFIX, beautify_output, combine_results
+from scanner.policy_registry import load_policy_registry
+from scanner.report import JsonLinesRenderer, SarifRenderer
+from scanner.sharding import merge_partials
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+
+    Args:
+        argv (list): The arguments to parse. Defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Combine the partial results of every shard into the report of the patch.")
+    parser.add_argument('repo_name', help="The name of the repository the patch applies to.")
+    parser.add_argument('partials', nargs='+',
+                        help="The partial result files written with --partial-out, one per shard.")
+    parser.add_argument('--jsonl', help="Also write the issues to this JSON Lines file.")
+    parser.add_argument('--sarif', help="Also write the issues to this SARIF file.")
+    parser.add_argument('--policy-file',
+                        help="JSON or TOML file of the project license policies "
+                             "(default: the shipped scanner/policies.json).")
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    """
+    Print the report of the merged results and exit with its status.
+    """
+    args = parse_args()
+    try:
+        flagged_license_files, flagged_copyright_files = merge_partials(args.partials)
+    except ValueError as e:
+        raise SystemExit(f"{LOG_PREFIX} {e}")
+
+    renderers = []
+    if args.jsonl:
+        renderers.append(JsonLinesRenderer(args.jsonl))
+    if args.sarif:
+        renderers.append(SarifRenderer(args.sarif))
+    for flagged_files in (flagged_license_files, flagged_copyright_files):
+        for path_name, issues in flagged_files.items():
+            for renderer in renderers:
+                renderer.file_issues(path_name, issues)
+
+    flagged_files, warning_files = combine_results(flagged_license_files, flagged_copyright_files)
+    for renderer in renderers:
+        renderer.finish(flagged_files, warning_files)
+
+    license = load_policy_registry(args.policy_file).lookup(args.repo_name).markings
+    beautify_output(flagged_files, warning_files, license, LOG_PREFIX)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,307 @@
+"""
+Module to audit the license and copyright state of a whole checked-out tree.
+
+Every file of the tree is checked as if a patch added it: its licenses are
+detected and evaluated against the policy like those of an added file, and
+its copyright statements are extracted. The result of each file is appended
+to a baseline manifest in JSON Lines format, one record per file, so an
+interrupted audit resumes from the files already recorded.
+"""
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from scanner.patch import EXCLUDED_SUFFIXES
+from scanner.ignore_config import IGNORE_FILE_NAME, IgnoreConfig
+from scanner.license_scancode import LicenseChecker
+from scanner.copyright_checker import COPYRIGHT_MARKER
+from scanner.tracing import tracer
+
+# Format version of the baseline manifest
+AUDIT_VERSION = 1
+
+# Directories never walked
+SKIPPED_DIRECTORIES = frozenset(('.git',))
+
+# Bytes inspected to tell binary files apart, as git does
+BINARY_CHECK_BYTES = 8000
+
+
+def walk_tree(root: str, ignore_config: IgnoreConfig, workers: int = 8):
+    """
+    List the files of a tree, scanning directories in parallel.
+
+    Excluded directories are pruned without being listed. Files are yielded
+    as their directory is scanned, sorted within the directory.
+
+    Args:
+        root (str): The root directory of the tree.
+        ignore_config (IgnoreConfig): The exclusions, relative to the root.
+        workers (int): Number of directories scanned at the same time.
+
+    Yields:
+        str: The paths of the files that are not excluded, relative to the root.
+    """
+    def scan(directory: str) -> tuple:
+        files = []
+        subdirectories = []
+        with os.scandir(os.path.join(root, directory)) as entries:
+            for entry in entries:
+                path = f"{directory}/{entry.name}" if directory else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    if (entry.name not in SKIPPED_DIRECTORIES
+                            and not ignore_config.is_directory_excluded(path)):
+                        subdirectories.append(path)
+                elif entry.is_file(follow_symlinks=False) and not ignore_config.is_excluded(path):
+                    files.append(path)
+        return sorted(files), subdirectories
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='walk') as executor:
+        pending = {executor.submit(scan, '')}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirectories = future.result()
+                pending.update(executor.submit(scan, path) for path in subdirectories)
+                yield from files
+
+
+def read_tree_file(root: str, path_name: str):
+    """
+    Read the text of a file of the tree.
+
+    Args:
+        root (str): The root directory of the tree.
+        path_name (str): The path of the file, relative to the root.
+
+    Returns:
+        str: The text of the file with newlines translated and without the
+        final newline, like the added lines of a patch adding it, or None
+        for a binary file.
+    """
+    with open(os.path.join(root, path_name), 'rb') as f:
+        data = f.read()
+    if b'\0' in data[:BINARY_CHECK_BYTES]:
+        return None
+
+    text = data.decode('utf-8', errors='replace')
+    if '\r' in text:
+        # Same newline translation as reading a patch in text mode
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    if text.endswith('\n'):
+        text = text[:-1]
+    return text
+
+
+def read_tree_files(root: str, paths: list) -> list:
+    """
+    Read the texts of several files of the tree.
+
+    Args:
+        root (str): The root directory of the tree.
+        paths (list): The paths of the files, relative to the root.
+
+    Returns:
+        list: The text of each file, or None for binary files.
+    """
+    return [read_tree_file(root, path_name) for path_name in paths]
+
+
+class TreeAudit:
+    """
+    Class to audit every file of a checked-out tree.
+
+    Files are processed in chunks: the files of a chunk are read in parallel,
+    detected in a single engine run and their records appended to the
+    manifest, which is flushed after each chunk.
+    """
+
+    def __init__(self, root: str, repo: str, permissive_licenses, manifest_path: str,
+                 resume: bool = False, chunk_size: int = 2000, workers: int = 8,
+                 **detection) -> None:
+        """
+        Initialize the TreeAudit object.
+
+        Args:
+            root (str): The root directory of the tree.
+            repo (str): The repository name.
+            permissive_licenses (iterable): The permissive licenses.
+            manifest_path (str): The baseline manifest to write.
+            resume (bool): Keep the records of an existing manifest and skip
+                their files, instead of starting over.
+            chunk_size (int): Number of files detected per engine run.
+            workers (int): Number of threads walking directories and reading files.
+            **detection: The cache, engine, prefilter and clusterer of the
+                LicenseChecker.
+        """
+        self.root = root
+        self.manifest_path = manifest_path
+        self.resume = resume
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.ignore_config = IgnoreConfig(os.path.join(root, IGNORE_FILE_NAME),
+                                          excluded_suffixes=EXCLUDED_SUFFIXES)
+        self.license_checker = LicenseChecker(None, repo, permissive_licenses, **detection)
+        self.audited = 0
+        self.resumed = 0
+        # IssueKind value -> number of issues, over the whole manifest
+        self.issue_counts = {}
+
+    def load_done(self) -> set:
+        """
+        Read the files already recorded in the manifest.
+
+        A record cut short by an interruption is dropped from the file.
+
+        Returns:
+            set: The paths of the recorded files. Empty if the manifest does
+            not exist or is from another format version.
+        """
+        done = set()
+        if not os.path.exists(self.manifest_path):
+            return done
+
+        with open(self.manifest_path, 'rb+') as f:
+            header = f.readline()
+            try:
+                if json.loads(header).get('version') != AUDIT_VERSION:
+                    return done
+            except ValueError:
+                return done
+
+            end = f.tell()
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b'\n'):
+                    break
+                done.add(record['path'])
+                self.count_issues(record)
+                end += len(line)
+            f.truncate(end)
+        self.resumed = len(done)
+        return done
+
+    def count_issues(self, record: dict) -> None:
+        """
+        Add the issues of a file record to the issue counts.
+
+        Args:
+            record (dict): The record of a file.
+        """
+        for issue in record.get('issues', ()):
+            self.issue_counts[issue['kind']] = self.issue_counts.get(issue['kind'], 0) + 1
+
+    def audit_chunk(self, paths: list, texts: list, on_record) -> None:
+        """
+        Detect and evaluate the licenses and copyrights of a chunk of files.
+
+        Each file is checked as a patch adding it would be: its whole text is
+        the added text of the change.
+
+        Args:
+            paths (list): The paths of the files, relative to the root.
+            texts (list): The text of each file, or None for binary files.
+            on_record (callable): Called with the record of each file.
+        """
+        source_files = [{'path_name': path_name, 'change_type': 'ADDED'}
+                        for path_name, text in zip(paths, texts) if text is not None]
+        blobs = (((index, 'added'), text)
+                 for index, text in enumerate(text for text in texts if text is not None)
+                 if text)
+        with tracer.span('audit_chunk', files=len(paths)):
+            license_results = self.license_checker.detect_blobs(blobs)
+            flagged_files = self.license_checker.evaluate(source_files, license_results)
+
+        index = 0
+        for path_name, text in zip(paths, texts):
+            record = {'path': path_name, 'binary': text is None}
+            if text is not None:
+                record['licenses'] = license_results.get((index, 'added'), [])
+                record['copyrights'] = [line.strip() for line in text.split('\n')
+                                        if COPYRIGHT_MARKER in line] \
+                    if COPYRIGHT_MARKER in text else []
+                record['issues'] = [issue.to_dict() for issue in flagged_files.get(path_name, ())]
+                index += 1
+            on_record(record)
+        self.audited += len(paths)
+
+    def run(self) -> int:
+        """
+        Audit every file of the tree that is not yet in the manifest.
+
+        Returns:
+            int: The number of files audited by this run.
+        """
+        done = self.load_done() if self.resume else set()
+        mode = 'a' if done else 'w'
+
+        with open(self.manifest_path, mode, encoding='utf-8') as manifest, \
+                ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='read') as executor:
+            if mode == 'w':
+                manifest.write(json.dumps({'version': AUDIT_VERSION, 'root': self.root,
+                                           'repo': self.license_checker.repo}) + "\n")
+
+            def on_record(record: dict) -> None:
+                self.count_issues(record)
+                manifest.write(json.dumps(record) + "\n")
+
+            # The files of a chunk are read while the previous chunk is detected
+            previous = None
+            for chunk in self.iter_chunks(done):
+                step = -(-len(chunk) // self.workers)
+                reads = [executor.submit(read_tree_files, self.root, chunk[start:start + step])
+                         for start in range(0, len(chunk), step)]
+                if previous is not None:
+                    self.audit_reads(*previous, on_record)
+                    manifest.flush()
+                previous = chunk, reads
+            if previous is not None:
+                self.audit_reads(*previous, on_record)
+        return self.audited
+
+    def audit_reads(self, paths: list, reads: list, on_record) -> None:
+        """
+        Wait for the files of a chunk to be read, then audit them.
+
+        Args:
+            paths (list): The paths of the files, relative to the root.
+            reads (list): The futures of read_tree_files() over consecutive
+                slices of the paths.
+            on_record (callable): Called with the record of each file.
+        """
+        texts = [text for read in reads for text in read.result()]
+        self.audit_chunk(paths, texts, on_record)
+
+    def iter_chunks(self, done: set):
+        """
+        Split the files of the tree that are not yet in the manifest into chunks.
+
+        Args:
+            done (set): The paths of the files already in the manifest.
+
+        Yields:
+            list: Up to chunk_size paths, relative to the root.
+        """
+        chunk = []
+        for path_name in walk_tree(self.root, self.ignore_config, self.workers):
+            if path_name in done:
+                continue
+            chunk.append(path_name)
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def stats(self) -> str:
+        """
+        Summarize the audit.
+
+        Returns:
+            str: A one-line summary.
+        """
+        issues = ", ".join(f"{count} {kind}" for kind, count in sorted(self.issue_counts.items()))
+        return (f"audit: {self.audited} files audited, {self.resumed} resumed from the manifest; "
+                f"issues: {issues or 'none'}")
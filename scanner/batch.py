@@ -0,0 +1,159 @@
+"""
+Module to check a series of patches with a single license detection pass.
+"""
+import hashlib
+import os
+from collections import defaultdict
+from scanner.patch import Patch
+from scanner.license_scancode import LicenseChecker
+from scanner.copyright_checker import CopyrightChecker
+from scanner.copyright_transitions import TransitionRules, load_transition_rules
+from scanner.pipeline import run_concurrently, share_hunk_lines
+from scanner.tracing import tracer
+
+# Files picked up when a directory of patches is given
+PATCH_SUFFIXES = ('.patch', '.diff')
+
+
+def find_patch_files(paths: list) -> list:
+    """
+    Expand a list of patch files and directories into patch files.
+
+    Directories contribute their *.patch and *.diff files, sorted by name so
+    that a `git format-patch` series keeps its order.
+
+    Args:
+        paths (list): Patch files and/or directories.
+
+    Returns:
+        list: The patch file paths.
+    """
+    patch_files = []
+    for path in paths:
+        if os.path.isdir(path):
+            patch_files.extend(
+                os.path.join(path, name) for name in sorted(os.listdir(path))
+                if name.endswith(PATCH_SUFFIXES)
+            )
+        else:
+            patch_files.append(path)
+    return patch_files
+
+
+class BatchChecker:
+    """
+    Checks many patches at once.
+
+    The added/deleted text of every patch is deduplicated by content hash and
+    detected in one engine run, so a text repeated across a series (e.g. the
+    same header in every commit) is scanned once. Each patch still gets its
+    own results.
+    """
+
+    def __init__(self, patch_files: list, repo: str, permissive_licenses,
+                 streaming: bool = False, transitions: TransitionRules = None,
+                 **detection) -> None:
+        """
+        Initialize the BatchChecker object.
+
+        Args:
+            patch_files (list): The patch files to check.
+            repo (str): The repository name.
+            permissive_licenses (iterable): The permissive licenses.
+            streaming (bool): Parse the patches incrementally.
+            transitions (TransitionRules): The allowed copyright holder
+                transitions of every CopyrightChecker.
+            **detection: The cache, engine, prefilter and clusterer passed to every
+                LicenseChecker.
+        """
+        self.patch_files = patch_files
+        self.license_checkers = []
+        self.copyright_checkers = []
+        transitions = transitions or load_transition_rules()
+        for patch_file in patch_files:
+            patch = Patch(patch_file, streaming=streaming)
+            self.license_checkers.append(
+                LicenseChecker(patch, repo, permissive_licenses, **detection))
+            self.copyright_checkers.append(CopyrightChecker(patch, transitions))
+        self.unique_blobs = 0
+        self.total_blobs = 0
+
+    def detect(self, source_files: list) -> list:
+        """
+        Detect the licenses of every patch in a single shared pass.
+
+        Args:
+            source_files (list): One empty list per patch; each receives the
+                path and change type of the patch's source file changes.
+
+        Returns:
+            list: One dictionary per patch mapping
+            (change_index, content_type) -> licenses.
+        """
+        # Content hash -> (patch index, blob key) of every copy of the text
+        owners = defaultdict(list)
+
+        def iter_unique_blobs():
+            for index, checker in enumerate(self.license_checkers):
+                changes = checker.iter_source_files(source_files[index])
+                for key, text in checker.split_blobs(changes):
+                    self.total_blobs += 1
+                    digest = hashlib.sha1(text.encode('utf-8', 'surrogatepass')).digest()
+                    first = digest not in owners
+                    owners[digest].append((index, key))
+                    if first:
+                        self.unique_blobs += 1
+                        yield digest, text
+
+        # Detection settings are shared, so any checker can run the pass
+        detected = self.license_checkers[0].detect_blobs(iter_unique_blobs())
+
+        results = [{} for _ in self.license_checkers]
+        for digest, licenses in detected.items():
+            for index, key in owners[digest]:
+                results[index][key] = licenses
+        return results
+
+    def run(self) -> list:
+        """
+        Run the license and copyright checkers over every patch.
+
+        Returns:
+            list: One (patch file, flagged license files, flagged copyright
+            files) tuple per patch, in order.
+        """
+        if not self.patch_files:
+            return []
+
+        source_files = [[] for _ in self.license_checkers]
+
+        def detect() -> list:
+            with tracer.span('batch_license_detect', patches=len(self.patch_files)):
+                return self.detect(source_files)
+
+        # The copyright checks run while scancode works on the shared pass, in
+        # a thread if scancode runs in other processes, else in a forked one
+        in_thread = self.license_checkers[0].engine.detects_out_of_process
+        if in_thread:
+            for license_checker, copyright_checker in zip(self.license_checkers,
+                                                          self.copyright_checkers):
+                share_hunk_lines(license_checker, copyright_checker)
+        license_results, copyright_results = run_concurrently(
+            detect, lambda: [checker.run() for checker in self.copyright_checkers], in_thread)
+
+        results = []
+        for index, patch_file in enumerate(self.patch_files):
+            flagged_license_files = self.license_checkers[index].evaluate(
+                source_files[index], license_results[index])
+            results.append((patch_file, flagged_license_files, copyright_results[index]))
+        return results
+
+    def stats(self) -> str:
+        """
+        Summarize the deduplication.
+
+        Returns:
+            str: A one-line summary.
+        """
+        return (f"batch: {len(self.patch_files)} patches, "
+                f"{self.unique_blobs} unique of {self.total_blobs} blobs")
@@ -0,0 +1,126 @@
+"""
+Module to scan repeated license headers once per template.
+
+Mass header rewrites (relicensing, header normalization) add the same header
+to thousands of files, differing only in years, file names and layout. Texts
+are reduced to a template by masking those parts; only the first text of
+each template is scanned and its licenses are given to the other members.
+"""
+import hashlib
+import re
+from scanner.prefilter import DEFAULT_TRIGGER_TOKENS, LicensePrefilter
+
+# A year, e.g. the "2019" and "2024" of "2019-2024"
+YEAR_RE = re.compile(r'\b(?:19|20)\d{2}\b')
+
+# A path or file name, e.g. "src/foo.c", "foo.py" or "@file bar.h"
+PATH_RE = re.compile(r'\S*/\S*|\b[\w.-]+\.(?:c|cc|cpp|h|hh|hpp|py|js|ts|java|kt|kts|go|rb|'
+                     r'rs|swift|sh|S|s|dts|dtsi|txt)\b')
+
+# The name of a file holding license terms, e.g. "COPYING" or "NOTICE.txt"; a
+# masked path naming one can change the licenses of the text
+LICENSE_FILE_RE = re.compile(r'(?<![A-Za-z0-9])(?:COPYING|COPYRIGHT|LICEN[CS]E|NOTICE|PATENTS)'
+                             r'(?![A-Za-z0-9])', re.IGNORECASE)
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+class TemplateClusterer:
+    """
+    Groups texts by template and fans the verdict of each template out.
+
+    A text is only clustered when none of its masked parts looks
+    license-related (e.g. a path like "LICENSES/GPL-2.0", a license file
+    name like "COPYING" or a license URL); otherwise it is scanned on its
+    own, as the masked part could change its licenses.
+    """
+
+    def __init__(self, tokens: tuple = DEFAULT_TRIGGER_TOKENS) -> None:
+        """
+        Initialize the TemplateClusterer object.
+
+        Args:
+            tokens (tuple): The license keywords a masked part must not contain.
+        """
+        self.relevant_pattern = LicensePrefilter(tokens).pattern
+        self.members = {}
+        self.blobs = 0
+        self.clusters = 0
+        self.unclustered = 0
+
+    def template(self, text: str):
+        """
+        Reduce a text to its template.
+
+        Args:
+            text (str): The text.
+
+        Returns:
+            bytes: The digest of the template, or None if a masked part is
+            license-related.
+        """
+        masked = []
+
+        def mask(match, placeholder: str) -> str:
+            masked.append(match.group(0))
+            return placeholder
+
+        template = YEAR_RE.sub(lambda match: mask(match, '<year>'), text)
+        template = PATH_RE.sub(lambda match: mask(match, '<path>'), template)
+        if masked:
+            masked_text = "\n".join(masked)
+            if self.relevant_pattern.search(masked_text) or LICENSE_FILE_RE.search(masked_text):
+                return None
+        template = WHITESPACE_RE.sub(' ', template).strip()
+        return hashlib.sha1(template.encode('utf-8', 'surrogatepass')).digest()
+
+    def representatives(self, blobs):
+        """
+        Keep the first text of each template, recording the others.
+
+        Args:
+            blobs (iterable): Pairs of (key, text) to scan.
+
+        Yields:
+            tuple: The (key, text) pairs that need a scan.
+        """
+        # Template digest -> key of its representative
+        representatives = {}
+        for key, text in blobs:
+            self.blobs += 1
+            template = self.template(text)
+            if template is None:
+                self.unclustered += 1
+                yield key, text
+            elif template in representatives:
+                self.members[key] = representatives[template]
+            else:
+                self.clusters += 1
+                representatives[template] = key
+                yield key, text
+
+    def fan_out(self, detected: dict) -> dict:
+        """
+        Give every clustered text the licenses of its representative.
+
+        Args:
+            detected (dict): Dictionary mapping the representatives' keys -> licenses.
+
+        Returns:
+            dict: Dictionary mapping the keys of every text -> licenses.
+        """
+        for key, representative in self.members.items():
+            if representative in detected:
+                detected[key] = detected[representative]
+        self.members = {}
+        return detected
+
+    def stats(self) -> str:
+        """
+        Summarize the clustering.
+
+        Returns:
+            str: A one-line summary.
+        """
+        return (f"template clustering: {self.blobs} blobs in {self.clusters} templates, "
+                f"{self.unclustered} scanned on their own")
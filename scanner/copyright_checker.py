@@ -1,23 +1,52 @@
-import re
 from scanner.patch import Patch
+from scanner.hunks import HunkLines, get_hunk_lines
+from scanner.copyright_transitions import TransitionRules, load_transition_rules
+from scanner.issues import Issue, IssueKind
+from scanner.tracing import tracer
 
 """
 Module to check for copyright changes in a patch file.
 """
 
+# Lines containing this marker are compared between the old and new file
+COPYRIGHT_MARKER = 'Copyright'
+
+
+class _NonAlphaTable(dict):
+    """
+    str.translate() table deleting every non-alphabetic character.
+
+    Verdicts are computed per code point on first use, so the table only
+    grows with the characters actually seen.
+    """
+
+    def __missing__(self, code_point: int):
+        value = code_point if chr(code_point).isalpha() else None
+        self[code_point] = value
+        return value
+
+
+NON_ALPHA_TABLE = _NonAlphaTable()
+
 class CopyrightChecker:
     """
     Class to check for copyright changes in a patch file.
     """
 
-    def __init__(self, patch: Patch) -> None:
+    def __init__(self, patch: Patch, transitions: TransitionRules = None) -> None:
         """
         Initialize the CopyrightChecker object.
 
         Args:
             patch (Patch): The patch file to check.
+            transitions (TransitionRules): The allowed copyright holder
+                transitions. Defaults to the rules of the shipped policy file.
         """
         self.patch = patch
+        self.transitions = transitions or load_transition_rules()
+        # Whether the license checker takes the tokenized lines of the same
+        # changes, concurrently; set when the checks run in threads
+        self.share_hunk_lines = False
 
     def normalize_string(self, s: str) -> str:
         """
@@ -29,7 +58,7 @@ class CopyrightChecker:
         Returns:
             str: The normalized string.
         """
-        return ''.join(filter(str.isalpha, s))
+        return s.translate(NON_ALPHA_TABLE)
 
     def _check_allowed_transitions(self, deleted_copyrights_set: dict, 
                                    added_copyrights: list) -> set:
@@ -43,63 +72,63 @@ class CopyrightChecker:
         Returns:
             set: Set of normalized deleted copyrights that are part of allowed transitions.
         """
-        allowed = set()
-        
-        # Define the allowed transition patterns
-        deleted_pattern = "Qualcomm Innovation Center, Inc. All rights"
-        added_pattern = "Qualcomm Technologies, Inc. and/or its subsidiaries"
-        
-        # Check if any added copyright contains the allowed pattern
-        has_allowed_addition = any(
-            added_pattern in original for original, _ in added_copyrights
-        )
-        
-        if has_allowed_addition:
-            # Check deleted copyrights for the pattern
-            for normalized, original in deleted_copyrights_set.items():
-                if deleted_pattern in original:
-                    allowed.add(normalized)
-        
-        return allowed
-
-    def detect_copyright_changes(self, content: str) -> tuple:
+        return self.transitions.allowed(deleted_copyrights_set, added_copyrights)
+
+    def detect_copyright_changes(self, hunk_lines: HunkLines) -> tuple:
         """
-        Detect copyright changes in the content.
+        Detect copyright changes in the added and deleted lines of a change.
 
         Args:
-            content (str): The content to check.
+            hunk_lines (HunkLines): The tokenized lines of the change.
 
         Returns:
             tuple: A tuple of added and deleted copyrights.
         """
-        if not isinstance(content, (str, bytes)):
-            return [], []
-
+        # Most changes have no copyright line; skip building their views
         added_copyrights = [
-            (line[1:], self.normalize_string(line[1:]))
-            for line in re.findall(r"^\+.*Copyright.*", content, re.MULTILINE)
-        ]
+            (text, self.normalize_string(text))
+            for _, text in hunk_lines.added if COPYRIGHT_MARKER in text
+        ] if COPYRIGHT_MARKER in hunk_lines.added_text() else []
         deleted_copyrights = [
-            (line[1:], self.normalize_string(line[1:]))
-            for line in re.findall(r"^-.*Copyright.*", content, re.MULTILINE)
-        ]
+            (text, self.normalize_string(text))
+            for _, text in hunk_lines.deleted if COPYRIGHT_MARKER in text
+        ] if COPYRIGHT_MARKER in hunk_lines.deleted_text() else []
         return added_copyrights, deleted_copyrights
 
-    def run(self) -> dict:
+    def run(self, on_issues=None) -> dict:
         """
         Run the copyright checker.
 
+        Args:
+            on_issues (callable): Optional; called with the path and the list
+                of Issue of each flagged file as soon as its verdict is ready.
+
         Returns:
-            dict: A dictionary of flagged files.
+            dict: A dictionary mapping flagged file paths to lists of Issue.
         """
-        source_files = [
-            change for change in self.patch.changes
+        with tracer.span('copyright_check'):
+            return self._run(on_issues)
+
+    def _run(self, on_issues=None) -> dict:
+        """
+        Check every source file of the patch for copyright deletions.
+
+        Args:
+            on_issues (callable): Optional; called with the path and the list
+                of Issue of each flagged file as soon as its verdict is ready.
+
+        Returns:
+            dict: A dictionary mapping flagged file paths to lists of Issue.
+        """
+        source_files = (
+            change for change in self.patch.iter_changes()
             if change['file_type'] == 'source'
-        ]
+        )
 
         flagged_files = {}
         for change in source_files:
-            added_copyrights, deleted_copyrights = self.detect_copyright_changes(change['content'])
+            added_copyrights, deleted_copyrights = self.detect_copyright_changes(
+                get_hunk_lines(change, self.share_hunk_lines))
 
             issues = []
             if change['change_type'] == 'MODIFIED':
@@ -126,8 +155,11 @@ class CopyrightChecker:
                     original_flagged_changes = [
                         deleted_copyrights_set[change] for change in flagged_changes
                     ]
-                    issues.append(f"Copyright deletions detected: {original_flagged_changes}")
+                    issues.append(Issue(change['path_name'], IssueKind.COPYRIGHT_DELETED,
+                                        copyrights=original_flagged_changes))
                 if issues:
                     flagged_files[change['path_name']] = issues
+                    if on_issues is not None:
+                        on_issues(change['path_name'], issues)
 
         return flagged_files
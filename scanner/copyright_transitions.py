@@ -0,0 +1,169 @@
+"""
+Module to decide which copyright deletions are allowed holder transitions.
+
+A transition rule allows deleting a copyright line matching its FROM pattern
+when the same file adds a copyright line matching its TO pattern, e.g. after
+an entity rename. Rules come from the policy file (see scanner.policy_registry)
+or a JSON file of the same shape:
+
+    {"copyright_transitions": [{"FROM": "Old Corp", "TO": "New Corp"}]}
+
+Patterns are literal substrings unless the rule sets "REGEX": true.
+"""
+import json
+import re
+from scanner.policy_registry import load_policy_registry
+
+
+class _PatternSet:
+    """
+    The patterns of one side of the rules, compiled into a single matcher.
+
+    The matcher is a plain alternation without groups, which the regex engine
+    scans much faster than one with a group per pattern. It rejects most lines
+    in a single scan; only the lines it matches are tested against each
+    pattern, so overlapping and nested holders (e.g. "Acme" and "Acme Corp")
+    are all found, as with a substring test per rule.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize an empty pattern set.
+        """
+        # Literal text -> pattern id
+        self.literals = {}
+        # Regular expression -> (compiled expression, pattern id)
+        self.expressions = {}
+        self.matcher = None
+
+    def add(self, pattern: str, regex: bool) -> int:
+        """
+        Add a pattern, unless it is already in the set.
+
+        Args:
+            pattern (str): The pattern.
+            regex (bool): Whether the pattern is a regular expression.
+
+        Returns:
+            int: The id of the pattern.
+        """
+        if regex:
+            if pattern not in self.expressions:
+                self.expressions[pattern] = (re.compile(pattern), self._next_id())
+            return self.expressions[pattern][1]
+        if pattern not in self.literals:
+            self.literals[pattern] = self._next_id()
+        return self.literals[pattern]
+
+    def _next_id(self) -> int:
+        return len(self.literals) + len(self.expressions)
+
+    def compile(self) -> None:
+        """
+        Compile every pattern into the matcher.
+        """
+        alternatives = [re.escape(literal) for literal in self.literals]
+        alternatives.extend(f"(?:{expression})" for expression in self.expressions)
+        self.matcher = re.compile("|".join(alternatives)) if alternatives else None
+
+    def find(self, text: str) -> set:
+        """
+        Find the patterns matching a copyright line.
+
+        Args:
+            text (str): The copyright line.
+
+        Returns:
+            set: The ids of the matching patterns.
+        """
+        if self.matcher is None or not self.matcher.search(text):
+            return set()
+        found = {pattern_id for literal, pattern_id in self.literals.items() if literal in text}
+        found.update(pattern_id for expression, pattern_id in self.expressions.values()
+                     if expression.search(text))
+        return found
+
+
+class TransitionRules:
+    """
+    Compiled copyright transition rules.
+
+    All FROM patterns are compiled into one matcher and all TO patterns into
+    another, so each copyright line is classified with a single regex scan,
+    however many rules are configured.
+    """
+
+    def __init__(self, rules: list) -> None:
+        """
+        Compile the rules.
+
+        Args:
+            rules (list): Dictionaries with FROM and TO patterns and an
+                optional REGEX flag.
+
+        Raises:
+            ValueError: If a rule lacks a FROM or TO pattern.
+        """
+        self.rules = list(rules)
+        self.from_patterns = _PatternSet()
+        self.to_patterns = _PatternSet()
+        # FROM pattern id -> TO pattern ids it may transition to
+        self.targets = {}
+        for rule in self.rules:
+            if not rule.get('FROM') or not rule.get('TO'):
+                raise ValueError(f"Copyright transition rule needs FROM and TO: {rule}")
+            regex = bool(rule.get('REGEX'))
+            from_id = self.from_patterns.add(rule['FROM'], regex)
+            to_id = self.to_patterns.add(rule['TO'], regex)
+            self.targets.setdefault(from_id, set()).add(to_id)
+
+        self.from_patterns.compile()
+        self.to_patterns.compile()
+
+    def allowed(self, deleted_copyrights_set: dict, added_copyrights: list) -> set:
+        """
+        Find the deleted copyrights that are part of an allowed transition.
+
+        Args:
+            deleted_copyrights_set (dict): Dictionary of normalized deleted copyrights.
+            added_copyrights (list): List of tuples (original, normalized) added copyrights.
+
+        Returns:
+            set: Set of normalized deleted copyrights that are part of allowed transitions.
+        """
+        if not self.targets:
+            return set()
+
+        added_targets = set()
+        for original, _ in added_copyrights:
+            added_targets |= self.to_patterns.find(original)
+        if not added_targets:
+            return set()
+
+        allowed = set()
+        for normalized, original in deleted_copyrights_set.items():
+            for from_id in self.from_patterns.find(original):
+                if not self.targets[from_id].isdisjoint(added_targets):
+                    allowed.add(normalized)
+                    break
+        return allowed
+
+
+def load_transition_rules(path: str = None, registry=None) -> TransitionRules:
+    """
+    Load the copyright transition rules.
+
+    Args:
+        path (str): Optional JSON file with a "copyright_transitions" list.
+        registry (PolicyRegistry): The policy registry whose rules are used
+            without a file. Defaults to the shipped policy file.
+
+    Returns:
+        TransitionRules: The compiled rules.
+    """
+    if path is None:
+        registry = registry or load_policy_registry()
+        return TransitionRules(registry.copyright_transitions)
+
+    with open(path, 'r', encoding='utf-8') as f:
+        return TransitionRules(json.load(f).get('copyright_transitions', []))
@@ -0,0 +1,180 @@
+"""
+Module to persist scancode detection results across runs.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from importlib import metadata
+
+
+def get_scancode_version() -> str:
+    """
+    Get the installed scancode-toolkit version.
+
+    Returns:
+        str: The version string, or 'unknown' if scancode is not installed.
+    """
+    try:
+        return metadata.version('scancode-toolkit')
+    except metadata.PackageNotFoundError:
+        return 'unknown'
+
+
+def detection_key(text: str, scancode_version: str) -> str:
+    """
+    Compute the key identifying the detection result of a scanned text.
+
+    Args:
+        text (str): The text handed to scancode.
+        scancode_version (str): The scancode-toolkit version detecting it.
+
+    Returns:
+        str: The hex digest identifying the text and scancode version.
+    """
+    digest = hashlib.sha256(scancode_version.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(text.encode('utf-8', 'surrogatepass'))
+    return digest.hexdigest()
+
+
+class DetectionCache:
+    """
+    Content-addressed, size-bounded LRU cache of scancode detection results.
+
+    Entries are keyed by a hash of the scanned text and the scancode version, so
+    a rebased or force-pushed PR only sends text that was never scanned before
+    to scancode, and upgrading scancode invalidates every entry.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = 100000,
+                 scancode_version: str = None) -> None:
+        """
+        Open (or create) the cache database.
+
+        Args:
+            cache_dir (str): Directory holding the cache database.
+            max_entries (int): Number of entries kept before the least recently
+                used ones are evicted.
+            scancode_version (str): Version mixed into every key. Defaults to
+                the installed scancode-toolkit version.
+        """
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, 'scancode_cache.sqlite3')
+        self.max_entries = max_entries
+        self.scancode_version = scancode_version or get_scancode_version()
+        self.hits = 0
+        self.misses = 0
+        # Keys whose last use is recorded on the next commit, so lookups
+        # during a detection run do not hold the database's write lock
+        self._used = set()
+
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS detections ("
+            "key TEXT PRIMARY KEY, licenses TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS detections_last_used ON detections (last_used)"
+        )
+        self.connection.commit()
+
+    def key(self, text: str) -> str:
+        """
+        Compute the cache key of a scanned text.
+
+        Args:
+            text (str): The text handed to scancode.
+
+        Returns:
+            str: The hex digest identifying the text and scancode version.
+        """
+        return detection_key(text, self.scancode_version)
+
+    def get(self, key: str):
+        """
+        Look up a detection result.
+
+        Args:
+            key (str): The key returned by key().
+
+        Returns:
+            The cached licenses, or None on a miss.
+        """
+        row = self.connection.execute(
+            "SELECT licenses FROM detections WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._used.add(key)
+        return json.loads(row[0])
+
+    def put(self, key: str, licenses) -> None:
+        """
+        Store a detection result.
+
+        Args:
+            key (str): The key returned by key().
+            licenses: The licenses detected by scancode.
+        """
+        self.connection.execute(
+            "INSERT OR REPLACE INTO detections (key, licenses, last_used) VALUES (?, ?, ?)",
+            (key, json.dumps(licenses), time.time())
+        )
+
+    def commit(self) -> None:
+        """
+        Record the last use of the entries found since the last commit and
+        commit pending writes.
+
+        Other connections to the database (e.g. of the other workers of the
+        check service) cannot write until then, so call it once the results
+        of a run are stored.
+        """
+        now = time.time()
+        self.connection.executemany(
+            "UPDATE detections SET last_used = ? WHERE key = ?",
+            ((now, key) for key in self._used)
+        )
+        self._used.clear()
+        self.connection.commit()
+
+    def evict(self) -> int:
+        """
+        Drop the least recently used entries above max_entries.
+
+        Returns:
+            int: The number of evicted entries.
+        """
+        count = self.connection.execute("SELECT COUNT(*) FROM detections").fetchone()[0]
+        excess = count - self.max_entries
+        if excess <= 0:
+            return 0
+
+        self.connection.execute(
+            "DELETE FROM detections WHERE key IN "
+            "(SELECT key FROM detections ORDER BY last_used ASC LIMIT ?)", (excess,)
+        )
+        return excess
+
+    def close(self) -> None:
+        """
+        Evict stale entries, commit pending writes and close the database.
+        """
+        self.commit()
+        self.evict()
+        self.connection.commit()
+        self.connection.close()
+
+    def stats(self) -> str:
+        """
+        Summarize cache usage.
+
+        Returns:
+            str: A one-line hit/miss summary.
+        """
+        return f"scancode cache: {self.hits} hits, {self.misses} misses"
@@ -0,0 +1,209 @@
+"""
+Module to read the changes of a revision range straight from a git repository.
+"""
+import os
+import subprocess
+from scanner.ignore_config import IGNORE_FILE_NAME, IgnoreConfig
+from scanner.patch import EXCLUDED_SUFFIXES, iter_diff_changes
+from scanner.tracing import tracer
+
+# Object ID of a missing blob in `git diff --raw`, e.g. for an added file
+NULL_BLOB = '0' * 40
+
+# Paths (or rename pairs) diffed per git invocation, to stay below the
+# command line length limit
+PATHSPECS_PER_DIFF = 500
+
+
+class GitRange:
+    """
+    Class to represent the changes of a `base..head` range of a local repository.
+
+    It offers the same iter_changes()/changes interface as Patch, without a
+    patch file: the changed paths are listed with `git diff --raw -z`,
+    excluded paths are dropped, and only the remaining paths are diffed, in
+    streamed `git diff` runs. Binary files are reported by git without their
+    content, so it is never read. Every change also carries the old and new
+    blob object IDs.
+    """
+
+    def __init__(self, repo_path: str, revision_range: str) -> None:
+        """
+        Initialize the GitRange object.
+
+        Args:
+            repo_path (str): The path of the local repository.
+            revision_range (str): The range to check, e.g. "origin/main..HEAD".
+        """
+        self.repo_path = repo_path
+        self.revision_range = revision_range
+        self.streaming = True
+        self.ignore_config = IgnoreConfig(os.path.join(repo_path, IGNORE_FILE_NAME),
+                                          excluded_suffixes=EXCLUDED_SUFFIXES)
+        self._changes = None
+        self._pathspecs = None
+
+    def git(self, *args) -> list:
+        """
+        Build a git command running in the repository.
+
+        Args:
+            *args: The git subcommand and its arguments.
+
+        Returns:
+            list: The command.
+        """
+        return ['git', '-C', self.repo_path, '-c', 'core.quotepath=off', '--literal-pathspecs',
+                *args]
+
+    def is_skipped(self, path_name: str) -> bool:
+        """
+        Check if a file is excluded from the checks.
+
+        Args:
+            path_name (str): The path of the changed file.
+
+        Returns:
+            bool: True if the file matches a hardcoded or config-based exclusion.
+        """
+        return self.ignore_config.is_excluded(path_name)
+
+    def read_raw(self) -> list:
+        """
+        List the changed files of the range.
+
+        Returns:
+            list: One (status, old blob, new blob, old path, new path) tuple per
+            changed file; the old path differs from the new one for renames.
+        """
+        with tracer.span('git_diff_raw'):
+            output = subprocess.run(
+                self.git('diff', '--raw', '-z', '-M', '--no-abbrev', self.revision_range),
+                check=True, capture_output=True
+            ).stdout.decode('utf-8', 'surrogateescape')
+
+        entries = []
+        fields = output.split('\0')
+        position = 0
+        while position < len(fields) - 1:
+            _, _, old_blob, new_blob, status = fields[position].lstrip(':').split(' ')
+            if status[0] in ('R', 'C'):
+                old_path, new_path = fields[position + 1], fields[position + 2]
+                position += 3
+            else:
+                old_path = new_path = fields[position + 1]
+                position += 2
+            entries.append((status[0], old_blob, new_blob, old_path, new_path))
+        return entries
+
+    def list_pathspecs(self) -> tuple:
+        """
+        List the changed paths that are not excluded, once per range.
+
+        Returns:
+            tuple: The old and new blob IDs of each new path, the pathspecs
+            of each git invocation, and the set of paths whose file type
+            changed (e.g. a file replaced by a symlink).
+        """
+        if self._pathspecs is not None:
+            return self._pathspecs
+
+        blob_ids = {}
+        type_changes = set()
+        pathspec_groups = []
+        for status, old_blob, new_blob, old_path, new_path in self.read_raw():
+            if self.is_skipped(new_path):
+                tracer.count('files_skipped')
+                continue
+            blob_ids[new_path] = (old_blob, new_blob)
+            if status == 'T':
+                type_changes.add(new_path)
+            # Both sides of a rename are needed for git to pair them up
+            pathspec_groups.append((new_path, old_path) if old_path != new_path else (new_path,))
+
+        self._pathspecs = blob_ids, [
+            [path for group in pathspec_groups[start:start + PATHSPECS_PER_DIFF] for path in group]
+            for start in range(0, len(pathspec_groups), PATHSPECS_PER_DIFF)
+        ], type_changes
+        return self._pathspecs
+
+    def change_sizes(self) -> list:
+        """
+        Measure the diff of each change without diffing the files.
+
+        Returns:
+            list: The number of added and deleted lines of each change, from
+            `git diff --numstat` (0 for binary files), in the order of
+            iter_changes().
+        """
+        _, pathspec_lists, type_changes = self.list_pathspecs()
+        sizes = []
+        for pathspecs in pathspec_lists:
+            output = subprocess.run(
+                self.git('diff', '--numstat', '-z', '-M', self.revision_range, '--', *pathspecs),
+                check=True, capture_output=True
+            ).stdout.decode('utf-8', 'surrogateescape')
+            fields = output.split('\0')
+            position = 0
+            while position < len(fields) - 1:
+                added, deleted, path_name = fields[position].split('\t', 2)
+                # A rename is followed by its old and new paths
+                position += 1 if path_name else 3
+                if added == '-':
+                    added = deleted = 0
+                if path_name in type_changes:
+                    # Diffed as the deletion of the old file, then the
+                    # addition of the new one, but counted on one line
+                    sizes.extend((int(deleted), int(added)))
+                else:
+                    sizes.append(int(added) + int(deleted))
+        return sizes
+
+    @property
+    def changes(self) -> list:
+        """
+        The list of changes in the range.
+        """
+        if self._changes is None:
+            self._changes = list(self.iter_changes())
+        return self._changes
+
+    def iter_changes(self):
+        """
+        Iterate over the changes in the range.
+
+        Yields:
+            Change: The change in one file.
+        """
+        if self._changes is not None:
+            yield from self._changes
+            return
+
+        blob_ids, pathspec_lists, _ = self.list_pathspecs()
+        for pathspecs in pathspec_lists:
+            process = subprocess.Popen(
+                self.git('diff', '-M', '--no-color', '--no-ext-diff', self.revision_range,
+                         '--', *pathspecs),
+                stdout=subprocess.PIPE, encoding='utf-8', errors='replace'
+            )
+            try:
+                for change in iter_diff_changes(process.stdout, lambda path_name: False):
+                    old_blob, new_blob = blob_ids.get(change['path_name'], (NULL_BLOB, NULL_BLOB))
+                    change['old_blob'] = old_blob
+                    change['new_blob'] = new_blob
+                    yield change
+            finally:
+                process.stdout.close()
+                process.wait()
+
+            if process.returncode != 0:
+                raise subprocess.CalledProcessError(process.returncode, process.args)
+
+    def get_changes(self):
+        """
+        Get the list of changes in the range.
+
+        Returns:
+            list: The Change of each file.
+        """
+        return self.changes
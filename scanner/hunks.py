@@ -0,0 +1,148 @@
+import re
+import threading
+from array import array
+
+"""
+Module to split the diff content of a change into added and deleted lines.
+"""
+
+# Start of a hunk, e.g. "@@ -12,7 +12,8 @@ int main()"
+HUNK_HEADER_RE = re.compile(r'^@@ -(?P<old_start>\d+)(?:,\d+)? \+(?P<new_start>\d+)(?:,\d+)? @@')
+
+# Key under which the tokenized lines are kept on a change record
+HUNK_LINES_KEY = 'hunk_lines'
+
+# Makes taking or storing the shared lines of a change atomic, as the two
+# checkers may ask for them from their own threads at the same time
+_handoff_lock = threading.Lock()
+
+
+class HunkLines:
+    """
+    The added and deleted lines of one file's diff.
+
+    Each view is a list of (line_number, text) tuples, without the leading
+    '+'/'-'. Added lines are numbered in the new file and deleted lines in the
+    old file, following the hunk headers. The lines are kept joined, with
+    their numbers in arrays, and the views are built on access.
+    """
+
+    __slots__ = ('_added_text', '_deleted_text', '_added_numbers', '_deleted_numbers')
+
+    def __init__(self, content: str = None) -> None:
+        """
+        Tokenize the diff content in a single pass.
+
+        Args:
+            content (str): The diff content of the change, or None.
+        """
+        added = []
+        deleted = []
+        self._added_numbers = array('l')
+        self._deleted_numbers = array('l')
+        if content:
+            old_number = new_number = 0
+            for line in content.split('\n'):
+                marker = line[:1]
+                if marker == '+':
+                    added.append(line[1:])
+                    self._added_numbers.append(new_number)
+                    new_number += 1
+                elif marker == '-':
+                    deleted.append(line[1:])
+                    self._deleted_numbers.append(old_number)
+                    old_number += 1
+                elif marker == ' ':
+                    old_number += 1
+                    new_number += 1
+                elif marker == '@':
+                    header = HUNK_HEADER_RE.match(line)
+                    if header:
+                        old_number = int(header.group('old_start'))
+                        new_number = int(header.group('new_start'))
+        self._added_text = "\n".join(added)
+        self._deleted_text = "\n".join(deleted)
+
+    @property
+    def added(self) -> list:
+        """
+        The added lines, as (line_number, text) tuples.
+        """
+        if not self._added_numbers:
+            return []
+        return list(zip(self._added_numbers, self._added_text.split('\n')))
+
+    @property
+    def deleted(self) -> list:
+        """
+        The deleted lines, as (line_number, text) tuples.
+        """
+        if not self._deleted_numbers:
+            return []
+        return list(zip(self._deleted_numbers, self._deleted_text.split('\n')))
+
+    @property
+    def added_count(self) -> int:
+        """
+        The number of added lines.
+        """
+        return len(self._added_numbers)
+
+    @property
+    def deleted_count(self) -> int:
+        """
+        The number of deleted lines.
+        """
+        return len(self._deleted_numbers)
+
+    def added_text(self) -> str:
+        """
+        Join the added lines.
+
+        Returns:
+            str: The added lines separated by newlines.
+        """
+        return self._added_text
+
+    def deleted_text(self) -> str:
+        """
+        Join the deleted lines.
+
+        Returns:
+            str: The deleted lines separated by newlines.
+        """
+        return self._deleted_text
+
+
+def get_hunk_lines(change: dict, shared: bool = True) -> HunkLines:
+    """
+    Get the added and deleted lines of a change, tokenizing it on first use.
+
+    With shared set, both checkers must ask for the lines of every change
+    they are given, as the lines are kept on the change record until the
+    second checker takes them: the license and copyright checkers then share
+    a single tokenization without keeping the lines of every change alive
+    for the whole patch. The first request tokenizes under a lock, so a
+    concurrent second one waits for the lines instead of tokenizing again.
+
+    Args:
+        change (dict): The change record.
+        shared (bool): Whether the other checker asks for the lines of the
+            same change record, at about the same time; if not, they are
+            not kept.
+
+    Returns:
+        HunkLines: The added and deleted lines of the change.
+    """
+    if not shared:
+        return HunkLines(change['content'])
+
+    with _handoff_lock:
+        hunk_lines = change.get(HUNK_LINES_KEY)
+        if hunk_lines is None:
+            hunk_lines = HunkLines(change['content'])
+            change[HUNK_LINES_KEY] = hunk_lines
+        else:
+            # Both checkers have now used it
+            change[HUNK_LINES_KEY] = None
+    return hunk_lines
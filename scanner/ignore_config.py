@@ -1,31 +1,182 @@
 """
 Module to load optional .licenseignore configuration.
+
+Besides the .licenseignore of the root directory, each directory may hold its
+own .licenseignore, whose patterns are relative to that directory and take
+precedence over those of its parents, as with .gitignore files.
 """
+import os
+import re
 import pathspec
 from pathlib import Path
 
+IGNORE_FILE_NAME = '.licenseignore'
+
+# Characters with a meaning in gitwildmatch patterns
+GLOB_SPECIAL_RE = re.compile(r'([\[\]*?!\\])')
+
+
+def read_patterns(ignore_path: str) -> list:
+    """
+    Read the patterns of an ignore file.
+
+    Args:
+        ignore_path (str): Path to the ignore file.
+
+    Returns:
+        list: The patterns, without blank lines and comments. Empty if the
+        file does not exist.
+    """
+    path = Path(ignore_path)
+    if not path.exists():
+        return []
+    lines = path.read_text(encoding='utf-8').splitlines()
+    return [line.strip() for line in lines
+            if line.strip() and not line.strip().startswith('#')]
+
+
+def rebase_pattern(pattern: str, directory: str) -> str:
+    """
+    Rewrite a pattern of a nested ignore file relative to the root directory.
+
+    Args:
+        pattern (str): The pattern, relative to its directory.
+        directory (str): The directory of the ignore file, relative to the root.
+
+    Returns:
+        str: The equivalent pattern relative to the root directory.
+    """
+    negation = '!' if pattern.startswith('!') else ''
+    pattern = pattern[len(negation):]
+    directory = GLOB_SPECIAL_RE.sub(r'\\\1', directory)
+    if '/' in pattern.rstrip('/'):
+        # Anchored to the directory of the ignore file
+        return f"{negation}{directory}/{pattern.lstrip('/')}"
+    # Matches at any depth below the directory of the ignore file
+    return f"{negation}{directory}/**/{pattern}"
+
+
+class _DirectoryMatcher:
+    """
+    The compiled patterns applying to the files of one directory.
+
+    Without negated patterns, a path is excluded as soon as any pattern
+    matches, so all patterns are compiled into a single regular expression.
+    Otherwise the last matching pattern decides, as evaluated by pathspec.
+    """
+
+    __slots__ = ('patterns', 'spec', 'regex')
+
+    def __init__(self, patterns: list) -> None:
+        """
+        Compile the patterns.
+
+        Args:
+            patterns (list): The gitwildmatch patterns, relative to the root.
+        """
+        self.patterns = patterns
+        self.spec = pathspec.PathSpec.from_lines('gitwildmatch', patterns) if patterns else None
+        self.regex = None
+        if self.spec and all(pattern.include for pattern in self.spec.patterns
+                             if pattern.include is not None):
+            self.regex = re.compile("|".join(
+                f"(?:{pattern.regex.pattern.replace('(?P<ps_d>', '(')})"
+                for pattern in self.spec.patterns if pattern.include
+            ))
+
+    def matches(self, path: str) -> bool:
+        """
+        Check if a path is excluded by the patterns.
+
+        Args:
+            path (str): The path, relative to the root; directories end with '/'.
+
+        Returns:
+            bool: True if the path is excluded.
+        """
+        if self.regex is not None:
+            return self.regex.match(path) is not None
+        if self.spec is None:
+            return False
+        return self.spec.match_file(path)
+
+
 class IgnoreConfig:
     """
     Handles loading and matching of .licenseignore patterns.
     """
 
-    def __init__(self, ignore_path: str = ".licenseignore"):
+    def __init__(self, ignore_path: str = IGNORE_FILE_NAME, excluded_suffixes: tuple = (),
+                 nested: bool = True):
         """
         Load patterns from ignore file.
 
         Args:
             ignore_path (str): Path to the ignore file. Defaults to '.licenseignore'
+            excluded_suffixes (tuple): File name suffixes that are always excluded.
+            nested (bool): Also honour the .licenseignore files of the
+                subdirectories of the ignore file's directory.
+        """
+        self.root = os.path.dirname(ignore_path)
+        self.excluded_suffixes = tuple(excluded_suffixes)
+        self.nested = nested
+        self.patterns = read_patterns(ignore_path)
+        self.spec = pathspec.PathSpec.from_lines('gitwildmatch', self.patterns) \
+            if self.patterns else None
+
+        # Directory (relative to the root, '' for the root) -> _DirectoryMatcher
+        self._matchers = {'': _DirectoryMatcher(self.patterns)}
+        # Directory -> whether it is excluded, with everything below it
+        self._excluded_directories = {}
+
+    def _matcher(self, directory: str) -> _DirectoryMatcher:
+        """
+        Get the patterns applying to the files of a directory.
+
+        Args:
+            directory (str): The directory, relative to the root.
+
+        Returns:
+            _DirectoryMatcher: The compiled patterns of the directory and its parents.
         """
-        path = Path(ignore_path)
+        matcher = self._matchers.get(directory)
+        if matcher is not None:
+            return matcher
 
-        if path.exists():
-            lines = path.read_text(encoding='utf-8').splitlines()
-            self.patterns = [line.strip() for line in lines
-                             if line.strip() and not line.strip().startswith('#')]
-            self.spec = pathspec.PathSpec.from_lines('gitwildmatch', self.patterns)
+        parent = self._matcher(os.path.dirname(directory))
+        patterns = read_patterns(os.path.join(self.root, directory, IGNORE_FILE_NAME)) \
+            if self.nested else []
+        if patterns:
+            matcher = _DirectoryMatcher(
+                parent.patterns + [rebase_pattern(pattern, directory) for pattern in patterns])
         else:
-            self.patterns = []
-            self.spec = None
+            matcher = parent
+        self._matchers[directory] = matcher
+        return matcher
+
+    def is_directory_excluded(self, directory: str) -> bool:
+        """
+        Check if a directory is excluded as a whole, memoizing the verdict.
+
+        Only directories matched by a set of patterns without negations are
+        pruned: a negated pattern could re-include a file below them.
+
+        Args:
+            directory (str): The directory, relative to the root.
+
+        Returns:
+            bool: True if everything below the directory is excluded.
+        """
+        excluded = self._excluded_directories.get(directory)
+        if excluded is None:
+            parent = os.path.dirname(directory)
+            if parent and self.is_directory_excluded(parent):
+                excluded = True
+            else:
+                matcher = self._matcher(parent)
+                excluded = matcher.regex is not None and matcher.matches(directory + '/')
+            self._excluded_directories[directory] = excluded
+        return excluded
 
     def is_excluded(self, file_path: str) -> bool:
         """
@@ -37,6 +188,10 @@ class IgnoreConfig:
         Returns:
             bool: True if the file should be excluded, False otherwise
         """
-        if not self.spec:
-            return False
-        return self.spec.match_file(file_path)
\ No newline at end of file
+        if self.excluded_suffixes and file_path.endswith(self.excluded_suffixes):
+            return True
+
+        directory = os.path.dirname(file_path)
+        if directory and self.is_directory_excluded(directory):
+            return True
+        return self._matcher(directory).matches(file_path)
@@ -0,0 +1,153 @@
+"""
+Module with the typed records of the issues found by the checkers.
+"""
+from enum import Enum
+from scanner.license_policy import is_uncertain_expression
+
+
+class Severity(Enum):
+    """
+    Whether an issue blocks the build.
+    """
+    ERROR = 'error'
+    WARNING = 'warning'
+
+
+class IssueKind(Enum):
+    """
+    The kinds of issues reported by the checkers.
+    """
+    LICENSE_CHANGED = 'license-changed'
+    LICENSE_INCOMPATIBLE = 'license-incompatible'
+    LICENSE_DELETED = 'license-deleted'
+    LICENSE_MISSING = 'license-missing'
+    COPYRIGHT_DELETED = 'copyright-deleted'
+
+
+class Issue:
+    """
+    A single issue found in a changed file.
+
+    The severity is decided once, when the issue is created, from the parsed
+    license expressions; the message text is only rendered when the issue is
+    printed.
+    """
+
+    __slots__ = ('path_name', 'kind', 'added', 'deleted', 'copyrights', 'severity')
+
+    def __init__(self, path_name: str, kind: IssueKind, added=None, deleted=None,
+                 copyrights: list = None) -> None:
+        """
+        Initialize the Issue object.
+
+        Args:
+            path_name (str): The path of the file the issue was found in.
+            kind (IssueKind): The kind of issue.
+            added: The license expression added by the change, if any.
+            deleted: The license expression deleted by the change, if any.
+            copyrights (list): The deleted copyright statements, if any.
+        """
+        self.path_name = path_name
+        self.kind = kind
+        self.added = added
+        self.deleted = deleted
+        self.copyrights = copyrights
+        self.severity = self._classify()
+
+    def _classify(self) -> Severity:
+        """
+        Decide the severity of the issue.
+
+        Only issues about uncertain/unknown licenses are warnings: an added
+        expression made up solely of uncertain licenses, or a deleted
+        expression mentioning one.
+
+        Returns:
+            Severity: The severity of the issue.
+        """
+        if self.kind in (IssueKind.LICENSE_INCOMPATIBLE, IssueKind.LICENSE_CHANGED):
+            if is_uncertain_expression(str(self.added)):
+                return Severity.WARNING
+        elif self.kind == IssueKind.LICENSE_DELETED:
+            if "LicenseRef-scancode-" in str(self.deleted):
+                return Severity.WARNING
+        return Severity.ERROR
+
+    def message(self) -> str:
+        """
+        Render the human-readable message of the issue.
+
+        Returns:
+            str: The message.
+        """
+        if self.kind == IssueKind.LICENSE_CHANGED:
+            return f"License deleted: {self.deleted} and license added: {self.added}"
+        if self.kind == IssueKind.LICENSE_INCOMPATIBLE:
+            return f"Incompatible license added: {self.added}"
+        if self.kind == IssueKind.LICENSE_DELETED:
+            return f"License deleted: {self.deleted}"
+        if self.kind == IssueKind.LICENSE_MISSING:
+            return f"No license added for source file: {self.path_name}"
+        return f"Copyright deletions detected: {self.copyrights}"
+
+    def to_dict(self) -> dict:
+        """
+        Convert the issue to a JSON-serializable dictionary.
+
+        Returns:
+            dict: The fields of the issue and its message.
+        """
+        return {
+            'path': self.path_name,
+            'kind': self.kind.value,
+            'severity': self.severity.value,
+            'message': self.message(),
+            'added': self.added,
+            'deleted': self.deleted,
+            'copyrights': self.copyrights,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Issue':
+        """
+        Rebuild an issue from the dictionary of to_dict().
+
+        Args:
+            data (dict): The fields of the issue.
+
+        Returns:
+            Issue: The issue.
+        """
+        return cls(data['path'], IssueKind(data['kind']), added=data.get('added'),
+                   deleted=data.get('deleted'), copyrights=data.get('copyrights'))
+
+    def __str__(self) -> str:
+        return self.message()
+
+
+def encode_issues(flagged_files: dict) -> dict:
+    """
+    Convert the issues of a checker to JSON-serializable dictionaries.
+
+    Args:
+        flagged_files (dict): Dictionary mapping file paths -> lists of Issue.
+
+    Returns:
+        dict: Dictionary mapping file paths -> lists of issue dictionaries.
+    """
+    return {path_name: [issue.to_dict() for issue in issues]
+            for path_name, issues in flagged_files.items()}
+
+
+def decode_issues(flagged_files: dict) -> dict:
+    """
+    Rebuild the issues of a checker from their dictionaries.
+
+    Args:
+        flagged_files (dict): Dictionary mapping file paths -> lists of issue dictionaries.
+
+    Returns:
+        dict: Dictionary mapping file paths -> lists of Issue.
+    """
+    return {path_name: [Issue.from_dict(issue) for issue in issues]
+            for path_name, issues in flagged_files.items()}
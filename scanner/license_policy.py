@@ -0,0 +1,90 @@
+"""
+Module with the license lists that make up the license policies.
+"""
+from functools import lru_cache
+from scanner.spdx import parse_lenient
+
+# Define the set of permissive licenses
+PERMISSIVE_LICENSES = frozenset([
+    "BSD-3-Clause",
+    "MIT",
+    "Apache-1.0",
+    "Apache-1.1",
+    "Apache-2.0",
+    "BSD-3-Clause-Clear",
+    "FreeBSD-DOC",
+    "Zlib",
+    "BSD-1-Clause",
+    "BSD-2-Clause",
+    "BSD-2-Clause-first-lines",
+    "BSD-2-Clause-Views",
+    "BSD-3-Clause-Sun",
+    "BSD-4-Clause-Shortened",
+    "BSD-3-Clause-Attribution",
+    "BSD-4-Clause",
+    "ISC",
+    "CC0-1.0",
+    "ICU",
+    "LicenseRef-scancode-unicode"
+])
+
+COPYLEFT_LICENSES = frozenset([
+    "GPL-1.0-only",
+    "GPL-1.0-or-later",
+    "GPL-2.0-only",
+    "GPL-2.0-or-later",
+    "GPL-3.0-only"
+    "GPL-3.0",
+    "GPL-3.0-or-later",
+    "AGPL-3.0",
+    "LGPL-3.0",
+    "GPL-2.0",
+    "GPL-2.0+",
+    "GPL-2.0-only WITH Linux-syscall-note",
+    "AGPL-1.0-only",
+    "AGPL-1.0-or-later",
+    "LicenseRef-scancode-agpl-2.0",
+    "AGPL-3.0-only",
+    "AGPL-3.0-or-later"
+])
+
+
+@lru_cache(maxsize=None)
+def is_uncertain_expression(license_expr: str) -> bool:
+    """
+    Check if every license in an SPDX expression is uncertain/unknown.
+
+    Args:
+        license_expr (str): The SPDX license expression.
+
+    Returns:
+        bool: True if the expression ONLY contains uncertain licenses.
+    """
+    # Parse the license expression to check if ALL licenses are unknown/uncertain
+    licenses = parse_lenient(license_expr).licenses()
+
+    # Check if all licenses are unknown/uncertain
+    if not licenses:
+        return False
+
+    # SPECIAL CASE: If the ONLY license is exactly "LicenseRef-scancode-proprietary-license",
+    # block it
+    if len(licenses) == 1 and licenses[0] == "LicenseRef-scancode-proprietary-license":
+        return False
+
+    # A license is considered uncertain if:
+    # 1. It starts with LicenseRef-scancode- AND
+    # 2. It's not in the known permissive list (like LicenseRef-scancode-unicode)
+    def is_uncertain_license(lic: str) -> bool:
+        if not lic.startswith('LicenseRef-scancode-'):
+            return False
+        # Check if it's a known permissive LicenseRef
+        if lic in PERMISSIVE_LICENSES:
+            return False
+        return True
+
+    # If ALL licenses are uncertain, it's a warning
+    # If ANY license is a known incompatible license (like GPL), it's an error
+    all_uncertain = all(is_uncertain_license(lic) for lic in licenses)
+
+    return all_uncertain
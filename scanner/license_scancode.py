@@ -1,10 +1,13 @@
-import json
-import tempfile
-import subprocess
 import warnings
-import os
-from pathlib import Path
 from scanner.patch import Patch
+from scanner.detection_cache import DetectionCache
+from scanner.scancode_engine import ScancodeEngine, get_engine
+from scanner.prefilter import LicensePrefilter
+from scanner.hunks import get_hunk_lines
+from scanner.clustering import TemplateClusterer
+from scanner.spdx import is_expression_allowed
+from scanner.issues import Issue, IssueKind
+from scanner.tracing import tracer
 
 warnings.filterwarnings("ignore", message="Libmagic magic database not found")
 
@@ -17,18 +20,34 @@ class LicenseChecker:
     Class to check for licenses in a patch file.
     """
 
-    def __init__(self, patch: Patch, repo: str, permissive_licenses: list) -> None:
+    def __init__(self, patch: Patch, repo: str, permissive_licenses,
+                 cache: DetectionCache = None, engine: ScancodeEngine = None,
+                 prefilter: LicensePrefilter = None,
+                 clusterer: TemplateClusterer = None) -> None:
         """
         Initialize the LicenseChecker object.
 
         Args:
             patch (Patch): The patch file to check.
             repo (str): The repository name.
-            permissive_licenses (list): A list of permissive licenses.
+            permissive_licenses (iterable): The permissive licenses.
+            cache (DetectionCache): Optional cache of earlier scancode results.
+            engine (ScancodeEngine): The detection engine. Defaults to get_engine().
+            prefilter (LicensePrefilter): Optional keyword filter; text it rejects
+                is treated as having no license and is never scanned.
+            clusterer (TemplateClusterer): Optional; texts sharing a template
+                are scanned once.
         """
         self.patch = patch
         self.repo = repo
-        self.permissive_licenses = permissive_licenses
+        self.permissive_licenses = frozenset(permissive_licenses)
+        self.cache = cache
+        self.engine = engine or get_engine()
+        self.prefilter = prefilter
+        self.clusterer = clusterer
+        # Whether the copyright checker takes the tokenized lines of the same
+        # changes, concurrently; set when the checks run in threads
+        self.share_hunk_lines = False
 
     def is_license_permissive(self, scancode_license: str) -> bool:
         """
@@ -40,6 +59,9 @@ class LicenseChecker:
         
         For OR expressions: At least one option must be permissive
         For AND expressions: All components must be permissive
+
+        Expressions are parsed once and verdicts are cached per policy, see
+        scanner.spdx.is_expression_allowed.
         
         Args:
             scancode_license (str): The SPDX license expression to check.
@@ -47,122 +69,88 @@ class LicenseChecker:
         Returns:
             bool: True if the license expression is permissive, False otherwise.
         """
-        expression = scancode_license.strip()
-        
-        # Check if this is a dual-license pattern: starts with (X OR Y) AND ...
-        # In this case, if the OR part has a permissive option, we accept it
-        if expression.startswith('(') and ' OR ' in expression.split(')')[0]:
-            # Extract the OR part
-            or_part = expression.split(')')[0] + ')'
-            or_part_clean = or_part.strip('()')
-            or_licenses = [lic.strip() for lic in or_part_clean.split(' OR ')]
-            
-            # Check if at least one license in the OR is permissive
-            for lic in or_licenses:
-                if lic in self.permissive_licenses:
-                    return True
-            
-            return False
-        
-        # Standard evaluation: split by AND first to get AND-groups
-        and_groups = [group.strip() for group in expression.split(' AND ')]
-        
-        # For each AND group, check if it's permissive
-        for and_group in and_groups:
-            # Check if this group contains OR
-            if ' OR ' in and_group:
-                # Remove parentheses
-                and_group = and_group.strip('()')
-                # Split by OR - at least one must be permissive
-                or_licenses = [lic.strip() for lic in and_group.split(' OR ')]
-                
-                # Check if at least one license in the OR group is permissive
-                has_permissive = False
-                for lic in or_licenses:
-                    if lic in self.permissive_licenses:
-                        has_permissive = True
-                        break
-                
-                if not has_permissive:
-                    return False
-            else:
-                # Single license in this AND group - must be permissive
-                lic = and_group.strip('()')
-                if lic not in self.permissive_licenses:
-                    return False
-        
-        return True
+        return is_expression_allowed(scancode_license, self.permissive_licenses)
 
-    def detect_licenses_batch(self, changes: list) -> dict:
+    def split_blobs(self, changes):
         """
-        Detect licenses for multiple changes in a single scancode run.
+        Split changes into the added and deleted text that is scanned.
+
+        Args:
+            changes (iterable): Changes to split.
+
+        Yields:
+            tuple: ((change_index, content_type), text) pairs.
+        """
+        for idx, change in enumerate(changes):
+            hunk_lines = get_hunk_lines(change, self.share_hunk_lines)
+
+            # Join added and deleted lines as-is
+            if hunk_lines.added_count:
+                yield (idx, 'added'), hunk_lines.added_text()
+            if hunk_lines.deleted_count:
+                yield (idx, 'deleted'), hunk_lines.deleted_text()
+
+    def detect_blobs(self, blobs) -> dict:
+        """
+        Detect licenses in texts, going through the prefilter and cache before
+        handing what is left to the engine in a single run.
+
         Args:
-            changes (list): List of changes to check.
+            blobs (iterable): Pairs of (key, text) to scan.
+
         Returns:
-            dict: Dictionary mapping (change_index, content_type) -> licenses.
+            dict: Dictionary mapping key -> licenses. Keys rejected by the
+            prefilter are left out.
         """
-        with tempfile.TemporaryDirectory() as tmpdir:
-            file_map = {}
+        results = {}
+        cache_keys = {}
 
-            for idx, change in enumerate(changes):
-                content = change['content']
-                # Check if content is None
-                if not content:
+        def iter_blobs():
+            for key, text in blobs:
+                if self.prefilter is not None and not self.prefilter.matches(text):
                     continue
 
-                added_lines = []
-                deleted_lines = []
-                # Separate added and deleted lines
-                for line in content.split('\n'):
-                    if line.startswith('+'):
-                        added_lines.append(line[1:])
-                    elif line.startswith('-'):
-                        deleted_lines.append(line[1:])
-
-                # Join added and deleted lines as-is
-                if added_lines:
-                    added_file = f"{idx}_added.txt"
-                    Path(tmpdir, added_file).write_text("\n".join(added_lines))
-                    file_map[added_file] = (idx, 'added')
-
-                if deleted_lines:
-                    deleted_file = f"{idx}_deleted.txt"
-                    Path(tmpdir, deleted_file).write_text("\n".join(deleted_lines))
-                    file_map[deleted_file] = (idx, 'deleted')
-
-            if not file_map:
-                return {}
-
-            output_file = os.path.join(tmpdir, 'scancode_results.json')
-            subprocess.run([
-                'scancode',
-                '--license',
-                '--strip-root',
-                '--quiet',
-                '--json-pp', output_file,
-                tmpdir
-            ], check=True)
-
-            with open(output_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            results = {}
-            for file_result in data.get('files', []):
-                if file_result['type'] != 'file':
-                    continue
+                if self.cache is not None:
+                    cache_key = self.cache.key(text)
+                    cached = self.cache.get(cache_key)
+                    if cached is not None:
+                        results[key] = cached
+                        continue
+                    cache_keys[key] = cache_key
 
-                filename = os.path.basename(file_result['path'])
-                if filename not in file_map:
-                    continue
+                tracer.count('blobs_scanned')
+                tracer.count('bytes_scanned', len(text))
+                yield key, text
+
+        with tracer.span('license_detect', engine=self.engine.name):
+            if self.clusterer is not None:
+                detected = self.clusterer.fan_out(
+                    self.engine.detect(self.clusterer.representatives(iter_blobs())))
+            else:
+                detected = self.engine.detect(iter_blobs())
 
-                licenses = []
-                if len(file_result.get('license_detections', [])):
-                    licenses = file_result['license_detections'][0]['license_expression_spdx']
+        for key, licenses in detected.items():
+            results[key] = licenses
+            if key in cache_keys:
+                self.cache.put(cache_keys[key], licenses)
+        if self.cache is not None:
+            self.cache.commit()
 
-                change_idx, content_type = file_map[filename]
-                results[(change_idx, content_type)] = licenses
+        return results
 
-            return results
+    def detect_licenses_batch(self, changes: list) -> dict:
+        """
+        Detect licenses for multiple changes in a single scancode run.
+
+        The changes are consumed one at a time, so a generator (e.g. from a
+        streaming Patch) never needs to be materialized.
+
+        Args:
+            changes (iterable): Changes to check.
+        Returns:
+            dict: Dictionary mapping (change_index, content_type) -> licenses.
+        """
+        return self.detect_blobs(self.split_blobs(changes))
 
     def is_source_file(self, file_name: str) -> bool:
         """
@@ -185,22 +173,59 @@ class LicenseChecker:
                 return True
         return False
 
-    def run(self) -> dict:
+    def iter_source_files(self, source_files: list):
+        """
+        Iterate over the source file changes of the patch.
+
+        Only the path and change type of each change are recorded in
+        source_files, for the verdicts; the content is released once scanned.
+
+        Args:
+            source_files (list): Receives the path and change type of each
+                yielded change, in order.
+
+        Yields:
+            dict: The source file changes.
+        """
+        for change in self.patch.iter_changes():
+            if change['file_type'] != 'source':
+                continue
+            source_files.append({
+                'path_name': change['path_name'],
+                'change_type': change['change_type']
+            })
+            yield change
+
+    def run(self, on_issues=None) -> dict:
         """
         Run the license checker.
 
+        Args:
+            on_issues (callable): Optional; called with the path and the list
+                of Issue of each flagged file as soon as its verdict is ready.
+
         Returns:
-            dict: A dictionary of flagged files.
+            dict: A dictionary mapping flagged file paths to lists of Issue.
         """
-        source_files = [change for change in self.patch.changes
-                        if change['file_type'] == 'source']
+        source_files = []
+        license_results = self.detect_licenses_batch(self.iter_source_files(source_files))
+        return self.evaluate(source_files, license_results, on_issues)
 
-        flagged_files = {}
-        if not source_files:
-            return flagged_files
+    def evaluate(self, source_files: list, license_results: dict, on_issues=None) -> dict:
+        """
+        Turn detected licenses into issues according to the license policy.
 
-        license_results = self.detect_licenses_batch(source_files)
+        Args:
+            source_files (list): Path and change type of each source file change.
+            license_results (dict): Dictionary mapping
+                (change_index, content_type) -> licenses.
+            on_issues (callable): Optional; called with the path and the list
+                of Issue of each flagged file as soon as its verdict is ready.
 
+        Returns:
+            dict: A dictionary mapping flagged file paths to lists of Issue.
+        """
+        flagged_files = {}
         for idx, change in enumerate(source_files):
             added_licenses = license_results.get((idx, 'added'), [])
             deleted_licenses = license_results.get((idx, 'deleted'), [])
@@ -213,19 +238,24 @@ class LicenseChecker:
                     # This allows dual-license scenarios like "BSD-3-Clause OR GPL-2.0-only"
                     # where at least one option is permissive
                     if not self.is_license_permissive(added_licenses):
-                        issues.append(f"License deleted: {deleted_licenses} and license added: {added_licenses}")
+                        issues.append(Issue(change['path_name'], IssueKind.LICENSE_CHANGED,
+                                            added=added_licenses, deleted=deleted_licenses))
                 elif added_licenses and not self.is_license_permissive(added_licenses):
                     # New license added that is not permissive
-                    issues.append(f"Incompatible license added: {added_licenses}")
+                    issues.append(Issue(change['path_name'], IssueKind.LICENSE_INCOMPATIBLE,
+                                        added=added_licenses))
                 elif deleted_licenses and not added_licenses:
                     # License was removed without replacement
-                    issues.append(f"License deleted: {deleted_licenses}")
+                    issues.append(Issue(change['path_name'], IssueKind.LICENSE_DELETED,
+                                        deleted=deleted_licenses))
                 
                 if issues:
                     flagged_files[change['path_name']] = issues
             if change['change_type'] == 'ADDED':
                 if not added_licenses and self.is_source_file(change['path_name']):
-                    issues.append(f"No license added for source file: {change['path_name']}")
+                    issues.append(Issue(change['path_name'], IssueKind.LICENSE_MISSING))
                     if issues:
                         flagged_files[change['path_name']] = issues
+            if issues and on_issues is not None:
+                on_issues(change['path_name'], issues)
         return flagged_files
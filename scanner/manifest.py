@@ -0,0 +1,194 @@
+"""
+Module to carry verdicts forward from one check of a PR to the next.
+
+A result manifest is a JSON file written at the end of a check. It maps the
+path of every changed file to the hashes of its diff sections and to the
+license and copyright issues found in them. Given the manifest of the
+previous push, the changes whose path and hash are unchanged are neither
+detected nor checked again: their issues are carried forward, so the run
+time follows the delta between pushes rather than the PR size.
+"""
+import hashlib
+import json
+import os
+from scanner.issues import decode_issues, encode_issues
+
+# Format version of the manifest file
+MANIFEST_VERSION = 2
+
+
+def manifest_context(scancode_version: str, permissive_licenses, transitions) -> str:
+    """
+    Fingerprint what the verdicts of a run depend on besides the diff.
+
+    Args:
+        scancode_version (str): The scancode-toolkit version detecting licenses.
+        permissive_licenses (iterable): The permissive licenses of the repository.
+        transitions (TransitionRules): The allowed copyright holder transitions.
+
+    Returns:
+        str: The hex digest of the detection and policy settings.
+    """
+    settings = [scancode_version, sorted(permissive_licenses), transitions.rules]
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class ResultManifest:
+    """
+    Verdicts of the previous run and of this one, by path and diff section.
+
+    A previous manifest written with other detection or policy settings, or
+    in another format, is ignored, so carried verdicts always match what a
+    full check would find.
+    """
+
+    def __init__(self, previous_path: str = None, context: str = '') -> None:
+        """
+        Load the previous manifest, if any.
+
+        Args:
+            previous_path (str): The manifest of the previous run. A missing
+                file is treated as a first run.
+            context (str): The fingerprint returned by manifest_context().
+        """
+        self.context = context
+        # Path -> {'sections': [digest, ...], 'license_issues': [...],
+        # 'copyright_issues': [...]}, of the previous run
+        self.previous = {}
+        # Path -> set of the digests of its sections in this run
+        self.sections = {}
+        # Path -> entry of this run, set by merge()
+        self.files = {}
+        self.carried = 0
+        self.checked = 0
+
+        if previous_path and os.path.exists(previous_path):
+            with open(previous_path, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+            if (previous.get('version') == MANIFEST_VERSION
+                    and previous.get('context') == self.context):
+                self.previous = previous.get('files', {})
+
+    def is_carried(self, change) -> bool:
+        """
+        Record a change of this run and check if its verdict is carried forward.
+
+        Issues are recorded by path, so only a path the previous run saw as a
+        single section is carried: the deletion and addition sections of a
+        file whose type changed are always checked again.
+
+        Args:
+            change (Change): The change.
+
+        Returns:
+            bool: True if the previous run checked the same change.
+        """
+        digest = change.digest()
+        self.sections.setdefault(change['path_name'], set()).add(digest)
+        return self.previous.get(change['path_name'], {}).get('sections') == [digest]
+
+    def merge(self, flagged_license_files: dict, flagged_copyright_files: dict,
+              on_issues=None) -> tuple:
+        """
+        Add the carried issues to the issues found in this run.
+
+        Args:
+            flagged_license_files (dict): Issues found by the LicenseChecker.
+            flagged_copyright_files (dict): Issues found by the CopyrightChecker.
+            on_issues (callable): Optional; called with the path and the list
+                of Issue of each carried file with issues.
+
+        Returns:
+            tuple: The flagged license files and flagged copyright files of
+            the whole patch, in patch order.
+        """
+        found = {'license_issues': encode_issues(flagged_license_files),
+                 'copyright_issues': encode_issues(flagged_copyright_files)}
+        self.files = {}
+        carried = set()
+        for path_name, digests in self.sections.items():
+            entry = {'sections': sorted(digests)}
+            previous = self.previous.get(path_name)
+            if previous is not None and previous['sections'] == entry['sections']:
+                carried.add(path_name)
+                entry.update((section, previous[section]) for section in found)
+            else:
+                entry.update((section, issues.get(path_name, []))
+                             for section, issues in found.items())
+            self.files[path_name] = entry
+        self.carried = len(carried)
+        self.checked = len(self.files) - self.carried
+
+        merged = tuple(
+            decode_issues({path_name: entry[section] for path_name, entry in self.files.items()
+                           if entry[section]})
+            for section in found
+        )
+        if on_issues is not None:
+            for flagged_files in merged:
+                for path_name, issues in flagged_files.items():
+                    if path_name in carried:
+                        on_issues(path_name, issues)
+        return merged
+
+    def stats(self) -> str:
+        """
+        Summarize the reuse of the previous manifest.
+
+        Returns:
+            str: A one-line summary.
+        """
+        return f"result manifest: {self.carried} files carried forward, {self.checked} checked"
+
+    def write(self, path: str) -> None:
+        """
+        Write the manifest of this run, once merge() has been called.
+
+        Args:
+            path (str): The output file.
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'version': MANIFEST_VERSION,
+                'context': self.context,
+                'files': self.files,
+            }, f)
+
+
+class IncrementalPatch:
+    """
+    The changes of a patch whose verdicts are not carried forward.
+
+    It offers the same iter_changes()/changes interface as Patch, yielding
+    only the changes that the previous manifest does not cover.
+    """
+
+    def __init__(self, patch, manifest: ResultManifest) -> None:
+        """
+        Initialize the IncrementalPatch object.
+
+        Args:
+            patch (Patch): The patch (or GitRange, or ShardedPatch) to check.
+            manifest (ResultManifest): The manifest recording the changes.
+        """
+        self.patch = patch
+        self.manifest = manifest
+        self.streaming = patch.streaming
+
+    @property
+    def changes(self) -> list:
+        """
+        The list of changes to check.
+        """
+        return list(self.iter_changes())
+
+    def iter_changes(self):
+        """
+        Iterate over the changes to check.
+
+        Yields:
+            Change: The change in one file.
+        """
+        for change in self.patch.iter_changes():
+            if not self.manifest.is_carried(change):
+                yield change
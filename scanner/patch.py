@@ -1,73 +1,438 @@
+import hashlib
+import itertools
+import mmap
 import re
 from scanner.ignore_config import IgnoreConfig
+from scanner.tracing import tracer
 
 """
 Module to represent and process patch files.
 """
 
+# Files with these suffixes are never checked
+EXCLUDED_SUFFIXES = ('.patch', '.bb', '.md', '.json', '.yml')
+
+# Start of a file section in a git diff, e.g. "diff --git a/foo.c b/foo.c"
+FILE_DELIMITER_RE = re.compile(r'^diff .* b\/(?P<file_name>.*)$')
+FILE_DELIMITER_BYTES_RE = re.compile(FILE_DELIMITER_RE.pattern.encode(), re.MULTILINE)
+
+# Patterns applied to the mapped bytes of a file section
+CHANGE_TYPE_RE = re.compile(rb"(\w*) file mode")
+CHANGE_TYPE_TEXT_RE = re.compile(CHANGE_TYPE_RE.pattern.decode())
+RENAME_RE = re.compile(rb"rename from .*\nrename to .*")
+CONTENT_SEPARATOR_RE = re.compile(rb"\+\+\+ .*|GIT binary patch")
+
+class Change:
+    """
+    The change of one file in a patch.
+
+    The diff content is either held as text or, for a patch file mapped in
+    memory, as the byte offsets of the content, decoded on each access.
+    Checkers read it through scanner.hunks.get_hunk_lines(), which decodes
+    it once and keeps the tokenized lines in hunk_lines only until both
+    checkers have used them. Binary changes have no content. Fields can
+    also be read and set with dict-style access, e.g. change['path_name'].
+    """
+
+    __slots__ = ('path_name', 'file_type', 'change_type', 'old_blob', 'new_blob',
+                 'hunk_lines', '_content', '_buffer', '_start', '_end')
+
+    # Fields available through dict-style access
+    FIELDS = frozenset(('path_name', 'file_type', 'change_type', 'content', 'old_blob',
+                        'new_blob', 'hunk_lines'))
+
+    def __init__(self, path_name: str, file_type: str, change_type: str, content: str = None,
+                 buffer=None, start: int = 0, end: int = 0) -> None:
+        """
+        Initialize the Change object.
+
+        Args:
+            path_name (str): The path of the changed file.
+            file_type (str): "source" or "binary".
+            change_type (str): "ADDED", "DELETED", "RENAMED" or "MODIFIED".
+            content (str): The diff content, if held as text.
+            buffer: The mapped patch file, if the content is held as offsets.
+            start (int): The offset of the content in the buffer.
+            end (int): The offset of the end of the content in the buffer.
+        """
+        self.path_name = path_name
+        self.file_type = file_type
+        self.change_type = change_type
+        self.old_blob = None
+        self.new_blob = None
+        self.hunk_lines = None
+        self._content = content
+        self._buffer = buffer
+        self._start = start
+        self._end = end
+
+    @property
+    def content(self) -> str:
+        """
+        The diff content of the file, or None.
+        """
+        if self._buffer is None:
+            return self._content
+        text = self._buffer[self._start:self._end].decode('utf-8')
+        if '\r' in text:
+            # Same newline translation as reading the patch in text mode
+            text = text.replace('\r\n', '\n').replace('\r', '\n')
+        return text
+
+    @content.setter
+    def content(self, content: str) -> None:
+        self._content = content
+        self._buffer = None
+
+    def __getitem__(self, key: str):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value) -> None:
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.FIELDS
+
+    def get(self, key: str, default=None):
+        """
+        Get a field with dict-style access.
+
+        Args:
+            key (str): The field name.
+            default: Returned for unknown fields.
+
+        Returns:
+            The value of the field.
+        """
+        return getattr(self, key) if key in self.FIELDS else default
+
+    def digest(self) -> str:
+        """
+        Hash the change without decoding its content.
+
+        Returns:
+            str: The hex digest of the path, file type, change type and diff
+            content of the change.
+        """
+        digest = hashlib.sha256('\0'.join((self.path_name, self.file_type, self.change_type,
+                                          '')).encode('utf-8', 'surrogatepass'))
+        if self._buffer is not None:
+            digest.update(self._buffer[self._start:self._end])
+        elif self._content is not None:
+            digest.update(self._content.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+
 class Patch:
     """
     Class to represent a patch file.
     """
 
-    def __init__(self, patchfile: str) -> None:
+    def __init__(self, patchfile: str, streaming: bool = False,
+                 ignore_config: IgnoreConfig = None) -> None:
         """
         Initialize the Patch object.
 
+        In streaming mode the patch file is not read up front. Changes are parsed
+        line by line and yielded one at a time by iter_changes(), so only the
+        file currently being parsed is held in memory.
+
         Args:
             patchfile (str): The path to the patch file.
+            streaming (bool): Parse the patch lazily instead of loading it whole.
+            ignore_config (IgnoreConfig): The exclusions. Defaults to the
+                .licenseignore files of the working directory and the
+                hardcoded suffixes.
         """
         self.patchfile = patchfile
-        self.ignore_config = IgnoreConfig()
+        self.streaming = streaming
+        self.ignore_config = ignore_config or IgnoreConfig(excluded_suffixes=EXCLUDED_SUFFIXES)
+        self._changes = None
+        self._buffer = None
+        self._stream_passes = itertools.count()
 
-        with open(self.patchfile, 'r', encoding='utf-8') as f:
-            self.patch_content = f.read()
+        if streaming:
+            return
 
-        # Split patch into meta (git commit, summary) vs. code content
-        file_delimiter_regex = r'^diff .* b\/(?P<file_name>.*)$'
-        r = re.split(file_delimiter_regex, self.patch_content, flags=re.MULTILINE)
-        patch_content = r[1:]
-        files_changes = list(zip(patch_content[::2], patch_content[1::2]))
+        with tracer.span('patch_parse'):
+            self._parse()
+
+    def _parse(self) -> None:
+        """
+        Map the patch file in memory and split it into the list of changes.
+
+        Only the offsets of each file's diff content are kept; the text is
+        decoded when a checker asks for it.
+        """
+        self._buffer = buffer = self._map()
+        tracer.count('patch_bytes', len(buffer))
 
         # Create the list of changes in each file
-        self.changes = []
-        for path_name, file_change in files_changes:
+        self._changes = []
+        for path_name, start, end in iter_sections(buffer):
+            # Skip files that match hardcoded exclusions or config-based exclusions
+            if self.is_skipped(path_name):
+                tracer.count('files_skipped')
+                continue
+
             # figure change type
-            change_type = re.search(r"(\w*) file mode", file_change, re.MULTILINE)
-            if change_type and change_type.group(1) == "new":
+            change_type = CHANGE_TYPE_RE.search(buffer, start, end)
+            if change_type and change_type.group(1) == b"new":
                 change_type = "ADDED"
-            elif change_type and change_type.group(1) == "deleted":
+            elif change_type and change_type.group(1) == b"deleted":
                 change_type = "DELETED"
-            elif re.search("rename from .*\nrename to .*", file_change, re.MULTILINE):
+            elif RENAME_RE.search(buffer, start, end):
                 change_type = "RENAMED"
             else:
                 change_type = "MODIFIED"
 
-            # match[0] contains meta, match[1] contains file content if any
-            file_content = re.split(r"(?:\+\+\+ .*|GIT binary patch)", file_change)
-            file_content = file_content[1] if len(file_content) > 1 else None
-
-            file_type = "binary" if "GIT binary patch" in file_change else "source"
-
-            # Skip files that match hardcoded exclusions or config-based exclusions
-            if path_name.endswith(('.patch', '.bb', '.md', '.json', '.yml')):
+            if buffer.find(b"GIT binary patch", start, end) != -1:
+                # The base85 payload is never scanned, so it is never decoded
+                self._changes.append(Change(path_name, "binary", change_type))
                 continue
 
-            if self.ignore_config.is_excluded(path_name):
+            # The content runs from the first "+++ " line to the next separator, if any
+            separator = CONTENT_SEPARATOR_RE.search(buffer, start, end)
+            if separator is None:
+                self._changes.append(Change(path_name, "source", change_type))
                 continue
+            content_start = separator.end()
+            separator = CONTENT_SEPARATOR_RE.search(buffer, content_start, end)
+            content_end = separator.start() if separator else end
+            self._changes.append(Change(path_name, "source", change_type, buffer=buffer,
+                                        start=content_start, end=content_end))
+
+    def _map(self):
+        """
+        Map the patch file in memory.
+
+        Returns:
+            The read-only mapping of the file (bytes if it is empty).
+        """
+        with open(self.patchfile, 'rb') as f:
+            try:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # An empty file cannot be mapped
+                return b''
+
+    def change_sizes(self) -> list:
+        """
+        Measure the diff of each change without decoding it.
+
+        Returns:
+            list: The size in bytes of the diff section of each change, in
+            the order of iter_changes().
+        """
+        buffer = self._buffer if self._buffer is not None else self._map()
+        try:
+            return [end - start for path_name, start, end in iter_sections(buffer)
+                    if not self.is_skipped(path_name)]
+        finally:
+            # The parsed changes read their content from self._buffer; a
+            # mapping made only to measure the sections is released at once
+            if buffer is not self._buffer and isinstance(buffer, mmap.mmap):
+                buffer.close()
+
+    def is_skipped(self, path_name: str) -> bool:
+        """
+        Check if a file is excluded from the checks.
+
+        Args:
+            path_name (str): The path of the changed file.
+
+        Returns:
+            bool: True if the file matches a hardcoded or config-based exclusion.
+        """
+        return self.ignore_config.is_excluded(path_name)
+
+    @property
+    def changes(self) -> list:
+        """
+        The list of changes in the patch file.
 
-            self.changes.append({
-                'path_name': path_name,
-                'file_type': file_type,
-                'change_type': change_type,
-                'content': file_content
-            })
+        In streaming mode, accessing this materializes every change in memory.
+        Checkers should prefer iter_changes().
+        """
+        if self._changes is None:
+            self._changes = list(self._stream_changes())
+        return self._changes
+
+    def iter_changes(self):
+        """
+        Iterate over the changes in the patch file.
+
+        Yields:
+            Change: The change in one file.
+        """
+        if self.streaming and self._changes is None:
+            yield from self._stream_changes()
+        else:
+            yield from self._changes
+
+    def _stream_changes(self):
+        """
+        Parse the patch file incrementally, one diff section at a time.
+
+        Yields:
+            Change: The change in one file.
+        """
+        # Each checker streams the patch again; only count skipped files once.
+        # next() on itertools.count is atomic, as checkers may run in threads.
+        first_pass = next(self._stream_passes) == 0
+
+        def is_skipped(path_name: str) -> bool:
+            skipped = self.is_skipped(path_name)
+            if skipped and first_pass:
+                tracer.count('files_skipped')
+            return skipped
+
+        with open(self.patchfile, 'r', encoding='utf-8') as f:
+            yield from iter_diff_changes(f, is_skipped)
 
     def get_changes(self):
         """
         Get the list of changes in the patch file.
 
         Returns:
-            list: A list of dictionaries representing the changes in each file.
+            list: The Change of each file.
         """
         return self.changes
+
+
+def iter_sections(buffer):
+    """
+    Split the bytes of a patch into the diff sections of each file.
+
+    Args:
+        buffer: The patch bytes, e.g. a mapped patch file.
+
+    Yields:
+        tuple: The path of the changed file and the offsets of the start and
+        end of its section, after its "diff" line.
+    """
+    # Split patch into meta (git commit, summary) vs. code content
+    headers = list(FILE_DELIMITER_BYTES_RE.finditer(buffer))
+    for index, header in enumerate(headers):
+        end = headers[index + 1].start() if index + 1 < len(headers) else len(buffer)
+        yield header.group('file_name').decode('utf-8').rstrip('\r'), header.end(), end
+
+
+def iter_diff_changes(lines, is_skipped):
+    """
+    Parse the lines of a git diff into change records.
+
+    Each file's change is yielded as soon as its section ends, so only one
+    file's diff is held in memory at a time.
+
+    Args:
+        lines (iterable): The lines of the diff, including their newlines.
+        is_skipped (callable): Called with each path; the sections of paths it
+            returns True for are discarded.
+
+    Yields:
+        Change: The change in one file.
+    """
+    section = None
+    for line in lines:
+        header = FILE_DELIMITER_RE.match(line)
+        if header:
+            if section is not None and not section.skipped:
+                yield section.to_change()
+            path_name = header.group('file_name')
+            section = _DiffSection(path_name, is_skipped(path_name))
+        elif section is not None:
+            section.feed(line)
+
+    if section is not None and not section.skipped:
+        yield section.to_change()
+
+
+class _DiffSection:
+    """
+    Accumulates the lines of a single file's diff while streaming a patch.
+
+    The section is classified with the same rules as the mapped parser, which
+    searches the whole section: the first "<word> file mode" decides between
+    ADDED and DELETED, "GIT binary patch" anywhere makes it binary, and the
+    content runs from the first "+++ " separator to the next one, if any.
+    """
+
+    def __init__(self, path_name: str, skipped: bool) -> None:
+        """
+        Initialize the section.
+
+        Args:
+            path_name (str): The path of the changed file.
+            skipped (bool): Whether the file is excluded; its lines are then discarded.
+        """
+        self.path_name = path_name
+        self.skipped = skipped
+        self.file_type = "source"
+        self.mode_word = None
+        self.renamed = False
+        self.in_content = False
+        self.content_done = False
+        self.previous_line = ""
+        self.lines = []
+
+    def feed(self, line: str) -> None:
+        """
+        Consume the next line of the section.
+
+        Args:
+            line (str): The line, including its trailing newline.
+        """
+        if self.skipped or self.file_type == "binary":
+            return
+
+        if 'GIT binary patch' in line:
+            # The base85 payload is never scanned, so it is not kept
+            self.file_type = "binary"
+            self.lines = []
+            return
+        if self.mode_word is None and 'file mode' in line:
+            match = CHANGE_TYPE_TEXT_RE.search(line)
+            if match:
+                self.mode_word = match.group(1)
+        if (not self.renamed and line.startswith('rename to')
+                and 'rename from' in self.previous_line):
+            self.renamed = True
+        self.previous_line = line
+
+        if self.content_done:
+            return
+        separator = line.find('+++ ')
+        if self.in_content:
+            if separator == -1:
+                self.lines.append(line)
+            else:
+                self.lines.append(line[:separator])
+                self.content_done = True
+        elif separator != -1:
+            # The separator runs to the end of its line
+            self.in_content = True
+            if line.endswith('\n'):
+                self.lines.append('\n')
+
+    def to_change(self) -> Change:
+        """
+        Build the change record for the section.
+
+        Returns:
+            Change: The change in the file.
+        """
+        if self.mode_word == "new":
+            change_type = "ADDED"
+        elif self.mode_word == "deleted":
+            change_type = "DELETED"
+        elif self.renamed:
+            change_type = "RENAMED"
+        else:
+            change_type = "MODIFIED"
+        content = "".join(self.lines) if self.in_content and self.file_type == "source" else None
+        return Change(self.path_name, self.file_type, change_type, content)
@@ -0,0 +1,176 @@
+"""
+Module to run the license and copyright checks of a patch concurrently.
+
+With the CLI and parallel engines, scancode detects licenses in other
+processes and the license check mostly waits on them, so the copyright
+check, a pure-Python pass over the diff, runs in a thread meanwhile. The
+in-process engine detects in this process and holds the GIL, so a thread
+would only take turns with it: the copyright check then runs in a forked
+process instead, or after the license check where forking is not possible.
+Either way the total time is close to the longest of the two checks instead
+of their sum.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from scanner.tracing import tracer
+
+
+def can_fork() -> bool:
+    """
+    Check if a check can run in a forked process.
+
+    Forking is only safe while this process runs a single thread: a lock
+    held by another thread would stay locked in the child.
+
+    Returns:
+        bool: True if the fork start method is available and safe.
+    """
+    return ('fork' in multiprocessing.get_all_start_methods()
+            and threading.active_count() == 1)
+
+
+def start_forked(function):
+    """
+    Call a function in a forked process.
+
+    Args:
+        function (callable): Called in the child; its result must be picklable.
+
+    Returns:
+        callable: Waits for the child and returns the result of the function,
+        or raises its exception.
+    """
+    context = multiprocessing.get_context('fork')
+    receiver, sender = context.Pipe(duplex=False)
+
+    def target() -> None:
+        try:
+            outcome = (True, function())
+        except Exception as e:
+            outcome = (False, e)
+        sender.send(outcome)
+
+    process = context.Process(target=target, name='copyright', daemon=True)
+    process.start()
+    sender.close()
+
+    def result():
+        try:
+            succeeded, value = receiver.recv()
+        except EOFError:
+            raise RuntimeError(f"Check process exited with status {process.exitcode} "
+                               f"without a result") from None
+        finally:
+            receiver.close()
+            process.join()
+        if not succeeded:
+            raise value
+        return value
+
+    return result
+
+
+def run_concurrently(foreground, background, in_thread: bool = True) -> tuple:
+    """
+    Run two functions at the same time.
+
+    The foreground function runs in the calling thread, so objects bound to
+    it (e.g. the sqlite connection of the detection cache) stay there.
+
+    Args:
+        foreground (callable): Called in the calling thread.
+        background (callable): Called in a worker thread, or in a forked
+            process (or after the foreground function if forking is not
+            possible) when in_thread is False.
+        in_thread (bool): Run the background function in a thread; only
+            worth it when the foreground function mostly waits on other
+            processes.
+
+    Returns:
+        tuple: The results of foreground and background.
+    """
+    if not in_thread:
+        if not can_fork():
+            return foreground(), background()
+        background_result = start_forked(background)
+        return foreground(), background_result()
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix='copyright') as executor:
+        future = executor.submit(background)
+        result = foreground()
+        return result, future.result()
+
+
+def serialized(function):
+    """
+    Wrap a function so that calls from several threads run one at a time.
+
+    Args:
+        function (callable): The function to wrap.
+
+    Returns:
+        callable: The wrapped function.
+    """
+    lock = threading.Lock()
+
+    def call(*args):
+        with lock:
+            return function(*args)
+
+    return call
+
+
+def share_hunk_lines(license_checker, copyright_checker) -> None:
+    """
+    Have two checkers running in threads share the tokenized lines of a patch.
+
+    Only checkers walking the same change records can share them: a
+    streaming patch is parsed again for each checker. Checkers running one
+    after the other, or in another process, must not share them, as the
+    lines of every change would be kept until the second one takes them.
+
+    Args:
+        license_checker (LicenseChecker): The license checker.
+        copyright_checker (CopyrightChecker): The copyright checker of the same patch.
+    """
+    shared = not license_checker.patch.streaming
+    license_checker.share_hunk_lines = copyright_checker.share_hunk_lines = shared
+
+
+def run_checks(license_checker, copyright_checker, on_issues=None) -> tuple:
+    """
+    Run the license and copyright checkers of a patch concurrently.
+
+    Args:
+        license_checker (LicenseChecker): The license checker.
+        copyright_checker (CopyrightChecker): The copyright checker.
+        on_issues (callable): Optional; called with the path and the list of
+            Issue of each flagged file as soon as its verdict is ready. Calls
+            are serialized, as both checkers report from their own thread.
+            The copyright issues found in a forked process are reported once
+            the license check is done.
+
+    Returns:
+        tuple: The flagged license files and flagged copyright files.
+    """
+    report = serialized(on_issues) if on_issues is not None else None
+
+    def check_licenses() -> dict:
+        with tracer.span('license_check'):
+            return license_checker.run(report)
+
+    if license_checker.engine.detects_out_of_process:
+        share_hunk_lines(license_checker, copyright_checker)
+        return run_concurrently(check_licenses, lambda: copyright_checker.run(report))
+    if not can_fork():
+        return check_licenses(), copyright_checker.run(report)
+
+    # In a forked process, the copyright checker cannot report to the
+    # renderers of this process
+    flagged_license_files, flagged_copyright_files = run_concurrently(
+        check_licenses, copyright_checker.run, in_thread=False)
+    if report is not None:
+        for path_name, issues in flagged_copyright_files.items():
+            report(path_name, issues)
+    return flagged_license_files, flagged_copyright_files
@@ -0,0 +1,258 @@
+"""
+Module to look up the license policy of a repository in the policy file.
+
+The policy file (JSON, or TOML on Python 3.11+ or with tomli installed) lists
+the projects and their license markings:
+
+    {
+        "default_markings": "BSD-3-Clause-Clear",
+        "projects": [
+            {"PROJECT_NAME": "org/repo", "MARKINGS": "GPL-2.0-only",
+             "ALLOWED": ["GPL-2.0-only", "MIT"], "DENIED": ["MIT"]}
+        ]
+    }
+
+A project matches a repository named PROJECT_NAME or ending with
+"/PROJECT_NAME"; the first matching project of the file wins. ALLOWED
+replaces the licenses derived from MARKINGS and DENIED removes licenses
+from them; both are optional.
+"""
+import hashlib
+import json
+import os
+from scanner.license_policy import PERMISSIVE_LICENSES, COPYLEFT_LICENSES
+
+try:
+    import tomllib
+except ImportError:
+    try:
+        import tomli as tomllib
+    except ImportError:
+        tomllib = None
+
+# The policy file shipped with the checker
+DEFAULT_POLICY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'policies.json')
+
+# License of repositories without a project entry, unless the file sets one
+DEFAULT_MARKINGS = "BSD-3-Clause-Clear"
+
+# File name of the registry index in the cache directory
+CACHE_FILE_NAME = 'policy_registry.json'
+
+
+def get_allowed_licenses(license: str) -> frozenset:
+    """
+    Get the licenses allowed in a repository with the given top level license.
+
+    Args:
+        license (str): The default/top level license of the repo.
+
+    Returns:
+        frozenset: The allowed licenses.
+    """
+    if license in PERMISSIVE_LICENSES:
+        return PERMISSIVE_LICENSES
+    if license in COPYLEFT_LICENSES:
+        return COPYLEFT_LICENSES
+    return frozenset([license])
+
+
+class ProjectPolicy:
+    """
+    The license policy of a project.
+    """
+
+    __slots__ = ('name', 'markings', 'allowed_licenses')
+
+    def __init__(self, name: str, markings: str, allowed: list = None,
+                 denied: list = None) -> None:
+        """
+        Initialize the ProjectPolicy object.
+
+        Args:
+            name (str): The project name, or None for the default policy.
+            markings (str): The default/top level license of the project.
+            allowed (list): Optional licenses replacing those derived from
+                the markings.
+            denied (list): Optional licenses that are never allowed.
+        """
+        self.name = name
+        self.markings = markings
+        allowed_licenses = frozenset(allowed) if allowed else get_allowed_licenses(markings)
+        self.allowed_licenses = allowed_licenses - frozenset(denied or ())
+
+
+class PolicyRegistry:
+    """
+    Index of the project policies.
+
+    The index maps each project name to its first entry in the policy file,
+    so a lookup tries the suffixes of the repository name made of whole path
+    segments: one dictionary lookup per segment, however many projects there
+    are. The index is plain data and can be stored as JSON; the allowed
+    licenses of a project are only derived when it is looked up.
+    """
+
+    def __init__(self, data: dict) -> None:
+        """
+        Build the index.
+
+        Args:
+            data (dict): The parsed policy file.
+
+        Raises:
+            ValueError: If a project lacks a PROJECT_NAME or MARKINGS.
+        """
+        self.default_markings = data.get('default_markings', DEFAULT_MARKINGS)
+        self.copyright_transitions = data.get('copyright_transitions', [])
+        # Project name -> [position in the file, markings, allowed, denied]
+        self.projects = {}
+        self.project_count = 0
+
+        for index, project in enumerate(data.get('projects', [])):
+            if not project.get('PROJECT_NAME') or not project.get('MARKINGS'):
+                raise ValueError(f"Project policy needs PROJECT_NAME and MARKINGS: {project}")
+            # Keep the first entry of a name, as the linear scan did
+            self.projects.setdefault(project['PROJECT_NAME'],
+                                     [index, project['MARKINGS'], project.get('ALLOWED'),
+                                      project.get('DENIED')])
+            self.project_count += 1
+        self._init_policies()
+
+    def _init_policies(self) -> None:
+        """
+        Reset the policies derived from the index.
+        """
+        self.default = ProjectPolicy(None, self.default_markings)
+        # Project name -> ProjectPolicy, derived on first lookup
+        self._policies = {}
+
+    def to_index(self) -> dict:
+        """
+        Get the index as plain data.
+
+        Returns:
+            dict: The index, as accepted by from_index().
+        """
+        return {'default_markings': self.default_markings,
+                'copyright_transitions': self.copyright_transitions,
+                'projects': self.projects, 'project_count': self.project_count}
+
+    @classmethod
+    def from_index(cls, index: dict) -> 'PolicyRegistry':
+        """
+        Restore a registry from its index.
+
+        Args:
+            index (dict): The index returned by to_index().
+
+        Returns:
+            PolicyRegistry: The registry.
+        """
+        registry = cls.__new__(cls)
+        registry.default_markings = index['default_markings']
+        registry.copyright_transitions = index['copyright_transitions']
+        registry.projects = index['projects']
+        registry.project_count = index['project_count']
+        registry._init_policies()
+        return registry
+
+    def lookup(self, repo_name: str) -> ProjectPolicy:
+        """
+        Find the policy of a repository.
+
+        Args:
+            repo_name (str): The name of the repository, e.g. "org/repo".
+
+        Returns:
+            ProjectPolicy: The policy of the first project in the file
+            matching the repository, or the default policy.
+        """
+        best_name = None
+        best_index = None
+        segments = repo_name.split('/')
+        for start in range(len(segments) - 1, -1, -1):
+            name = '/'.join(segments[start:])
+            project = self.projects.get(name)
+            if project is not None and (best_index is None or project[0] < best_index):
+                best_name, best_index = name, project[0]
+        if best_name is None:
+            return self.default
+
+        policy = self._policies.get(best_name)
+        if policy is None:
+            _, markings, allowed, denied = self.projects[best_name]
+            policy = ProjectPolicy(best_name, markings, allowed, denied)
+            self._policies[best_name] = policy
+        return policy
+
+
+def read_policy_file(path: str) -> dict:
+    """
+    Parse a JSON or TOML policy file.
+
+    Args:
+        path (str): The policy file; TOML if it ends with .toml.
+
+    Returns:
+        dict: The parsed policy file.
+
+    Raises:
+        RuntimeError: If the file is TOML and no TOML parser is available.
+    """
+    if path.endswith('.toml'):
+        if tomllib is None:
+            raise RuntimeError("Reading a TOML policy file needs Python 3.11+ or tomli")
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_policy_registry(path: str = None, cache_dir: str = None) -> PolicyRegistry:
+    """
+    Load the policy registry.
+
+    With a cache directory, the index of the registry is stored there as
+    JSON and reused while the policy file keeps the same path, size and
+    modification time and this module is unchanged.
+
+    Args:
+        path (str): The policy file. Defaults to the one shipped with the checker.
+        cache_dir (str): Optional directory of the registry index.
+
+    Returns:
+        PolicyRegistry: The registry.
+    """
+    path = os.path.abspath(path or DEFAULT_POLICY_FILE)
+    if not cache_dir:
+        return PolicyRegistry(read_policy_file(path))
+
+    stat = os.stat(path)
+    signature = {'path': path, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                 'code': _code_digest()}
+    cache_path = os.path.join(cache_dir, CACHE_FILE_NAME)
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+        if cached['signature'] == signature:
+            return PolicyRegistry.from_index(cached['index'])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+
+    registry = PolicyRegistry(read_policy_file(path))
+    os.makedirs(cache_dir, exist_ok=True)
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump({'signature': signature, 'index': registry.to_index()}, f)
+    return registry
+
+
+def _code_digest() -> str:
+    """
+    Hash the source of this module, which defines the index format.
+
+    Returns:
+        str: The hex digest.
+    """
+    with open(__file__, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
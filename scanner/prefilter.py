@@ -0,0 +1,106 @@
+"""
+Module to cheaply rule out text that cannot contain a license.
+"""
+import re
+
+# Words and phrases found in license notices, license texts and SPDX tags. The
+# list is deliberately broad: a false hit only costs a scancode scan, while a
+# false miss would hide a license.
+DEFAULT_TRIGGER_TOKENS = (
+    "licen",  # license, licence, licensed, licensing
+    "spdx",
+    "copyright",
+    "copyleft",
+    "(c)",
+    "©",
+    # License identifier stems; "gpl" also covers LGPL and AGPL, "bsd" 0BSD
+    "gpl",
+    "gnu",
+    "bsd",
+    "mit",
+    "isc",
+    "apache",
+    "mozilla",
+    "mpl",
+    "eclipse",
+    "epl",
+    "eupl",
+    "cddl",
+    "zlib",
+    "wtfpl",
+    "artistic",
+    "cc-by",
+    "cc0",
+    "-only",
+    "-or-later",
+    "creative commons",
+    "public domain",
+    "unlicense",
+    "permission is hereby granted",
+    "redistribution",
+    "redistributions",
+    "warranty",
+    "warranties",
+    "as is",
+    "all rights reserved",
+    "proprietary",
+    "confidential",
+    "terms and conditions",
+)
+
+# Tokens that are common inside ordinary words ("submit", "signup", "misc",
+# "sample", "replace"), so they only match at the start of a word
+WORD_START_TOKENS = frozenset(("mit", "gnu", "isc", "mpl", "epl"))
+
+
+class LicensePrefilter:
+    """
+    Single-regex keyword matcher deciding which texts need a scancode scan.
+    """
+
+    def __init__(self, tokens: tuple = DEFAULT_TRIGGER_TOKENS) -> None:
+        """
+        Compile the trigger tokens into one case-insensitive pattern.
+
+        Args:
+            tokens (tuple): Words or phrases that mark text as possibly
+                license-related. Tokens in WORD_START_TOKENS only match at
+                the start of a word; the others match anywhere, so that e.g.
+                "gpl" matches "LGPL-2.1-or-later".
+        """
+        self.tokens = tuple(tokens)
+        alternatives = []
+        for token in sorted(set(self.tokens), key=len, reverse=True):
+            pattern = re.escape(token).replace(r'\ ', r'\s+')
+            if token.lower() in WORD_START_TOKENS:
+                pattern = r'\b' + pattern
+            alternatives.append(pattern)
+        self.pattern = re.compile('|'.join(alternatives), re.IGNORECASE)
+        self.scanned = 0
+        self.skipped = 0
+
+    def matches(self, text: str) -> bool:
+        """
+        Check if a text may contain license information.
+
+        Args:
+            text (str): The text to check.
+
+        Returns:
+            bool: True if the text should be scanned by scancode.
+        """
+        if self.pattern.search(text):
+            self.scanned += 1
+            return True
+        self.skipped += 1
+        return False
+
+    def stats(self) -> str:
+        """
+        Summarize prefilter usage.
+
+        Returns:
+            str: A one-line summary of scanned and skipped texts.
+        """
+        total = self.scanned + self.skipped
+        return f"license prefilter: skipped {self.skipped} of {total} blobs"
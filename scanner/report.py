@@ -0,0 +1,248 @@
+"""
+Module to render the issues found in a patch.
+
+The box report is printed once every check is done, as it groups the files
+by severity. The JSON Lines and SARIF renderers write each file's issues as
+soon as its verdict is ready, so that other tools can consume them while a
+long scan is still running.
+"""
+import json
+import sys
+from scanner.issues import IssueKind, Severity
+
+# Exit status when blocking issues are found
+EXIT_BLOCKING = 1
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+TOOL_NAME = "copyright-license-checker"
+TOOL_URI = "https://github.com/qualcomm/copyright-license-checker-action"
+
+# SARIF rule descriptions of the issue kinds
+RULE_DESCRIPTIONS = {
+    IssueKind.LICENSE_CHANGED: "The license of a file was changed to a non-permissive one.",
+    IssueKind.LICENSE_INCOMPATIBLE: "A license incompatible with the repository was added.",
+    IssueKind.LICENSE_DELETED: "A license was deleted without a replacement.",
+    IssueKind.LICENSE_MISSING: "A new source file has no license.",
+    IssueKind.COPYRIGHT_DELETED: "A copyright statement was deleted.",
+}
+
+
+def format_report(flagged_files: dict, warning_files: dict, log_prefix: str) -> str:
+    """
+    Format the flagged files report in a beautified format.
+
+    Args:
+        flagged_files (dict): A dictionary of flagged files with blocking issues.
+        warning_files (dict): A dictionary of files with warning issues (non-blocking).
+        log_prefix (str): The prefix to use for logging.
+
+    Returns:
+        str: The report.
+    """
+    # Only show the report header if there are issues to report
+    if not flagged_files and not warning_files:
+        return f"{log_prefix} ✅ No license or copyright issues detected"
+    
+    output = []
+    output.append(f"{log_prefix} ┌───────────────────────────────────────────┐")
+    output.append(f"{log_prefix} │           **Flagged Files Report**         │")
+    output.append(f"{log_prefix} ├───────────────────────────────────────────┤")
+    
+    # Add COMPLIANCE.md reference
+    output.append(f"{log_prefix} │")
+    output.append(f"{log_prefix} │ 📖 For more information, see: COMPLIANCE.md")
+    output.append(f"{log_prefix} │    https://github.com/qualcomm/copyright-license-checker-action/blob/main/COMPLIANCE.md")
+    output.append(f"{log_prefix} ├───────────────────────────────────────────┤")
+
+    # Print blocking errors first
+    if flagged_files:
+        output.append(f"{log_prefix} │")
+        output.append(f"{log_prefix} │ ═══════════════════════════════════════════")
+        output.append(f"{log_prefix} │ 🚨  B L O C K I N G   E R R O R S")
+        output.append(f"{log_prefix} │ ═══════════════════════════════════════════")
+        for file, issues in flagged_files.items():
+            output.append(f"{log_prefix} │")
+            output.append(f"{log_prefix} │ ┌─ 📄 F I L E: {file}")
+            if issues['license_issues']:
+                output.append(f"{log_prefix} │ │")
+                output.append(f"{log_prefix} │ ├─ 🚨 LICENSE ISSUES:")
+                for issue in issues['license_issues']:
+                    output.append(f"{log_prefix} │ │  • {issue}")
+            if issues['copyright_issues']:
+                output.append(f"{log_prefix} │ │")
+                output.append(f"{log_prefix} │ ├─ 🚨 COPYRIGHT ISSUES:")
+                for issue in issues['copyright_issues']:
+                    output.append(f"{log_prefix} │ │  • {issue}")
+            output.append(f"{log_prefix} │ └─────────────────────────────────────────")
+
+    # Print warnings (non-blocking)
+    if warning_files:
+        output.append(f"{log_prefix} │")
+        output.append(f"{log_prefix} │ ═══════════════════════════════════════════")
+        output.append(f"{log_prefix} │ ⚠️   W A R N I N G S  (Non-blocking)")
+        output.append(f"{log_prefix} │ ═══════════════════════════════════════════")
+        for file, issues in warning_files.items():
+            output.append(f"{log_prefix} │")
+            output.append(f"{log_prefix} │ ┌─ 📄 F I L E: {file}")
+            if issues['license_issues']:
+                output.append(f"{log_prefix} │ │")
+                output.append(f"{log_prefix} │ ├─ ⚠️  LICENSE WARNINGS:")
+                for issue in issues['license_issues']:
+                    output.append(f"{log_prefix} │ │  • {issue}")
+            if issues['copyright_issues']:
+                output.append(f"{log_prefix} │ │")
+                output.append(f"{log_prefix} │ ├─ ⚠️  COPYRIGHT WARNINGS:")
+                for issue in issues['copyright_issues']:
+                    output.append(f"{log_prefix} │ │  • {issue}")
+            output.append(f"{log_prefix} │ └─────────────────────────────────────────")
+    
+    output.append(f"{log_prefix} └───────────────────────────────────────────┘")
+
+    return "\n".join(output)
+
+
+class Renderer:
+    """
+    Base class of the report renderers.
+    """
+
+    def file_issues(self, path_name: str, issues: list) -> None:
+        """
+        Render the issues of one file as soon as its verdict is ready.
+
+        Args:
+            path_name (str): The path of the flagged file.
+            issues (list): The Issue records found in the file.
+        """
+
+    def finish(self, flagged_files: dict, warning_files: dict) -> None:
+        """
+        Complete the report once every check is done.
+
+        Args:
+            flagged_files (dict): A dictionary of flagged files with blocking issues.
+            warning_files (dict): A dictionary of files with warning issues (non-blocking).
+        """
+
+    def abort(self, error: BaseException) -> None:
+        """
+        Complete the report when the checks failed, so the issues already
+        rendered stay readable.
+
+        Args:
+            error (BaseException): The error that stopped the checks.
+        """
+
+
+class BoxRenderer(Renderer):
+    """
+    Renders the human-readable box report.
+    """
+
+    def __init__(self, log_prefix: str, stream=None) -> None:
+        """
+        Initialize the BoxRenderer object.
+
+        Args:
+            log_prefix (str): The prefix of every line.
+            stream: The text stream to write to. Defaults to sys.stdout.
+        """
+        self.log_prefix = log_prefix
+        self.stream = stream
+
+    def finish(self, flagged_files: dict, warning_files: dict) -> None:
+        print(format_report(flagged_files, warning_files, self.log_prefix),
+              file=self.stream or sys.stdout)
+
+
+class JsonLinesRenderer(Renderer):
+    """
+    Writes one JSON object per issue, then a summary object.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the JsonLinesRenderer object.
+
+        Args:
+            path (str): The output file.
+        """
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def file_issues(self, path_name: str, issues: list) -> None:
+        for issue in issues:
+            self.file.write(json.dumps({'type': 'issue', **issue.to_dict()}) + "\n")
+        self.file.flush()
+
+    def finish(self, flagged_files: dict, warning_files: dict) -> None:
+        self.file.write(json.dumps({
+            'type': 'summary',
+            'blocking_files': len(flagged_files),
+            'warning_files': len(warning_files),
+        }) + "\n")
+        self.file.close()
+
+    def abort(self, error: BaseException) -> None:
+        self.file.write(json.dumps({'type': 'error', 'message': str(error) or type(error).__name__})
+                        + "\n")
+        self.file.close()
+
+
+class SarifRenderer(Renderer):
+    """
+    Writes a SARIF 2.1.0 log, one result per issue.
+
+    The log is a single JSON document, so it is written in pieces: the tool
+    description up front, each result as it arrives and the closing brackets
+    at the end. If the checks fail, the log is still closed, with an
+    unsuccessful invocation.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Initialize the SarifRenderer object and write the start of the log.
+
+        Args:
+            path (str): The output file.
+        """
+        self.file = open(path, 'w', encoding='utf-8')
+        self.results = 0
+        driver = {
+            'name': TOOL_NAME,
+            'informationUri': TOOL_URI,
+            'rules': [
+                {'id': kind.value, 'shortDescription': {'text': description}}
+                for kind, description in RULE_DESCRIPTIONS.items()
+            ],
+        }
+        self.file.write(f'{{"$schema": "{SARIF_SCHEMA}", "version": "2.1.0", '
+                        f'"runs": [{{"tool": {{"driver": {json.dumps(driver)}}}, "results": [')
+        self.file.flush()
+
+    def file_issues(self, path_name: str, issues: list) -> None:
+        for issue in issues:
+            result = {
+                'ruleId': issue.kind.value,
+                'level': 'error' if issue.severity is Severity.ERROR else 'warning',
+                'message': {'text': issue.message()},
+                'locations': [{
+                    'physicalLocation': {'artifactLocation': {'uri': issue.path_name}},
+                }],
+            }
+            self.file.write(("," if self.results else "") + "\n" + json.dumps(result))
+            self.results += 1
+        self.file.flush()
+
+    def finish(self, flagged_files: dict, warning_files: dict) -> None:
+        self.file.write("\n]}]}\n")
+        self.file.close()
+
+    def abort(self, error: BaseException) -> None:
+        invocation = {
+            'executionSuccessful': False,
+            'toolExecutionNotifications': [
+                {'level': 'error', 'message': {'text': str(error) or type(error).__name__}},
+            ],
+        }
+        self.file.write(f'\n], "invocations": [{json.dumps(invocation)}]}}]}}\n')
+        self.file.close()
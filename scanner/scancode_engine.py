@@ -0,0 +1,459 @@
+"""
+Module with the engines that run scancode license detection.
+"""
+import bisect
+import importlib.util
+import json
+import logging
+import os
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from scanner.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+
+class ScancodeEngine:
+    """
+    Common interface of the scancode license detection engines.
+
+    An engine takes (key, text) pairs and returns, for each key, the SPDX
+    expression of the first license detection in the text, or an empty list
+    when nothing was detected.
+    """
+
+    name = None
+
+    # Whether detection runs in other processes, leaving this one mostly idle
+    detects_out_of_process = False
+
+    def detect(self, blobs) -> dict:
+        """
+        Detect licenses in a set of texts.
+
+        Args:
+            blobs (iterable): Pairs of (key, text) to scan. Keys must be hashable.
+
+        Returns:
+            dict: Dictionary mapping key -> licenses.
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """
+        Release the resources kept between detections, if any.
+        """
+
+
+class CliEngine(ScancodeEngine):
+    """
+    Runs the scancode CLI in a subprocess over a temporary directory of blobs.
+    """
+
+    name = 'cli'
+    detects_out_of_process = True
+
+    def __init__(self, processes: int = 1, tmp_root: str = None) -> None:
+        """
+        Initialize the CliEngine object.
+
+        Args:
+            processes (int): Number of processes scancode scans with.
+            tmp_root (str): Directory the temporary scan tree is created in,
+                e.g. a tmpfs mount. Defaults to the system temp directory.
+        """
+        self.processes = processes
+        self.tmp_root = tmp_root
+
+    def iter_file_results(self, tmpdir: str):
+        """
+        Run scancode over the files of a directory and stream its results.
+
+        scancode writes JSON Lines to a pipe; each line is decoded, its file
+        records are yielded and it is then dropped, so the whole result
+        document is never held in memory.
+
+        Args:
+            tmpdir (str): The directory to scan.
+
+        Yields:
+            dict: The scancode result of each file.
+
+        Raises:
+            subprocess.CalledProcessError: If scancode fails.
+        """
+        with tracer.span('scancode_subprocess', processes=self.processes):
+            process = subprocess.Popen([
+                'scancode',
+                '--license',
+                '--strip-root',
+                '--quiet',
+                '--processes', str(self.processes),
+                '--json-lines', '-',
+                tmpdir
+            ], stdout=subprocess.PIPE, encoding='utf-8')
+            try:
+                for line in process.stdout:
+                    # Other lines hold the headers and the license summary
+                    yield from json.loads(line).get('files', ())
+            finally:
+                process.stdout.close()
+                process.wait()
+
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, process.args)
+
+    def detect(self, blobs) -> dict:
+        """
+        Detect licenses by writing each blob to a temp file and scanning them
+        with a single scancode run.
+
+        Args:
+            blobs (iterable): Pairs of (key, text) to scan.
+
+        Returns:
+            dict: Dictionary mapping key -> licenses.
+        """
+        with tempfile.TemporaryDirectory(dir=self.tmp_root) as tmpdir:
+            file_map = {}
+            with tracer.span('write_temp_files'):
+                for key, text in blobs:
+                    blob_file = f"{len(file_map)}.txt"
+                    Path(tmpdir, blob_file).write_text(text)
+                    file_map[blob_file] = key
+
+            if not file_map:
+                return {}
+
+            results = {}
+            for file_result in self.iter_file_results(tmpdir):
+                if file_result['type'] != 'file':
+                    continue
+
+                filename = os.path.basename(file_result['path'])
+                if filename not in file_map:
+                    continue
+
+                licenses = []
+                if len(file_result.get('license_detections', [])):
+                    licenses = file_result['license_detections'][0]['license_expression_spdx']
+
+                results[file_map[filename]] = licenses
+
+            return results
+
+
+class ConcatenatedCliEngine(CliEngine):
+    """
+    Runs the scancode CLI over a few large files, each packing many blobs.
+
+    Blobs are written one after another, separated by blank lines, and the
+    line range of every blob is recorded. Detections are mapped back to the
+    blob containing their first matched line. The separators are wider than
+    the gap scancode bridges when grouping matches into one detection, so a
+    detection never spans two blobs.
+    """
+
+    name = 'concat'
+
+    # Lines between two blobs
+    SEPARATOR_LINES = 8
+
+    # Bytes of blob text packed into one scan file
+    SCAN_FILE_SIZE = 8 * 1024 * 1024
+
+    def detect(self, blobs) -> dict:
+        """
+        Detect licenses by packing blobs into concatenated scan files.
+
+        Args:
+            blobs (iterable): Pairs of (key, text) to scan.
+
+        Returns:
+            dict: Dictionary mapping key -> licenses.
+        """
+        separator = "\n" * self.SEPARATOR_LINES
+        with tempfile.TemporaryDirectory(dir=self.tmp_root) as tmpdir:
+            # scan file name -> (list of blob start lines, list of blob keys)
+            line_index = {}
+            results = {}
+            scan_file = None
+            with tracer.span('write_temp_files'):
+                for key, text in blobs:
+                    if scan_file is None or scan_file.tell() >= self.SCAN_FILE_SIZE:
+                        if scan_file is not None:
+                            scan_file.close()
+                        scan_name = f"{len(line_index)}.txt"
+                        scan_file = open(os.path.join(tmpdir, scan_name), 'w', encoding='utf-8')
+                        starts, keys = line_index[scan_name] = ([], [])
+                        next_line = 1
+
+                    # Normalize line breaks so that our line count matches scancode's
+                    lines = text.splitlines() or ['']
+                    starts.append(next_line)
+                    keys.append(key)
+                    scan_file.write("\n".join(lines))
+                    scan_file.write(separator)
+                    next_line += len(lines) - 1 + self.SEPARATOR_LINES
+                    results[key] = []
+
+            if scan_file is None:
+                return {}
+            scan_file.close()
+
+            for file_result in self.iter_file_results(tmpdir):
+                filename = os.path.basename(file_result['path'])
+                if file_result['type'] != 'file' or filename not in line_index:
+                    continue
+
+                starts, keys = line_index[filename]
+                seen = set()
+                for detection in file_result.get('license_detections', []):
+                    first_line = min(match['start_line'] for match in detection['matches'])
+                    key = keys[bisect.bisect_right(starts, first_line) - 1]
+                    # Same as a per-blob scan: keep the first detection of each blob
+                    if key not in seen:
+                        seen.add(key)
+                        results[key] = detection['license_expression_spdx']
+
+            return results
+
+
+class InProcessEngine(ScancodeEngine):
+    """
+    Calls scancode's license detection API directly.
+
+    The license index is loaded on first use and kept for the lifetime of the
+    process, so only the first detection pays for loading it.
+    """
+
+    name = 'inprocess'
+    _index = None
+
+    @classmethod
+    def get_index(cls):
+        """
+        Get the scancode license index, loading it once per process.
+
+        Returns:
+            LicenseIndex: The scancode license index.
+        """
+        if cls._index is None:
+            from licensedcode.cache import get_index
+            with tracer.span('license_index_load'):
+                cls._index = get_index()
+        return cls._index
+
+    def detect(self, blobs) -> dict:
+        """
+        Detect licenses by matching each blob against the in-memory index.
+
+        Args:
+            blobs (iterable): Pairs of (key, text) to scan.
+
+        Returns:
+            dict: Dictionary mapping key -> licenses.
+        """
+        from licensedcode.detection import detect_licenses
+
+        results = {}
+        for key, text in blobs:
+            licenses = []
+            detections = detect_licenses(index=self.get_index(), query_string=text)
+            for detection in detections:
+                # Same as the CLI: keep the first detection with an expression
+                if detection.license_expression is not None:
+                    licenses = detection.to_dict()['license_expression_spdx']
+                    break
+            results[key] = licenses
+        return results
+
+
+def _init_worker() -> None:
+    """
+    Load the license index once in each worker process.
+    """
+    InProcessEngine.get_index()
+
+
+def _detect_shard(shard: list) -> dict:
+    """
+    Detect licenses for one shard of blobs in a worker process.
+
+    Args:
+        shard (list): Pairs of (key, text) to scan.
+
+    Returns:
+        dict: Dictionary mapping key -> licenses.
+    """
+    return InProcessEngine().detect(shard)
+
+
+class ParallelEngine(ScancodeEngine):
+    """
+    Shards blobs across a pool of worker processes running the in-process engine.
+
+    Blobs are sorted by size and packed into shards of roughly equal byte size,
+    largest first, so a single huge blob starts early and is not queued behind
+    many small ones. Unlike the other engines, all blobs are held in memory
+    while they are sharded.
+    """
+
+    name = 'parallel'
+    detects_out_of_process = True
+
+    # Shards per worker; more shards even out the load at some dispatch cost
+    SHARDS_PER_WORKER = 4
+
+    def __init__(self, workers: int, keep_pool: bool = False) -> None:
+        """
+        Initialize the ParallelEngine object.
+
+        Args:
+            workers (int): Number of worker processes.
+            keep_pool (bool): Keep the worker processes, and their loaded
+                index, between detections instead of starting a pool per run.
+        """
+        self.workers = workers
+        self.keep_pool = keep_pool
+        self._pool = None
+        # Guards the creation of the kept pool, as the check service
+        # detects from several threads
+        self._pool_lock = threading.Lock()
+
+    def shard(self, blobs) -> list:
+        """
+        Split blobs into size-balanced shards.
+
+        Args:
+            blobs (iterable): Pairs of (key, text) to scan.
+
+        Returns:
+            list: Lists of (key, text) pairs, in decreasing order of size.
+        """
+        blobs = sorted(blobs, key=lambda blob: len(blob[1]), reverse=True)
+        total_size = sum(len(text) for _, text in blobs)
+        shard_size = max(1, total_size // (self.workers * self.SHARDS_PER_WORKER))
+
+        shards = []
+        current, current_size = [], 0
+        for key, text in blobs:
+            current.append((key, text))
+            current_size += len(text)
+            if current_size >= shard_size:
+                shards.append(current)
+                current, current_size = [], 0
+        if current:
+            shards.append(current)
+        return shards
+
+    def detect(self, blobs) -> dict:
+        """
+        Detect licenses by scanning shards of blobs in parallel.
+
+        Args:
+            blobs (iterable): Pairs of (key, text) to scan.
+
+        Returns:
+            dict: Dictionary mapping key -> licenses.
+        """
+        with tracer.span('shard_blobs'):
+            shards = self.shard(blobs)
+        if not shards:
+            return {}
+
+        results = {}
+        if self.keep_pool:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                     initializer=_init_worker)
+                pool = self._pool
+            for shard_results in pool.map(_detect_shard, shards):
+                results.update(shard_results)
+            return results
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(shards)),
+                                 initializer=_init_worker) as pool:
+            for shard_results in pool.map(_detect_shard, shards):
+                results.update(shard_results)
+        return results
+
+    def close(self) -> None:
+        """
+        Stop the kept worker processes, if any.
+        """
+        with self._pool_lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown()
+
+
+ENGINES = {
+    CliEngine.name: CliEngine,
+    ConcatenatedCliEngine.name: ConcatenatedCliEngine,
+    InProcessEngine.name: InProcessEngine,
+}
+
+DEFAULT_ENGINE = InProcessEngine.name
+
+
+def get_engine(name: str = DEFAULT_ENGINE, workers: int = 1,
+               tmp_root: str = None, keep_pool: bool = False) -> ScancodeEngine:
+    """
+    Create a detection engine by name.
+
+    The in-process engine falls back to the CLI engine when the scancode
+    libraries are not installed in this interpreter.
+
+    Args:
+        name (str): One of the names in ENGINES.
+        workers (int): Number of processes to detect with; 0 uses every CPU.
+        tmp_root (str): Directory the CLI engines create their scan trees in.
+        keep_pool (bool): Keep the worker processes of the in-process engine
+            between detections, e.g. in a long-running service.
+
+    Returns:
+        ScancodeEngine: The engine.
+    """
+    if name not in ENGINES:
+        raise ValueError(f"Unknown scancode engine: {name}")
+
+    if workers <= 0:
+        workers = os.cpu_count() or 1
+
+    if name == InProcessEngine.name and importlib.util.find_spec('licensedcode') is None:
+        logger.warning("In-process scancode unavailable (no licensedcode package), "
+                       "using the CLI")
+        name = CliEngine.name
+
+    if name in (CliEngine.name, ConcatenatedCliEngine.name):
+        return ENGINES[name](processes=workers, tmp_root=tmp_root)
+    if workers > 1:
+        return ParallelEngine(workers, keep_pool)
+    return InProcessEngine()
+
+
+def compare_engines(reference: ScancodeEngine, candidate: ScancodeEngine, blobs: list) -> dict:
+    """
+    Run two engines over the same blobs and report where they disagree.
+
+    Args:
+        reference (ScancodeEngine): The engine whose results are trusted.
+        candidate (ScancodeEngine): The engine being checked for parity.
+        blobs (list): Pairs of (key, text) to scan.
+
+    Returns:
+        dict: Dictionary mapping key -> (reference licenses, candidate licenses)
+        for every key where the results differ.
+    """
+    expected = reference.detect(blobs)
+    actual = candidate.detect(blobs)
+    return {
+        key: (expected.get(key, []), actual.get(key, []))
+        for key in expected.keys() | actual.keys()
+        if expected.get(key, []) != actual.get(key, [])
+    }
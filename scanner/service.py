@@ -0,0 +1,395 @@
+"""
+Module to run the checks as a long-running local service.
+
+Each check started from the command line pays for starting Python, loading
+the policy file and loading scancode's license index. The service loads
+them once and answers check requests over HTTP on localhost:
+
+    POST /check  {"repo_name": "org/repo", "patch": "<patch text>",
+                  "licenseignores": {"<directory, '' for the root>":
+                                     "<.licenseignore text>", ...}}
+    ->           {"license_issues": {path: [issue, ...]},
+                  "copyright_issues": {path: [issue, ...]}}
+
+    GET /health  -> {"queued": n, "completed": n}
+
+The client sends the .licenseignore files of the root and of every
+directory holding a changed file. Requests wait in a bounded queue for one
+of a fixed number of worker threads; a full queue is answered with 503 and
+a request that no worker started within the timeout with 504. A started
+check is always answered, so the client never checks the same patch again
+while a worker is still busy with it.
+"""
+import json
+import logging
+import os
+import queue
+import tempfile
+import threading
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from scanner.patch import EXCLUDED_SUFFIXES, FILE_DELIMITER_BYTES_RE, Patch
+from scanner.ignore_config import IGNORE_FILE_NAME, IgnoreConfig
+from scanner.license_scancode import LicenseChecker
+from scanner.copyright_checker import CopyrightChecker
+from scanner.copyright_transitions import TransitionRules
+from scanner.policy_registry import PolicyRegistry
+from scanner.pipeline import run_checks
+from scanner.issues import decode_issues, encode_issues
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8765
+
+# Seconds the client waits for an answer; the service enforces its own,
+# shorter, per-request timeout
+CLIENT_TIMEOUT = 3600
+
+# Text scanned once at startup, so the first request finds the index loaded
+WARMUP_TEXT = "SPDX-License-Identifier: BSD-3-Clause-Clear"
+
+
+class CheckJob:
+    """
+    A check request waiting for, or handled by, a worker.
+    """
+
+    __slots__ = ('repo_name', 'patch', 'licenseignores', 'lock', 'started', 'cancelled', 'done',
+                 'result', 'error')
+
+    def __init__(self, repo_name: str, patch: str, licenseignores: dict = None) -> None:
+        """
+        Initialize the CheckJob object.
+
+        Args:
+            repo_name (str): The name of the repository the patch applies to.
+            patch (str): The patch text; undecodable bytes are surrogate-escaped.
+            licenseignores (dict): The .licenseignore texts of the client, by
+                directory relative to the root ('' for the root).
+
+        Raises:
+            ValueError: If a directory is not relative to the root.
+        """
+        self.repo_name = repo_name
+        self.patch = patch
+        self.licenseignores = licenseignores or {}
+        for directory in self.licenseignores:
+            normalized = os.path.normpath(directory) if directory else ''
+            if os.path.isabs(normalized) or normalized.split(os.sep)[0] == '..':
+                raise ValueError(f"Ignore file outside the tree: {directory}")
+        # Guards started and cancelled, set by the worker and the handler
+        self.lock = threading.Lock()
+        self.started = threading.Event()
+        self.cancelled = False
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def start(self) -> bool:
+        """
+        Mark the job as taken by a worker, unless it was cancelled.
+
+        Returns:
+            bool: True if the worker should check it.
+        """
+        with self.lock:
+            if self.cancelled:
+                return False
+            self.started.set()
+            return True
+
+    def cancel(self) -> bool:
+        """
+        Cancel the job, unless a worker already started it.
+
+        Returns:
+            bool: True if the job was cancelled.
+        """
+        with self.lock:
+            if not self.started.is_set():
+                self.cancelled = True
+            return self.cancelled
+
+
+class CheckService:
+    """
+    Pool of worker threads checking queued patches with warm detection state.
+
+    The engine, policy registry and transition rules are shared by every
+    worker. Each worker creates its own prefilter, clusterer and cache, as
+    they keep per-run state (and the cache a thread-bound connection).
+    """
+
+    def __init__(self, registry: PolicyRegistry, transitions: TransitionRules, engine,
+                 detection_factory, concurrency: int = 2, queue_size: int = 16,
+                 timeout: float = 600, streaming: bool = False, tmp_root: str = None) -> None:
+        """
+        Initialize the CheckService object.
+
+        Args:
+            registry (PolicyRegistry): The project policies.
+            transitions (TransitionRules): The allowed copyright holder transitions.
+            engine (ScancodeEngine): The detection engine shared by the workers.
+            detection_factory (callable): Called once in each worker thread;
+                returns the prefilter, clusterer and cache (each possibly None)
+                of the worker.
+            concurrency (int): Number of patches checked at the same time.
+            queue_size (int): Number of requests waiting for a worker before
+                new ones are refused.
+            timeout (float): Seconds a request may wait for a worker.
+            streaming (bool): Parse the patches incrementally.
+            tmp_root (str): Directory the submitted patches are written to.
+        """
+        self.registry = registry
+        self.transitions = transitions
+        self.engine = engine
+        self.detection_factory = detection_factory
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.streaming = streaming
+        self.tmp_root = tmp_root
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.completed = 0
+        self._workers = []
+
+    def start(self) -> None:
+        """
+        Load the license index and start the worker threads.
+        """
+        self.engine.detect([(0, WARMUP_TEXT)])
+        for number in range(self.concurrency):
+            worker = threading.Thread(target=self._work, name=f'check-{number}', daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def stop(self) -> None:
+        """
+        Finish the queued requests, then stop the workers and the engine.
+        """
+        for _ in self._workers:
+            self.queue.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+        self.engine.close()
+
+    def submit(self, job: CheckJob) -> None:
+        """
+        Queue a check request.
+
+        Args:
+            job (CheckJob): The request.
+
+        Raises:
+            queue.Full: If the queue is full.
+        """
+        self.queue.put_nowait(job)
+
+    def _work(self) -> None:
+        """
+        Check queued requests until stop() is called.
+        """
+        prefilter, clusterer, cache = self.detection_factory()
+        try:
+            while True:
+                job = self.queue.get()
+                if job is None:
+                    return
+                if not job.start():
+                    continue
+                try:
+                    job.result = self.check(job, prefilter, clusterer, cache)
+                except Exception as e:
+                    logger.exception("Check of %s failed", job.repo_name)
+                    job.error = str(e)
+                finally:
+                    self.completed += 1
+                    job.done.set()
+        finally:
+            if cache is not None:
+                cache.close()
+
+    def check(self, job: CheckJob, prefilter, clusterer, cache) -> dict:
+        """
+        Check the patch of a request.
+
+        Args:
+            job (CheckJob): The request.
+            prefilter (LicensePrefilter): The prefilter of the worker, or None.
+            clusterer (TemplateClusterer): The clusterer of the worker, or None.
+            cache (DetectionCache): The cache of the worker, or None.
+
+        Returns:
+            dict: The issues of both checkers, as returned by POST /check.
+        """
+        with tempfile.TemporaryDirectory(dir=self.tmp_root) as tmpdir:
+            patch_path = os.path.join(tmpdir, 'request.patch')
+            with open(patch_path, 'wb') as f:
+                f.write(job.patch.encode('utf-8', 'surrogateescape'))
+            # The ignore files are laid out as in the client's tree
+            tree = os.path.join(tmpdir, 'tree')
+            os.mkdir(tree)
+            for directory, text in job.licenseignores.items():
+                os.makedirs(os.path.join(tree, directory), exist_ok=True)
+                with open(os.path.join(tree, directory, IGNORE_FILE_NAME), 'w',
+                          encoding='utf-8') as f:
+                    f.write(text)
+
+            patch = Patch(patch_path, streaming=self.streaming,
+                          ignore_config=IgnoreConfig(os.path.join(tree, IGNORE_FILE_NAME),
+                                                     excluded_suffixes=EXCLUDED_SUFFIXES))
+            license_checker = LicenseChecker(
+                patch, job.repo_name, self.registry.lookup(job.repo_name).allowed_licenses,
+                cache=cache, engine=self.engine, prefilter=prefilter, clusterer=clusterer)
+            copyright_checker = CopyrightChecker(patch, self.transitions)
+            flagged_license_files, flagged_copyright_files = run_checks(license_checker,
+                                                                        copyright_checker)
+
+        return {'license_issues': encode_issues(flagged_license_files),
+                'copyright_issues': encode_issues(flagged_copyright_files)}
+
+
+class _CheckRequestHandler(BaseHTTPRequestHandler):
+    """
+    HTTP front end of a CheckService, set as the server's service attribute.
+    """
+
+    def send_json(self, status: int, body: dict) -> None:
+        """
+        Send a JSON response.
+
+        Args:
+            status (int): The HTTP status.
+            body (dict): The response body.
+        """
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        service = self.server.service
+        if self.path != '/health':
+            self.send_json(404, {'error': f"Unknown path: {self.path}"})
+            return
+        self.send_json(200, {'queued': service.queue.qsize(), 'completed': service.completed})
+
+    def do_POST(self) -> None:
+        service = self.server.service
+        if self.path != '/check':
+            self.send_json(404, {'error': f"Unknown path: {self.path}"})
+            return
+
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length))
+            job = CheckJob(request['repo_name'], request['patch'],
+                           dict(request.get('licenseignores') or {}))
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_json(400, {'error': f"Invalid check request: {e}"})
+            return
+
+        try:
+            service.submit(job)
+        except queue.Full:
+            self.send_json(503, {'error': "Check queue is full"})
+            return
+
+        if not job.started.wait(service.timeout) and job.cancel():
+            self.send_json(504, {'error': f"No worker started the check within "
+                                          f"{service.timeout}s"})
+            return
+
+        # A running check cannot be interrupted; it is answered when done
+        job.done.wait()
+        if job.error is not None:
+            self.send_json(500, {'error': job.error})
+        else:
+            self.send_json(200, job.result)
+
+    def log_message(self, format: str, *args) -> None:
+        logger.info("%s %s", self.address_string(), format % args)
+
+
+def serve(service: CheckService, host: str = '127.0.0.1', port: int = DEFAULT_PORT) -> None:
+    """
+    Answer check requests until interrupted.
+
+    Args:
+        service (CheckService): The service handling the requests.
+        host (str): The address to listen on.
+        port (int): The port to listen on.
+    """
+    service.start()
+    server = ThreadingHTTPServer((host, port), _CheckRequestHandler)
+    server.daemon_threads = True
+    server.service = service
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+
+
+def collect_ignore_files(patch: bytes, root: str = '') -> dict:
+    """
+    Read the .licenseignore files applying to the changed files of a patch.
+
+    Args:
+        patch (bytes): The patch.
+        root (str): The root directory of the tree the patch applies to.
+
+    Returns:
+        dict: The texts of the existing ignore files of the root and of the
+        directories (and their parents) of the changed files, by directory
+        relative to the root ('' for the root).
+    """
+    directories = {''}
+    for match in FILE_DELIMITER_BYTES_RE.finditer(patch):
+        directory = os.path.dirname(match.group('file_name').decode('utf-8', 'surrogateescape'))
+        while directory not in directories:
+            directories.add(directory)
+            directory = os.path.dirname(directory)
+
+    licenseignores = {}
+    for directory in directories:
+        ignore_path = os.path.join(root, directory, IGNORE_FILE_NAME)
+        if os.path.isfile(ignore_path):
+            with open(ignore_path, 'r', encoding='utf-8') as f:
+                licenseignores[directory] = f.read()
+    return licenseignores
+
+
+def request_check(server_url: str, patch_file: str, repo_name: str, root: str = '') -> tuple:
+    """
+    Have a running service check a patch file.
+
+    Args:
+        server_url (str): The URL of the service, e.g. "http://127.0.0.1:8765".
+        patch_file (str): The patch file to check.
+        repo_name (str): The name of the repository the patch applies to.
+        root (str): The root directory whose .licenseignore files are sent along.
+
+    Returns:
+        tuple: The flagged license files and flagged copyright files.
+
+    Raises:
+        OSError: If the service cannot be reached or does not answer the
+            request (urllib.error.URLError and HTTPError are OSErrors).
+    """
+    with open(patch_file, 'rb') as f:
+        patch = f.read()
+
+    request = urllib.request.Request(
+        server_url.rstrip('/') + '/check',
+        data=json.dumps({'repo_name': repo_name,
+                         'patch': patch.decode('utf-8', 'surrogateescape'),
+                         'licenseignores': collect_ignore_files(patch, root)}).encode('utf-8'),
+        headers={'Content-Type': 'application/json'})
+    with urllib.request.urlopen(request, timeout=CLIENT_TIMEOUT) as response:
+        result = json.load(response)
+    return decode_issues(result['license_issues']), decode_issues(result['copyright_issues'])
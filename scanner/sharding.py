@@ -0,0 +1,210 @@
+"""
+Module to split the checks of a patch across several machines.
+
+Shard k of N only checks its share of the changes of the patch and writes
+its issues to a partial result file; merging the partial files of all N
+shards gives the report of the whole patch. Changes are assigned to shards
+by the size of their diff, largest first, each to the shard with the least
+diff so far, so every shard scans about the same amount of text. Sizes are
+measured without decoding the diffs (byte offsets in the patch file, or
+`git diff --numstat` for a git range), and the assignment only depends on
+the patch, so every shard computes the same one without coordination.
+"""
+import heapq
+import json
+from scanner.issues import decode_issues, encode_issues
+from scanner.tracing import tracer
+
+# Format version of the partial result files
+PARTIAL_VERSION = 1
+
+
+def parse_shard(text: str) -> tuple:
+    """
+    Parse a shard specification.
+
+    Args:
+        text (str): The specification "k/N", with 1 <= k <= N.
+
+    Returns:
+        tuple: The shard number k and the shard count N.
+
+    Raises:
+        ValueError: If the specification is malformed or out of range.
+    """
+    number, _, count = text.partition('/')
+    number, count = int(number), int(count)
+    if not 1 <= number <= count:
+        raise ValueError(f"Shard {text} is not between 1/{count} and {count}/{count}")
+    return number, count
+
+
+def assign_shards(sizes: list, count: int) -> list:
+    """
+    Assign items to shards, balancing the total size of the shards.
+
+    Args:
+        sizes (list): The size of each item.
+        count (int): The number of shards.
+
+    Returns:
+        list: The shard (from 0) of each item.
+    """
+    # (assigned size, shard), so ties go to the lowest shard
+    loads = [(0, shard) for shard in range(count)]
+    assignment = [0] * len(sizes)
+    for index in sorted(range(len(sizes)), key=lambda index: (-sizes[index], index)):
+        load, shard = heapq.heappop(loads)
+        assignment[index] = shard
+        heapq.heappush(loads, (load + sizes[index], shard))
+    return assignment
+
+
+class ShardedPatch:
+    """
+    The share of one shard of the changes of a patch.
+
+    It offers the same iter_changes()/changes interface as Patch, yielding
+    only the changes assigned to the shard.
+    """
+
+    def __init__(self, patch, number: int, count: int) -> None:
+        """
+        Assign the changes of the patch to shards.
+
+        Args:
+            patch (Patch): The patch (or GitRange) to split.
+            number (int): The shard number, from 1.
+            count (int): The number of shards.
+        """
+        self.patch = patch
+        self.number = number
+        self.count = count
+        self.streaming = patch.streaming
+
+        with tracer.span('shard_assign', shards=count):
+            sizes = patch.change_sizes()
+            assignment = assign_shards(sizes, count)
+        self.indexes = frozenset(index for index, shard in enumerate(assignment)
+                                 if shard == number - 1)
+        self.size = sum(sizes[index] for index in self.indexes)
+        self.total_size = sum(sizes)
+        self.change_count = len(sizes)
+        # Path -> position of the change in the whole patch, to merge the
+        # shards' issues back in patch order
+        self.positions = {}
+
+    @property
+    def changes(self) -> list:
+        """
+        The list of changes of the shard.
+        """
+        return list(self.iter_changes())
+
+    def iter_changes(self):
+        """
+        Iterate over the changes of the shard.
+
+        Yields:
+            Change: The change in one file.
+
+        Raises:
+            ValueError: If the patch has more or fewer changes than sizes,
+                as the changes missing from the assignment would be
+                checked by no shard.
+        """
+        count = 0
+        for index, change in enumerate(self.patch.iter_changes()):
+            if index >= self.change_count:
+                raise ValueError(f"Change {index + 1} ({change['path_name']}) has no size, "
+                                 f"only {self.change_count} changes were measured")
+            count = index + 1
+            if index in self.indexes:
+                self.positions[change['path_name']] = index
+                yield change
+        if count != self.change_count:
+            raise ValueError(f"{self.change_count} changes were measured, "
+                             f"but the patch has {count}")
+
+    def stats(self) -> str:
+        """
+        Summarize the share of the shard.
+
+        Returns:
+            str: A one-line summary.
+        """
+        share = 100 * self.size / self.total_size if self.total_size else 100 / self.count
+        return (f"shard {self.number}/{self.count}: {len(self.indexes)} files, "
+                f"{share:.1f}% of the diff")
+
+
+def write_partial(path: str, patch: ShardedPatch, flagged_license_files: dict,
+                  flagged_copyright_files: dict) -> None:
+    """
+    Write the result of one shard.
+
+    Args:
+        path (str): The partial result file.
+        patch (ShardedPatch): The checked shard.
+        flagged_license_files (dict): Issues found by the LicenseChecker.
+        flagged_copyright_files (dict): Issues found by the CopyrightChecker.
+    """
+    flagged_paths = flagged_license_files.keys() | flagged_copyright_files.keys()
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': PARTIAL_VERSION,
+            'shard': patch.number,
+            'shards': patch.count,
+            'positions': {path_name: patch.positions[path_name] for path_name in flagged_paths},
+            'license_issues': encode_issues(flagged_license_files),
+            'copyright_issues': encode_issues(flagged_copyright_files),
+        }, f)
+
+
+def merge_partials(paths: list) -> tuple:
+    """
+    Combine the partial results of every shard of a patch.
+
+    Args:
+        paths (list): The partial result files, one per shard.
+
+    Returns:
+        tuple: The flagged license files and flagged copyright files of the
+        whole patch, in patch order.
+
+    Raises:
+        ValueError: If the files are not the results of exactly the shards
+            1..N of one split.
+    """
+    if not paths:
+        raise ValueError("No partial result files")
+
+    flagged_license_files = {}
+    flagged_copyright_files = {}
+    positions = {}
+    shards = set()
+    counts = set()
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            partial = json.load(f)
+        if partial.get('version') != PARTIAL_VERSION:
+            raise ValueError(f"{path} is not a partial result file")
+        if partial['shard'] in shards:
+            raise ValueError(f"Shard {partial['shard']} is given twice")
+        shards.add(partial['shard'])
+        counts.add(partial['shards'])
+        # Each file belongs to a single shard
+        positions.update(partial['positions'])
+        flagged_license_files.update(decode_issues(partial['license_issues']))
+        flagged_copyright_files.update(decode_issues(partial['copyright_issues']))
+
+    if len(counts) > 1:
+        raise ValueError(f"Partial results of different splits: {sorted(counts)} shards")
+    missing = set(range(1, counts.pop() + 1)) - shards
+    if missing:
+        raise ValueError(f"Missing partial results of shards {sorted(missing)}")
+
+    def in_patch_order(flagged_files: dict) -> dict:
+        return dict(sorted(flagged_files.items(), key=lambda item: positions[item[0]]))
+
+    return in_patch_order(flagged_license_files), in_patch_order(flagged_copyright_files)
@@ -0,0 +1,247 @@
+"""
+Module to parse and evaluate SPDX license expressions.
+"""
+import re
+from functools import lru_cache
+
+# Operators, parentheses and license/exception identifiers
+TOKEN_RE = re.compile(r'\s*(?:(?P<paren>[()])|(?P<word>[^\s()]+))')
+
+# Number of distinct expressions (and expression/policy pairs) kept in memory
+CACHE_SIZE = 65536
+
+
+class SpdxParseError(ValueError):
+    """
+    Raised when a license expression is not valid SPDX syntax.
+    """
+
+
+class LicenseSymbol:
+    """
+    A single license identifier, e.g. "MIT" or "GPL-2.0-or-later".
+    """
+
+    __slots__ = ('key',)
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+
+    def licenses(self) -> list:
+        return [self.key]
+
+    def __str__(self) -> str:
+        return self.key
+
+
+class LicenseWith:
+    """
+    A license with an exception, e.g. "GPL-2.0-only WITH Linux-syscall-note".
+    """
+
+    __slots__ = ('license', 'exception')
+
+    def __init__(self, license: LicenseSymbol, exception: str) -> None:
+        self.license = license
+        self.exception = exception
+
+    def licenses(self) -> list:
+        return [str(self)]
+
+    def __str__(self) -> str:
+        return f"{self.license} WITH {self.exception}"
+
+
+class _LicenseOperation:
+    """
+    Base class of the AND/OR operations.
+    """
+
+    __slots__ = ('operands',)
+    operator = None
+
+    def __init__(self, operands: tuple) -> None:
+        self.operands = operands
+
+    def licenses(self) -> list:
+        return [lic for operand in self.operands for lic in operand.licenses()]
+
+    def __str__(self) -> str:
+        return f" {self.operator} ".join(
+            f"({operand})" if isinstance(operand, _LicenseOperation) else str(operand)
+            for operand in self.operands
+        )
+
+
+class LicenseAnd(_LicenseOperation):
+    """
+    A conjunction: every operand applies.
+    """
+
+    __slots__ = ()
+    operator = 'AND'
+
+
+class LicenseOr(_LicenseOperation):
+    """
+    A disjunction: any one operand may be chosen.
+    """
+
+    __slots__ = ()
+    operator = 'OR'
+
+
+class _Parser:
+    """
+    Recursive descent parser for SPDX expressions.
+
+    Precedence follows the SPDX specification: WITH binds tighter than AND,
+    which binds tighter than OR.
+    """
+
+    def __init__(self, expression: str) -> None:
+        self.expression = expression
+        self.tokens = []
+        position = 0
+        expression = expression.rstrip()
+        while position < len(expression):
+            match = TOKEN_RE.match(expression, position)
+            self.tokens.append(match.group('paren') or match.group('word'))
+            position = match.end()
+        self.position = 0
+
+    def peek(self) -> str:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def peek_operator(self) -> str:
+        token = self.peek()
+        return token.upper() if token else None
+
+    def next(self) -> str:
+        token = self.peek()
+        if token is None:
+            raise SpdxParseError(f"Unexpected end of expression: {self.expression!r}")
+        self.position += 1
+        return token
+
+    def parse(self):
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise SpdxParseError(f"Unexpected {self.peek()!r} in {self.expression!r}")
+        return node
+
+    def parse_or(self):
+        operands = [self.parse_and()]
+        while self.peek_operator() == 'OR':
+            self.next()
+            operands.append(self.parse_and())
+        return operands[0] if len(operands) == 1 else LicenseOr(tuple(operands))
+
+    def parse_and(self):
+        operands = [self.parse_with()]
+        while self.peek_operator() == 'AND':
+            self.next()
+            operands.append(self.parse_with())
+        return operands[0] if len(operands) == 1 else LicenseAnd(tuple(operands))
+
+    def parse_with(self):
+        node = self.parse_atom()
+        if self.peek_operator() == 'WITH':
+            self.next()
+            if not isinstance(node, LicenseSymbol):
+                raise SpdxParseError(f"WITH must follow a license in {self.expression!r}")
+            node = LicenseWith(node, self.next())
+        return node
+
+    def parse_atom(self):
+        token = self.next()
+        if token == '(':
+            node = self.parse_or()
+            if self.next() != ')':
+                raise SpdxParseError(f"Unbalanced parentheses in {self.expression!r}")
+            return node
+        if token == ')' or token.upper() in ('AND', 'OR', 'WITH'):
+            raise SpdxParseError(f"Unexpected {token!r} in {self.expression!r}")
+        return LicenseSymbol(token)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse(expression: str):
+    """
+    Parse an SPDX license expression into a small AST.
+
+    Args:
+        expression (str): The license expression.
+
+    Returns:
+        The root node: a LicenseSymbol, LicenseWith, LicenseAnd or LicenseOr.
+
+    Raises:
+        SpdxParseError: If the expression is not valid SPDX syntax.
+    """
+    return _Parser(expression).parse()
+
+
+def parse_lenient(expression: str):
+    """
+    Parse an SPDX license expression, treating invalid syntax as one license.
+
+    Args:
+        expression (str): The license expression.
+
+    Returns:
+        The root node of the expression.
+    """
+    try:
+        return parse(expression.strip())
+    except SpdxParseError:
+        return LicenseSymbol(expression.strip())
+
+
+def _is_allowed(node, allowed: frozenset) -> bool:
+    """
+    Evaluate a node against a set of allowed licenses.
+
+    Args:
+        node: The node to evaluate.
+        allowed (frozenset): The allowed license identifiers.
+
+    Returns:
+        bool: True if the licensing described by the node is allowed.
+    """
+    if isinstance(node, LicenseSymbol):
+        return node.key in allowed
+    if isinstance(node, LicenseWith):
+        # An exception only grants extra permissions on top of the license
+        return str(node) in allowed or node.license.key in allowed
+    if isinstance(node, LicenseOr):
+        return any(_is_allowed(operand, allowed) for operand in node.operands)
+    return all(_is_allowed(operand, allowed) for operand in node.operands)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def is_expression_allowed(expression: str, allowed: frozenset) -> bool:
+    """
+    Check if a license expression is allowed by a license policy.
+
+    OR expressions need at least one allowed option, AND expressions need every
+    component to be allowed. When an expression starts with a dual-license
+    choice, e.g. "(X OR Y) AND ...", only that choice is evaluated: the
+    remaining terms are the same licenses detected again in comments.
+
+    Verdicts are cached per (expression, policy), so a patch with many
+    detections of the same few expressions only evaluates each one once.
+
+    Args:
+        expression (str): The SPDX license expression.
+        allowed (frozenset): The allowed license identifiers.
+
+    Returns:
+        bool: True if the expression is allowed.
+    """
+    node = parse_lenient(expression)
+    if isinstance(node, LicenseAnd) and isinstance(node.operands[0], LicenseOr):
+        node = node.operands[0]
+    return _is_allowed(node, allowed)
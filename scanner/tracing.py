@@ -0,0 +1,110 @@
+"""
+Module to record opt-in timing spans and counters of a check.
+
+Spans are written as a Chrome trace (load it in chrome://tracing or
+https://ui.perfetto.dev). Tracing is off unless enable() is called, in which
+case span() and count() are close to free.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+class Tracer:
+    """
+    Collects timing spans and counters.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initialize a disabled Tracer.
+        """
+        self.enabled = False
+        self.events = []
+        self.counters = defaultdict(int)
+        self.stage_seconds = defaultdict(float)
+        self.origin = time.perf_counter()
+        self.lock = threading.Lock()
+
+    def enable(self) -> None:
+        """
+        Start recording spans and counters.
+        """
+        self.enabled = True
+        self.origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, **args):
+        """
+        Record the duration of a block as a trace event.
+
+        Args:
+            name (str): The name of the span, e.g. the pipeline stage.
+            **args: Extra values shown with the event in the trace viewer.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            event = {
+                'name': name,
+                'ph': 'X',
+                'ts': round((start - self.origin) * 1e6, 3),
+                'dur': round((end - start) * 1e6, 3),
+                'pid': os.getpid(),
+                'tid': threading.get_ident(),
+                'args': args,
+            }
+            with self.lock:
+                self.events.append(event)
+                self.stage_seconds[name] += end - start
+
+    def count(self, name: str, value: int = 1) -> None:
+        """
+        Add to a counter.
+
+        Args:
+            name (str): The name of the counter.
+            value (int): The amount to add.
+        """
+        if self.enabled:
+            with self.lock:
+                self.counters[name] += value
+
+    def write(self, path: str) -> None:
+        """
+        Write the recorded spans as a Chrome trace JSON file.
+
+        Args:
+            path (str): The output file.
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'traceEvents': self.events,
+                'displayTimeUnit': 'ms',
+                'otherData': dict(self.counters),
+            }, f)
+
+    def summary(self) -> str:
+        """
+        Summarize the counters and the time spent per stage.
+
+        Returns:
+            str: A one-line summary.
+        """
+        counters = ", ".join(f"{name}={value}" for name, value in sorted(self.counters.items()))
+        stages = ", ".join(f"{name}={seconds:.3f}s"
+                           for name, seconds in self.stage_seconds.items())
+        return f"trace: {counters or 'no counters'} | {stages or 'no spans'}"
+
+
+# The tracer shared by every module of the checker
+tracer = Tracer()
@@ -0,0 +1,77 @@
+"""
+Run the checks as a long-running local service.
+
+Usage:
+    python serve.py --port 8765 &
+    python main.py <patch_file> <repo_name> --server http://127.0.0.1:8765
+"""
+import argparse
+import logging
+from main import LOG_PREFIX, add_check_arguments, create_detection_components
+from scanner.copyright_transitions import load_transition_rules
+from scanner.policy_registry import load_policy_registry
+from scanner.scancode_engine import get_engine
+from scanner.service import DEFAULT_PORT, CheckService, serve
+from scanner.tracing import tracer
+
+
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+
+    Args:
+        argv (list): The arguments to parse. Defaults to sys.argv[1:].
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Answer patch check requests with a warm license index.")
+    parser.add_argument('--host', default='127.0.0.1',
+                        help="Address to listen on (default: localhost only).")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help="Port to listen on.")
+    parser.add_argument('--concurrency', type=int, default=2,
+                        help="Number of patches checked at the same time.")
+    parser.add_argument('--queue-size', type=int, default=16,
+                        help="Number of requests waiting for a worker before new ones "
+                             "are refused.")
+    parser.add_argument('--timeout', type=float, default=600,
+                        help="Seconds a request may wait for a worker to start its check "
+                             "before it is answered with a timeout; a started check is "
+                             "always answered.")
+    add_check_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main() -> None:
+    """
+    Load the detection state once and serve check requests until interrupted.
+    """
+    logging.basicConfig(level=logging.WARNING)
+
+    args = parse_args()
+    if args.trace:
+        tracer.enable()
+
+    registry = load_policy_registry(args.policy_file, args.policy_cache)
+    engine = get_engine(args.engine, args.workers, args.scan_tmpdir, keep_pool=True)
+
+    def detection_factory() -> tuple:
+        _, prefilter, clusterer, cache = create_detection_components(args)
+        return prefilter, clusterer, cache
+
+    service = CheckService(registry, load_transition_rules(args.copyright_transitions, registry),
+                           engine, detection_factory, concurrency=args.concurrency,
+                           queue_size=args.queue_size, timeout=args.timeout,
+                           streaming=args.streaming, tmp_root=args.scan_tmpdir)
+    print(f"{LOG_PREFIX} Serving checks on http://{args.host}:{args.port}")
+    serve(service, args.host, args.port)
+
+    if args.trace:
+        tracer.write(args.trace)
+        print(f"{LOG_PREFIX} {tracer.summary()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Tests of the clustering of texts by template.
+"""
+import pytest
+from scanner.clustering import TemplateClusterer
+
+HEADER = "/* Copyright {year} Acme. See {path} for the terms. SPDX-License-Identifier: MIT */"
+
+
+def test_texts_differing_in_years_paths_and_layout_share_a_template():
+    clusterer = TemplateClusterer()
+    first = clusterer.template(HEADER.format(year=2019, path="src/a.c"))
+    second = clusterer.template(HEADER.format(year=2024, path="lib/b.h").replace(" ", "  "))
+    assert first is not None and first == second
+
+
+@pytest.mark.parametrize('path', [
+    "COPYING", "COPYING.txt", "docs/COPYING", "COPYING.LIB.txt", "COPYRIGHT.txt",
+    "LICENSE.txt", "NOTICE.txt", "LICENSES/GPL-2.0.txt",
+])
+def test_license_file_names_are_not_masked(path):
+    clusterer = TemplateClusterer()
+    template = clusterer.template(HEADER.format(year=2024, path=path))
+    assert template is None or template != clusterer.template(HEADER.format(year=2024,
+                                                                            path="src/a.c"))
+
+
+def test_members_get_the_licenses_of_their_representative():
+    clusterer = TemplateClusterer()
+    blobs = [((index, 'added'), HEADER.format(year=2000 + index, path=f"src/f{index}.c"))
+             for index in range(3)]
+    blobs.append(((3, 'added'), HEADER.format(year=2024, path="COPYING")))
+
+    scanned = list(clusterer.representatives(blobs))
+    assert [key for key, _ in scanned] == [(0, 'added'), (3, 'added')]
+    detected = clusterer.fan_out({(0, 'added'): ['MIT'], (3, 'added'): ['GPL-2.0-only']})
+    assert detected == {(0, 'added'): ['MIT'], (1, 'added'): ['MIT'], (2, 'added'): ['MIT'],
+                        (3, 'added'): ['GPL-2.0-only']}
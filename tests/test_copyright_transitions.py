@@ -0,0 +1,44 @@
+"""
+Tests of the copyright holder transition rules.
+"""
+from scanner.copyright_transitions import TransitionRules
+
+
+def added(*lines):
+    return [(line, line) for line in lines]
+
+
+def test_literal_transition():
+    rules = TransitionRules([{'FROM': 'Old Corp', 'TO': 'New Corp'}])
+    assert rules.allowed({'old': 'Copyright Old Corp'}, added('Copyright New Corp')) == {'old'}
+    assert rules.allowed({'old': 'Copyright Old Corp'}, added('Copyright Other')) == set()
+
+
+def test_overlapping_from_holders():
+    rules = TransitionRules([{'FROM': 'Acme Corp', 'TO': 'Globex'},
+                             {'FROM': 'Acme', 'TO': 'Initech'}])
+    deleted = {'acme': 'Copyright Acme Corp'}
+    assert rules.allowed(deleted, added('Copyright Initech')) == {'acme'}
+    assert rules.allowed(deleted, added('Copyright Globex')) == {'acme'}
+
+
+def test_nested_to_holders():
+    rules = TransitionRules([{'FROM': 'Old Corp', 'TO': 'New'},
+                             {'FROM': 'Legacy Inc', 'TO': 'New Corp'}])
+    deleted = {'old': 'Copyright Old Corp', 'legacy': 'Copyright Legacy Inc'}
+    assert rules.allowed(deleted, added('Copyright New Corp')) == {'old', 'legacy'}
+
+
+def test_regex_does_not_hide_literals():
+    rules = TransitionRules([{'FROM': r'Acme \w+', 'TO': 'Globex', 'REGEX': True},
+                             {'FROM': 'Acme', 'TO': 'Initech'}])
+    deleted = {'acme': 'Copyright Acme Corp'}
+    assert rules.allowed(deleted, added('Copyright Initech')) == {'acme'}
+    assert rules.allowed(deleted, added('Copyright Globex')) == {'acme'}
+
+
+def test_regex_to_pattern():
+    rules = TransitionRules([{'FROM': 'Old Corp', 'TO': r'New Corp \d{4}', 'REGEX': True}])
+    deleted = {'old': 'Copyright Old Corp'}
+    assert rules.allowed(deleted, added('Copyright New Corp 2024')) == {'old'}
+    assert rules.allowed(deleted, added('Copyright New Corp')) == set()
@@ -0,0 +1,85 @@
+"""
+Tests of the shared hunk tokenizer.
+"""
+import threading
+import time
+from scanner import hunks
+from scanner.hunks import HUNK_LINES_KEY, HunkLines, get_hunk_lines
+
+CONTENT = "\n".join([
+    "@@ -10,4 +10,4 @@ int main()",
+    " context",
+    "-old line",
+    "+new line",
+    "+",
+    " context",
+    "@@ -40,2 +41,2 @@",
+    "-/* Copyright Old */",
+    "+/* Copyright New */",
+])
+
+
+def test_views_are_numbered_by_hunk_headers():
+    hunk_lines = HunkLines(CONTENT)
+    assert hunk_lines.added == [(11, "new line"), (12, ""), (41, "/* Copyright New */")]
+    assert hunk_lines.deleted == [(11, "old line"), (40, "/* Copyright Old */")]
+    assert hunk_lines.added_text() == "new line\n\n/* Copyright New */"
+    assert (hunk_lines.added_count, hunk_lines.deleted_count) == (3, 2)
+
+
+def test_empty_content_has_no_lines():
+    hunk_lines = HunkLines(None)
+    assert hunk_lines.added == [] and hunk_lines.deleted == []
+    assert (hunk_lines.added_count, hunk_lines.deleted_count) == (0, 0)
+
+
+def test_blank_added_line_is_counted():
+    hunk_lines = HunkLines("@@ -1,0 +1,1 @@\n+")
+    assert hunk_lines.added == [(1, "")]
+    assert hunk_lines.added_count == 1
+
+
+def test_tokenization_is_shared_then_released():
+    change = {'content': CONTENT, HUNK_LINES_KEY: None}
+    first = get_hunk_lines(change)
+    assert change[HUNK_LINES_KEY] is first
+    assert get_hunk_lines(change) is first
+    # The second checker took it; nothing is kept for the rest of the patch
+    assert change[HUNK_LINES_KEY] is None
+
+
+def test_concurrent_checkers_tokenize_once(monkeypatch):
+    tokenized = []
+
+    class SlowHunkLines(HunkLines):
+        __slots__ = ()
+
+        def __init__(self, content: str = None) -> None:
+            tokenized.append(content)
+            time.sleep(0.05)
+            super().__init__(content)
+
+    monkeypatch.setattr(hunks, 'HunkLines', SlowHunkLines)
+    change = {'content': CONTENT, HUNK_LINES_KEY: None}
+    barrier = threading.Barrier(2)
+    results = []
+
+    def take() -> None:
+        barrier.wait()
+        results.append(get_hunk_lines(change))
+
+    threads = [threading.Thread(target=take) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(tokenized) == 1
+    assert results[0] is results[1]
+    assert change[HUNK_LINES_KEY] is None
+
+
+def test_unshared_lines_are_not_kept():
+    change = {'content': CONTENT, HUNK_LINES_KEY: None}
+    get_hunk_lines(change, shared=False)
+    assert change[HUNK_LINES_KEY] is None
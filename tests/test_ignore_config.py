@@ -0,0 +1,58 @@
+"""
+Tests of the .licenseignore configuration, with nested ignore files.
+"""
+import pytest
+from scanner.ignore_config import IgnoreConfig
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / 'src' / 'gen').mkdir(parents=True)
+    (tmp_path / 'vendor' / 'lib').mkdir(parents=True)
+    (tmp_path / '.licenseignore').write_text("# Root patterns\n*.log\nvendor/\n")
+    (tmp_path / 'src' / '.licenseignore').write_text("gen/\n*.tmp\n/local.c\n")
+    (tmp_path / 'src' / 'gen' / '.licenseignore').write_text("!keep.tmp\n")
+    return tmp_path
+
+
+def config(tree, **kwargs):
+    return IgnoreConfig(str(tree / '.licenseignore'), excluded_suffixes=('.md',), **kwargs)
+
+
+@pytest.mark.parametrize('path, excluded', [
+    ('build.log', True),
+    ('src/deep/build.log', True),
+    ('README.md', True),
+    ('vendor/lib/a.c', True),
+    ('main.c', False),
+    ('src/main.c', False),
+    # Patterns of src/.licenseignore only apply below src/
+    ('src/a.tmp', True),
+    ('src/x/a.tmp', True),
+    ('a.tmp', False),
+    ('src/local.c', True),
+    ('src/x/local.c', False),
+    ('src/gen/parser.c', True),
+])
+def test_nested_patterns_apply_below_their_directory(tree, path, excluded):
+    assert config(tree).is_excluded(path) is excluded
+
+
+def test_nested_negation_takes_precedence_over_parents(tree):
+    (tree / 'src' / '.licenseignore').write_text("*.tmp\n")
+    ignore_config = config(tree)
+    assert ignore_config.is_excluded('src/gen/other.tmp')
+    assert not ignore_config.is_excluded('src/gen/keep.tmp')
+
+
+def test_directories_are_pruned_unless_a_negation_applies(tree):
+    ignore_config = config(tree)
+    assert ignore_config.is_directory_excluded('vendor')
+    assert ignore_config.is_directory_excluded('vendor/lib')
+    assert not ignore_config.is_directory_excluded('src')
+
+
+def test_nested_files_are_ignored_when_disabled(tree):
+    ignore_config = config(tree, nested=False)
+    assert not ignore_config.is_excluded('src/a.tmp')
+    assert ignore_config.is_excluded('build.log')
@@ -0,0 +1,90 @@
+"""
+Tests of the result manifest carrying verdicts between runs.
+"""
+import json
+from scanner.copyright_checker import CopyrightChecker
+from scanner.copyright_transitions import TransitionRules
+from scanner.ignore_config import IgnoreConfig
+from scanner.issues import encode_issues
+from scanner.license_policy import PERMISSIVE_LICENSES
+from scanner.license_scancode import LicenseChecker
+from scanner.manifest import IncrementalPatch, ResultManifest, manifest_context
+from scanner.patch import Patch
+from scanner.scancode_engine import ScancodeEngine
+
+ADDED = "diff --git a/{0} b/{0}\nnew file mode 100644\n--- /dev/null\n+++ b/{0}\n@@ -0,0 +1 @@\n{1}"
+COPYRIGHT_DELETED = ("diff --git a/{0} b/{0}\n--- a/{0}\n+++ b/{0}\n@@ -1,2 +1 @@\n"
+                     "-/* Copyright (c) 2020 Acme Corp */\n int x;\n")
+
+
+class _RecordingEngine(ScancodeEngine):
+    """
+    Engine detecting GPL-3.0-only or MIT by keyword, recording the scanned texts.
+    """
+
+    def __init__(self) -> None:
+        self.scanned = []
+
+    def detect(self, blobs) -> dict:
+        results = {}
+        for key, text in blobs:
+            self.scanned.append(text)
+            results[key] = 'GPL-3.0-only' if 'GPL' in text else 'MIT' if 'MIT' in text else []
+        return results
+
+
+def write_patch(tmp_path, name: str, sections: list) -> Patch:
+    path = tmp_path / name
+    path.write_text("".join(sections))
+    return Patch(str(path), ignore_config=IgnoreConfig(str(tmp_path / '.licenseignore')))
+
+
+def check(patch, manifest=None) -> tuple:
+    engine = _RecordingEngine()
+    checked_patch = IncrementalPatch(patch, manifest) if manifest is not None else patch
+    results = (LicenseChecker(checked_patch, 'org/repo', PERMISSIVE_LICENSES,
+                              engine=engine).run(),
+               CopyrightChecker(checked_patch).run())
+    if manifest is not None:
+        results = manifest.merge(*results)
+    return [list(encode_issues(flagged_files).items()) for flagged_files in results], engine
+
+
+def test_issues_of_unchanged_files_are_carried_forward(tmp_path):
+    context = manifest_context('1.0', PERMISSIVE_LICENSES, TransitionRules([]))
+    path = str(tmp_path / 'manifest.json')
+    first = ResultManifest(None, context)
+    check(write_patch(tmp_path, 'v1.patch', [
+        ADDED.format('a.c', "+/* GPL */\n"), ADDED.format('b.c', "+int b;\n"),
+        COPYRIGHT_DELETED.format('c.c')]), first)
+    first.write(path)
+    assert set(json.loads(open(path, encoding='utf-8').read())['files']) == {'a.c', 'b.c', 'c.c'}
+
+    second_patch = write_patch(tmp_path, 'v2.patch', [
+        ADDED.format('a.c', "+/* MIT */\n"), ADDED.format('b.c', "+int b;\n"),
+        COPYRIGHT_DELETED.format('c.c'), ADDED.format('d.c', "+/* GPL */\n")])
+    second = ResultManifest(path, context)
+    issues, engine = check(second_patch, second)
+
+    # Only the changed and new files are detected, and the verdicts are
+    # those of a full check, in patch order
+    assert engine.scanned == ["/* MIT */", "/* GPL */"]
+    assert (second.carried, second.checked) == (2, 2)
+    assert issues == check(second_patch)[0]
+    assert [path_name for path_name, _ in issues[0]] == ['b.c', 'd.c']
+    assert [path_name for path_name, _ in issues[1]] == ['c.c']
+
+
+def test_manifest_of_other_settings_is_ignored(tmp_path):
+    path = str(tmp_path / 'manifest.json')
+    patch = write_patch(tmp_path, 'v1.patch', [ADDED.format('a.c', "+/* GPL */\n")])
+    first = ResultManifest(None, manifest_context('1.0', PERMISSIVE_LICENSES,
+                                                  TransitionRules([])))
+    check(patch, first)
+    first.write(path)
+
+    transitions = TransitionRules([{'FROM': 'Acme Corp', 'TO': 'Globex'}])
+    second = ResultManifest(path, manifest_context('1.0', PERMISSIVE_LICENSES, transitions))
+    _, engine = check(patch, second)
+    assert engine.scanned == ["/* GPL */"]
+    assert (second.carried, second.checked) == (0, 1)
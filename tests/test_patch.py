@@ -0,0 +1,115 @@
+"""
+Tests of the patch parser, mapped and streamed.
+"""
+import pytest
+from scanner.ignore_config import IgnoreConfig
+from scanner.patch import Patch
+
+PATCH = (
+    "From 1234 Mon Sep 17 00:00:00 2001\n"
+    "Subject: [PATCH] Sample\n"
+    "\n"
+    "diff --git a/src/added.c b/src/added.c\n"
+    "new file mode 100644\n"
+    "index 0000000..1111111\n"
+    "--- /dev/null\n"
+    "+++ b/src/added.c\n"
+    "@@ -0,0 +1,2 @@\n"
+    "+/* SPDX-License-Identifier: MIT */\n"
+    "+int a = 1 +++ 2;\n"
+    "diff --git a/src/deleted.c b/src/deleted.c\n"
+    "deleted file mode 100644\n"
+    "index 1111111..0000000\n"
+    "--- a/src/deleted.c\n"
+    "+++ /dev/null\n"
+    "@@ -1 +0,0 @@\n"
+    "-/* Copyright Acme */\n"
+    "diff --git a/old.c b/new.c\n"
+    "similarity index 90%\n"
+    "rename from old.c\n"
+    "rename to new.c\n"
+    "index 2222222..3333333 100644\n"
+    "--- a/old.c\n"
+    "+++ b/new.c\n"
+    "@@ -1,2 +1,2 @@\n"
+    " int x;\n"
+    "-int y;\n"
+    "+int z;\n"
+    "diff --git a/logo.png b/logo.png\n"
+    "index 4444444..5555555 100644\n"
+    "GIT binary patch\n"
+    "literal 5\n"
+    "McmZQzWMO3h00\n"
+    "\n"
+    "diff --git a/icon.bin b/icon.bin\n"
+    "index 6666666..7777777 100644\n"
+    "Binary files a/icon.bin and b/icon.bin differ\n"
+    "diff --git a/script.sh b/script.sh\n"
+    "old mode 100644\n"
+    "new mode 100755\n"
+    "diff --git a/crlf.c b/crlf.c\n"
+    "index 8888888..9999999 100644\n"
+    "--- a/crlf.c\r\n"
+    "+++ b/crlf.c\r\n"
+    "@@ -1 +1 @@\r\n"
+    "-int old;\r\n"
+    "+int new;\r\n"
+    "diff --git a/last.c b/last.c\n"
+    "new file mode 100644\n"
+    "--- /dev/null\n"
+    "+++ b/last.c\n"
+    "@@ -0,0 +1 @@\n"
+    "+no newline at the end"
+)
+
+
+def fields(changes):
+    return [(change['path_name'], change['file_type'], change['change_type'], change['content'])
+            for change in changes]
+
+
+@pytest.fixture
+def patch_file(tmp_path):
+    path = tmp_path / 'sample.patch'
+    path.write_bytes(PATCH.encode('utf-8'))
+    return str(path)
+
+
+def parse(patch_file, streaming):
+    return Patch(patch_file, streaming=streaming,
+                 ignore_config=IgnoreConfig(patch_file + '.licenseignore'))
+
+
+def test_streaming_matches_mapped_parsing(patch_file):
+    assert fields(parse(patch_file, True).iter_changes()) == \
+        fields(parse(patch_file, False).iter_changes())
+
+
+def test_change_classification(patch_file):
+    changes = parse(patch_file, True).changes
+    classified = [(path_name, file_type, change_type)
+                  for path_name, file_type, change_type, _ in fields(changes)]
+    assert classified == [
+        ('src/added.c', 'source', 'ADDED'),
+        ('src/deleted.c', 'source', 'DELETED'),
+        ('new.c', 'source', 'RENAMED'),
+        ('logo.png', 'binary', 'MODIFIED'),
+        ('icon.bin', 'source', 'MODIFIED'),
+        ('script.sh', 'source', 'MODIFIED'),
+        ('crlf.c', 'source', 'MODIFIED'),
+        ('last.c', 'source', 'ADDED'),
+    ]
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_contents(patch_file, streaming):
+    contents = {path_name: content
+                for path_name, _, _, content in fields(parse(patch_file, streaming).changes)}
+    # The content stops at a second "+++ " separator, as it always did
+    assert contents['src/added.c'] == \
+        "\n@@ -0,0 +1,2 @@\n+/* SPDX-License-Identifier: MIT */\n+int a = 1 "
+    assert contents['logo.png'] is None
+    assert contents['icon.bin'] is None
+    assert contents['script.sh'] is None
+    assert contents['crlf.c'] == "\n@@ -1 +1 @@\n-int old;\n+int new;\n"
+    assert contents['last.c'] == "\n@@ -0,0 +1 @@\n+no newline at the end"
@@ -0,0 +1,64 @@
+"""
+Tests of the concurrent run of the checks.
+"""
+import os
+import pytest
+from scanner.copyright_checker import CopyrightChecker
+from scanner.ignore_config import IgnoreConfig
+from scanner.license_policy import PERMISSIVE_LICENSES
+from scanner.license_scancode import LicenseChecker
+from scanner.patch import Patch
+from scanner.pipeline import can_fork, run_checks, run_concurrently
+from scanner.scancode_engine import ScancodeEngine
+
+
+@pytest.mark.parametrize('in_thread', [True, False])
+def test_results_of_both_functions_are_returned(in_thread):
+    assert run_concurrently(lambda: 'foreground', lambda: {'a.c': [1]}, in_thread) == \
+        ('foreground', {'a.c': [1]})
+
+
+@pytest.mark.skipif(not can_fork(), reason="needs a single-threaded process with fork")
+def test_background_runs_in_a_forked_process():
+    _, pid = run_concurrently(lambda: None, os.getpid, in_thread=False)
+    assert pid != os.getpid()
+
+
+@pytest.mark.parametrize('in_thread', [True, False])
+def test_background_errors_are_raised(in_thread):
+    def fail():
+        raise ValueError("bad patch")
+
+    with pytest.raises(ValueError, match="bad patch"):
+        run_concurrently(lambda: None, fail, in_thread)
+
+
+class _OutOfProcessEngine(ScancodeEngine):
+    """
+    Engine detecting nothing, as if scancode ran in other processes.
+    """
+
+    detects_out_of_process = True
+
+    def detect(self, blobs) -> dict:
+        return {key: [] for key, _ in blobs}
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_threaded_checks_release_the_shared_lines(tmp_path, streaming):
+    path = tmp_path / 'a.patch'
+    path.write_text("".join(
+        f"diff --git a/f{index}.c b/f{index}.c\n--- a/f{index}.c\n+++ b/f{index}.c\n"
+        f"@@ -1 +1 @@\n-int a;\n+int b;\n" for index in range(20)))
+    patch = Patch(str(path), streaming=streaming,
+                  ignore_config=IgnoreConfig(str(tmp_path / '.licenseignore')))
+    license_checker = LicenseChecker(patch, 'org/repo', PERMISSIVE_LICENSES,
+                                     engine=_OutOfProcessEngine())
+    copyright_checker = CopyrightChecker(patch)
+    run_checks(license_checker, copyright_checker)
+
+    # A streaming patch is parsed again for each checker, so nothing is shared
+    assert license_checker.share_hunk_lines is copyright_checker.share_hunk_lines is \
+        (not streaming)
+    if not streaming:
+        assert all(change['hunk_lines'] is None for change in patch.changes)
@@ -0,0 +1,60 @@
+"""
+Tests of the project policy registry and its cached index.
+"""
+import json
+import os
+from scanner.license_policy import PERMISSIVE_LICENSES
+from scanner.policy_registry import CACHE_FILE_NAME, PolicyRegistry, load_policy_registry
+
+DATA = {
+    'default_markings': 'BSD-3-Clause-Clear',
+    'projects': [
+        {'PROJECT_NAME': 'org/kernel', 'MARKINGS': 'GPL-2.0-only'},
+        {'PROJECT_NAME': 'kernel', 'MARKINGS': 'MIT', 'DENIED': ['MIT-0']},
+        {'PROJECT_NAME': 'org/kernel', 'MARKINGS': 'Apache-2.0'},
+        {'PROJECT_NAME': 'tools', 'MARKINGS': 'MIT', 'ALLOWED': ['MIT']},
+    ],
+}
+
+
+def test_first_matching_project_wins():
+    registry = PolicyRegistry(DATA)
+    assert registry.lookup('org/kernel').markings == 'GPL-2.0-only'
+    assert registry.lookup('mirror/org/kernel').markings == 'GPL-2.0-only'
+    assert registry.lookup('other/kernel').markings == 'MIT'
+    assert registry.lookup('xkernel').name is None
+    assert registry.lookup('org/tools').allowed_licenses == {'MIT'}
+    assert 'MIT-0' not in registry.lookup('kernel').allowed_licenses
+
+
+def test_cached_index_gives_the_same_policies(tmp_path):
+    policy_file = tmp_path / 'policies.json'
+    policy_file.write_text(json.dumps(DATA))
+    cache_dir = str(tmp_path / 'cache')
+
+    built = load_policy_registry(str(policy_file), cache_dir)
+    cached = load_policy_registry(str(policy_file), cache_dir)
+    for repo in ('org/kernel', 'a/kernel', 'tools', 'unknown'):
+        assert cached.lookup(repo).markings == built.lookup(repo).markings
+        assert cached.lookup(repo).allowed_licenses == built.lookup(repo).allowed_licenses
+    # Derived licenses come from the current code, not from the cache
+    assert cached.lookup('unknown').allowed_licenses == PERMISSIVE_LICENSES
+
+
+def test_stale_or_corrupt_index_is_rebuilt(tmp_path):
+    policy_file = tmp_path / 'policies.json'
+    policy_file.write_text(json.dumps(DATA))
+    cache_dir = tmp_path / 'cache'
+    load_policy_registry(str(policy_file), str(cache_dir))
+    cache_path = cache_dir / CACHE_FILE_NAME
+
+    cached = json.loads(cache_path.read_text())
+    cached['signature']['code'] = 'other version'
+    cached['index']['default_markings'] = 'stale'
+    cache_path.write_text(json.dumps(cached))
+    assert load_policy_registry(str(policy_file), str(cache_dir)).default.markings == \
+        'BSD-3-Clause-Clear'
+
+    cache_path.write_text("not json")
+    assert load_policy_registry(str(policy_file), str(cache_dir)).project_count == 4
+    assert os.path.exists(cache_path)
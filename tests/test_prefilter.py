@@ -0,0 +1,35 @@
+"""
+Tests of the license keyword prefilter.
+"""
+import pytest
+from scanner.prefilter import LicensePrefilter
+
+# Bare SPDX identifiers, as found in e.g. "License: <id>" or README badges
+SPDX_IDS = [
+    "GPL-2.0-only", "GPL-3.0-or-later", "LGPL-2.1-or-later", "AGPL-3.0-only",
+    "BSD-3-Clause-Clear", "0BSD", "MIT", "MIT-0", "ISC", "Apache-2.0", "MPL-2.0",
+    "EPL-2.0", "EUPL-1.2", "CDDL-1.0", "Zlib", "WTFPL", "Artistic-2.0", "CC-BY-4.0",
+    "CC0-1.0", "Unlicense",
+]
+
+
+@pytest.mark.parametrize('spdx_id', SPDX_IDS)
+def test_bare_spdx_ids_are_scanned(spdx_id):
+    assert LicensePrefilter().matches(f"/* {spdx_id} */")
+
+
+@pytest.mark.parametrize('text', [
+    "int submit(void);",
+    "void signup(struct user *u);",
+    "#include <misc.h>",
+    "return sample(template);",
+])
+def test_common_words_are_skipped(text):
+    assert not LicensePrefilter().matches(text)
+
+
+def test_stats_count_scanned_and_skipped():
+    prefilter = LicensePrefilter()
+    prefilter.matches("SPDX-License-Identifier: MIT")
+    prefilter.matches("int x;")
+    assert (prefilter.scanned, prefilter.skipped) == (1, 1)
@@ -0,0 +1,30 @@
+"""
+Tests of the machine-readable report renderers.
+"""
+import json
+from scanner.issues import Issue, IssueKind
+from scanner.report import JsonLinesRenderer, SarifRenderer
+
+
+def test_aborted_sarif_log_is_a_complete_document(tmp_path):
+    path = tmp_path / 'report.sarif'
+    renderer = SarifRenderer(str(path))
+    renderer.file_issues('a.c', [Issue('a.c', IssueKind.LICENSE_MISSING)])
+    renderer.abort(RuntimeError("scancode crashed"))
+
+    run = json.loads(path.read_text())['runs'][0]
+    assert [result['ruleId'] for result in run['results']] == ['license-missing']
+    assert run['invocations'][0]['executionSuccessful'] is False
+    assert run['invocations'][0]['toolExecutionNotifications'][0]['message']['text'] == \
+        "scancode crashed"
+
+
+def test_aborted_json_lines_end_with_the_error(tmp_path):
+    path = tmp_path / 'report.jsonl'
+    renderer = JsonLinesRenderer(str(path))
+    renderer.file_issues('a.c', [Issue('a.c', IssueKind.LICENSE_MISSING)])
+    renderer.abort(KeyboardInterrupt())
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [record['type'] for record in records] == ['issue', 'error']
+    assert records[-1]['message'] == 'KeyboardInterrupt'
@@ -0,0 +1,95 @@
+"""
+Tests of the check service's request handling.
+"""
+import threading
+import pytest
+from scanner.copyright_transitions import TransitionRules
+from scanner.detection_cache import DetectionCache
+from scanner.policy_registry import PolicyRegistry
+from scanner.scancode_engine import ScancodeEngine
+from scanner.service import WARMUP_TEXT, CheckJob, CheckService, collect_ignore_files
+
+PATCH = b"""diff --git a/src/lib/a.c b/src/lib/a.c
+--- a/src/lib/a.c
++++ b/src/lib/a.c
+diff --git a/top.c b/top.c
+--- a/top.c
++++ b/top.c
+"""
+
+
+def test_ignore_files_of_changed_directories_are_collected(tmp_path):
+    (tmp_path / 'src' / 'lib').mkdir(parents=True)
+    (tmp_path / 'other').mkdir()
+    (tmp_path / '.licenseignore').write_text("*.bin\n")
+    (tmp_path / 'src' / '.licenseignore').write_text("gen/\n")
+    (tmp_path / 'src' / 'lib' / '.licenseignore').write_text("a.c\n")
+    (tmp_path / 'other' / '.licenseignore').write_text("*\n")
+
+    assert collect_ignore_files(PATCH, str(tmp_path)) == {
+        '': "*.bin\n", 'src': "gen/\n", 'src/lib': "a.c\n"}
+
+
+@pytest.mark.parametrize('directory', ['..', '../x', '/etc', 'src/../..'])
+def test_ignore_files_outside_the_tree_are_refused(directory):
+    with pytest.raises(ValueError):
+        CheckJob('org/repo', '', {directory: "*\n"})
+
+
+def test_started_job_is_not_cancelled():
+    job = CheckJob('org/repo', '')
+    assert job.start()
+    assert not job.cancel()
+
+
+def test_cancelled_job_is_not_started():
+    job = CheckJob('org/repo', '')
+    assert job.cancel()
+    assert not job.start()
+
+
+class _LockstepEngine(ScancodeEngine):
+    """
+    Engine returning MIT for every text, once both workers are detecting.
+    """
+
+    def __init__(self) -> None:
+        self.barrier = threading.Barrier(2, timeout=10)
+
+    def detect(self, blobs) -> dict:
+        blobs = list(blobs)
+        if blobs and blobs[0][1] != WARMUP_TEXT:
+            self.barrier.wait()
+        return {key: 'MIT' for key, _ in blobs}
+
+
+def _source_patch(name: str) -> str:
+    return (f"diff --git a/{name} b/{name}\n"
+            f"new file mode 100644\n"
+            f"--- /dev/null\n"
+            f"+++ b/{name}\n"
+            f"@@ -0,0 +1 @@\n"
+            f"+/* {name} */\n")
+
+
+def test_workers_share_the_cache_directory(tmp_path):
+    service = CheckService(PolicyRegistry({'projects': []}), TransitionRules([]),
+                           _LockstepEngine(),
+                           lambda: (None, None, DetectionCache(str(tmp_path / 'cache'))),
+                           concurrency=2, tmp_root=str(tmp_path))
+    service.start()
+    jobs = [CheckJob('org/repo', _source_patch(name)) for name in ('a.c', 'b.c')]
+    try:
+        for job in jobs:
+            service.submit(job)
+        for job in jobs:
+            assert job.done.wait(30)
+    finally:
+        service.stop()
+
+    assert [job.error for job in jobs] == [None, None]
+    # Both results were committed, and are found by a later run
+    cache = DetectionCache(str(tmp_path / 'cache'))
+    for name in ('a.c', 'b.c'):
+        assert cache.get(cache.key(f"/* {name} */")) == 'MIT'
+    cache.close()
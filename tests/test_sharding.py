@@ -0,0 +1,183 @@
+"""
+Tests of the split of a patch across shards.
+"""
+import subprocess
+import pytest
+from scanner.copyright_checker import CopyrightChecker
+from scanner.git_range import GitRange
+from scanner.ignore_config import IgnoreConfig
+from scanner.issues import encode_issues
+from scanner.license_policy import PERMISSIVE_LICENSES
+from scanner.license_scancode import LicenseChecker
+from scanner.patch import Change, Patch
+from scanner.scancode_engine import ScancodeEngine
+from scanner.sharding import (ShardedPatch, assign_shards, merge_partials, parse_shard,
+                              write_partial)
+
+
+def make_patch(tmp_path, streaming):
+    sections = []
+    for index in range(10):
+        body = "".join(f"+line {line}\n" for line in range(index * 3 + 1))
+        sections.append(f"diff --git a/f{index}.c b/f{index}.c\nnew file mode 100644\n"
+                        f"--- /dev/null\n+++ b/f{index}.c\n@@ -0,0 +1 @@\n{body}")
+    path = tmp_path / 'shards.patch'
+    path.write_text("".join(sections))
+    return Patch(str(path), streaming=streaming,
+                 ignore_config=IgnoreConfig(str(tmp_path / '.licenseignore')))
+
+
+def test_parse_shard():
+    assert parse_shard("2/4") == (2, 4)
+    with pytest.raises(ValueError):
+        parse_shard("5/4")
+
+
+def test_assignment_balances_sizes():
+    assignment = assign_shards([10, 9, 8, 7, 1, 1], 2)
+    loads = [0, 0]
+    for size, shard in zip([10, 9, 8, 7, 1, 1], assignment):
+        loads[shard] += size
+    assert loads == [18, 18]
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+def test_shards_split_the_changes_without_decoding_them(tmp_path, monkeypatch, streaming):
+    patch = make_patch(tmp_path, streaming)
+    paths = [change['path_name'] for change in patch.iter_changes()]
+
+    def fail(self):
+        raise AssertionError("Content decoded to assign shards")
+
+    monkeypatch.setattr(Change, 'content', property(fail))
+    shards = [ShardedPatch(patch, number, 3) for number in (1, 2, 3)]
+    monkeypatch.undo()
+
+    shard_paths = [[change['path_name'] for change in shard.iter_changes()] for shard in shards]
+    assert sorted(path for paths_of_shard in shard_paths for path in paths_of_shard) == \
+        sorted(paths)
+    assert all(paths_of_shard for paths_of_shard in shard_paths)
+
+
+class _KeywordEngine(ScancodeEngine):
+    """
+    Engine detecting GPL-3.0-only in texts mentioning GPL, and nothing else.
+    """
+
+    def detect(self, blobs) -> dict:
+        return {key: 'GPL-3.0-only' if 'GPL' in text else [] for key, text in blobs}
+
+
+def make_mixed_patch(tmp_path):
+    sections = []
+    for index in range(12):
+        if index % 3 == 0:
+            # A deleted copyright line
+            sections.append(f"diff --git a/m{index}.c b/m{index}.c\n--- a/m{index}.c\n"
+                            f"+++ b/m{index}.c\n@@ -1,2 +1 @@\n"
+                            f"-/* Copyright (c) {2000 + index} Acme Corp */\n int m;\n")
+        else:
+            license_line = "+/* GPL */\n" if index % 3 == 1 else ""
+            body = "".join(f"+int v{line};\n" for line in range(index))
+            sections.append(f"diff --git a/f{index}.c b/f{index}.c\nnew file mode 100644\n"
+                            f"--- /dev/null\n+++ b/f{index}.c\n@@ -0,0 +1 @@\n"
+                            f"{license_line}{body}")
+    path = tmp_path / 'mixed.patch'
+    path.write_text("".join(sections))
+    return Patch(str(path), ignore_config=IgnoreConfig(str(tmp_path / '.licenseignore')))
+
+
+def check(patch) -> tuple:
+    license_checker = LicenseChecker(patch, 'org/repo', PERMISSIVE_LICENSES,
+                                     engine=_KeywordEngine())
+    return license_checker.run(), CopyrightChecker(patch).run()
+
+
+def ordered(flagged_files: dict) -> list:
+    return list(encode_issues(flagged_files).items())
+
+
+def write_partials(tmp_path, patch, count: int, numbers=None) -> list:
+    paths = []
+    for number in numbers or range(1, count + 1):
+        shard = ShardedPatch(patch, number, count)
+        path = str(tmp_path / f'shard-{number}-of-{count}.json')
+        write_partial(path, shard, *check(shard))
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.parametrize('count', [1, 3, 5])
+def test_merged_shards_match_the_unsharded_run(tmp_path, count):
+    patch = make_mixed_patch(tmp_path)
+    flagged_license_files, flagged_copyright_files = check(patch)
+    assert flagged_license_files and flagged_copyright_files
+
+    # Merged in reverse shard order, the issues are still in patch order
+    merged = merge_partials(write_partials(tmp_path, patch, count)[::-1])
+    assert [ordered(flagged_files) for flagged_files in merged] == \
+        [ordered(flagged_license_files), ordered(flagged_copyright_files)]
+
+
+def test_missing_shard_is_refused(tmp_path):
+    paths = write_partials(tmp_path, make_mixed_patch(tmp_path), 3, numbers=[1, 3])
+    with pytest.raises(ValueError, match=r"Missing partial results of shards \[2\]"):
+        merge_partials(paths)
+
+
+def test_duplicate_shard_is_refused(tmp_path):
+    paths = write_partials(tmp_path, make_mixed_patch(tmp_path), 2)
+    with pytest.raises(ValueError, match="given twice"):
+        merge_partials(paths + paths[:1])
+
+
+def test_shards_of_different_splits_are_refused(tmp_path):
+    patch = make_mixed_patch(tmp_path)
+    paths = write_partials(tmp_path, patch, 2, numbers=[1]) + \
+        write_partials(tmp_path, patch, 3, numbers=[2, 3])
+    with pytest.raises(ValueError, match="different splits"):
+        merge_partials(paths)
+
+
+def git(repo, *args) -> None:
+    subprocess.run(['git', '-C', str(repo), '-c', 'user.name=test', '-c', 'user.email=test@test',
+                    *args], check=True, capture_output=True)
+
+
+def test_git_range_sizes_match_its_changes(tmp_path):
+    repo = tmp_path / 'repo'
+    repo.mkdir()
+    git(repo, 'init', '-q')
+    (repo / 'a.c').write_text("int a;\n")
+    (repo / 'm.sh').write_text("echo m\n")
+    (repo / 'old.c').write_text("".join(f"int o{line};\n" for line in range(20)))
+    (repo / 'z.c').write_text("int z;\n")
+    git(repo, 'add', '-A')
+    git(repo, 'commit', '-q', '-m', 'base')
+    # A type change (file to symlink) is diffed as two sections
+    (repo / 'a.c').unlink()
+    (repo / 'a.c').symlink_to('z.c')
+    (repo / 'm.sh').chmod(0o755)
+    (repo / 'old.c').rename(repo / 'new.c')
+    (repo / 'z.c').write_text("int z;\nint z2;\nint z3;\n")
+    git(repo, 'add', '-A')
+    git(repo, 'commit', '-q', '-m', 'head')
+
+    git_range = GitRange(str(repo), 'HEAD~..HEAD')
+    paths = [change['path_name'] for change in git_range.iter_changes()]
+    assert paths == ['a.c', 'a.c', 'm.sh', 'new.c', 'z.c']
+    assert git_range.change_sizes() == [1, 1, 0, 0, 2]
+
+    shard_paths = []
+    for number in (1, 2):
+        shard_paths += [change['path_name']
+                        for change in ShardedPatch(git_range, number, 2).iter_changes()]
+    assert sorted(shard_paths) == paths
+
+
+def test_unmeasured_changes_are_refused(tmp_path, monkeypatch):
+    patch = make_patch(tmp_path, streaming=True)
+    sizes = patch.change_sizes()
+    monkeypatch.setattr(patch, 'change_sizes', lambda: sizes[:-1])
+    with pytest.raises(ValueError, match="has no size"):
+        list(ShardedPatch(patch, 1, 1).iter_changes())